@@ -0,0 +1,51 @@
+"""
+多账号批量抢课入口（无交互）
+
+用法:
+    python batch_runner.py accounts.json [--workers 8] [--max-restarts 3] [--summary data/batch_summary.json]
+
+账号文件示例:
+    {
+      "defaults": {"year": 2025, "term": 2, "max_duration": 600, "start_time": "2026-01-10 13:00:00",
+                   "config": {"interval_min": 1, "interval_max": 3, "max_attempts": 100}},
+      "accounts": [
+        {"sid": "23120001", "pwd_env": "SHU_PWD_23120001", "targets": [{"kch_id": "...", "jxb_id": "..."}]},
+        {"sid": "23120002", "targets": "targets_23120002.json", "config": {"randomize": false}}
+      ]
+    }
+密码从 pwd_env 指定的环境变量读取，未指定时读取 SHU_PWD_<学号>。
+"""
+import sys
+import argparse
+
+from modules.tools.debug_utils import init_logger
+from functions.run_config import load_accounts
+from functions.batch_runner import BatchSupervisor, print_summary, save_summary
+
+
+def run():
+    parser = argparse.ArgumentParser(description="上海大学选课助手 - 多账号批量抢课")
+    parser.add_argument("accounts", help="账号配置文件 (JSON)")
+    parser.add_argument("--workers", type=int, default=0, help="同时运行的最大进程数，默认全部同时运行")
+    parser.add_argument("--max-restarts", type=int, default=3, help="工作进程崩溃后的最大重启次数")
+    parser.add_argument("--stagger", type=float, default=1.0, help="相邻进程的启动间隔(秒)")
+    parser.add_argument("--data-dir", default="data/accounts", help="各账号工作目录的根目录")
+    parser.add_argument("--summary", default="data/batch_summary.json", help="汇总结果输出路径")
+    parser.add_argument("--debug", action="store_true", help="监督进程输出 DEBUG 日志")
+    args = parser.parse_args()
+
+    init_logger(args.debug)
+    accounts = load_accounts(args.accounts)
+    missing = [a["sid"] for a in accounts if not a["pwd"]]
+    if missing:
+        print(f"❌ 以下账号缺少密码（请设置环境变量 SHU_PWD_<学号> 或 pwd_env）：{', '.join(missing)}")
+        sys.exit(1)
+
+    supervisor = BatchSupervisor(accounts, args.data_dir, args.workers, args.max_restarts, args.stagger)
+    summary = supervisor.run()
+    print_summary(summary)
+    print(f"\n汇总已保存到: {save_summary(summary, args.summary)}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,112 @@
+"""
+并发基准：同一账号在本地模拟教务系统上发起大量并发搜索，对比
+  - sync: 同步服务 + 线程池（每个并发请求占用一个线程，连接池大小等于并发数）
+  - async: 异步服务 + 单个事件循环（asyncio.gather，信号量限制并发数）
+每种方式在独立子进程中运行，报告耗时分布、吞吐与子进程峰值内存(RSS)。
+
+用法:
+    python -m benchmarks.bench_async [--requests 2000] [--concurrency 200] [--latency 0.05] [--json out.json]
+"""
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, Any
+
+from benchmarks.common import summarize, print_table, save_json
+from benchmarks.mock_jwxt import MockJwxtServer
+from benchmarks.bench_startup import PROJECT_DIR
+
+CHILD = """
+import sys, time, json, asyncio, resource
+from loguru import logger
+logger.remove()
+mode, base_url, sso_url = sys.argv[1:4]
+total, concurrency = int(sys.argv[4]), int(sys.argv[5])
+SID, PWD = "20240001", "mock-password"
+latencies, codes = [], []
+
+def run_sync():
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+    from modules.services.login_service import LoginService
+    from modules.services.param_service import ParamService
+    from modules.services.search_service import SearchService
+    login = LoginService(base_url, sso_url=sso_url)
+    assert login.login(SID, PWD)["code"] == 1000
+    login.sess.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+    params = ParamService(login.sess, base_url).extract()["data"]
+    searcher = SearchService(login.sess, base_url)
+
+    def one(i):
+        started = time.perf_counter()
+        res = searcher.search(SID, params, 2025, 2, "01", 1, 50, f"模拟课程{i % 10:02d}")
+        latencies.append(time.perf_counter() - started)
+        codes.append(res["code"])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return time.perf_counter() - started
+
+async def run_async():
+    from modules.async_jwxt_client import AsyncJwxtClient
+    from modules.services.async_services import AsyncLoginService, AsyncParamService, AsyncSearchService
+    async with AsyncLoginService(base_url, sso_url=sso_url, client=AsyncJwxtClient(base_url, limit=concurrency)) as login:
+        assert (await login.login(SID, PWD))["code"] == 1000
+        params = (await AsyncParamService(login.client).extract())["data"]
+        searcher = AsyncSearchService(login.client)
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with gate:
+                started = time.perf_counter()
+                res = await searcher.search(SID, params, 2025, 2, "01", 1, 50, f"模拟课程{i % 10:02d}")
+                latencies.append(time.perf_counter() - started)
+                codes.append(res["code"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - started
+
+elapsed = run_sync() if mode == "sync" else asyncio.run(run_async())
+print(json.dumps({"elapsed": elapsed, "latencies": latencies, "errors": sum(c != 1000 for c in codes),
+                  "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def run_mode(mode: str, server: MockJwxtServer, total: int, concurrency: int) -> Dict[str, Any]:
+    proc = subprocess.run([sys.executable, "-c", CHILD, mode, server.base_url, server.sso_url, str(total),
+                           str(concurrency)], cwd=PROJECT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode} 子进程失败：\n{proc.stderr[-2000:]}")
+    child = json.loads(proc.stdout.strip().splitlines()[-1])
+    result = summarize(child["latencies"])
+    result.update(throughput=total / child["elapsed"], errors=child["errors"], rss_mb=child["rss_mb"])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步线程池与异步事件循环的并发搜索基准")
+    parser.add_argument("--requests", type=int, default=2000, help="搜索请求总数")
+    parser.add_argument("--concurrency", type=int, default=200, help="并发数")
+    parser.add_argument("--latency", type=float, default=0.05, help="模拟服务器延迟(秒)")
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    results = {}
+    with MockJwxtServer({"latency": args.latency}) as server:
+        for mode in ("sync", "async"):
+            results[mode] = run_mode(mode, server, args.requests, args.concurrency)
+
+    print(f"\n========== 并发搜索 ({args.requests} 次, 并发 {args.concurrency}, "
+          f"模拟延迟 {args.latency * 1000:.0f}ms) ==========")
+    rows = [[mode, f"{r['p50'] * 1000:.1f}", f"{r['p90'] * 1000:.1f}", f"{r['p99'] * 1000:.1f}",
+             f"{r['throughput']:.1f}", r["errors"], f"{r['rss_mb']:.1f}"] for mode, r in results.items()]
+    print_table(["方式", "p50(ms)", "p90(ms)", "p99(ms)", "吞吐(次/秒)", "失败", "峰值内存(MB)"], rows)
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
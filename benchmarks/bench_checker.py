@@ -0,0 +1,83 @@
+"""
+课程状态分析基准：随机生成多份课表快照（教学班数 × 快照数行），比较
+  - loop:   capacity_analytics.analyze_course 逐门课程计算（单份小快照时 CourseStatusChecker 使用的路径）；
+  - frame:  modules/tools/capacity_analytics.py 的列式流水线，一次算出所有快照的结果（多份快照时再汇总变化），
+并校验两者的状态、剩余名额、选课率与容量显示一致。用 --snapshots 1 可确定 FRAME_MIN_ROWS 的取值。
+
+用法:
+    python -m benchmarks.bench_checker [--classes 500 2000] [--snapshots 20] [--rounds 3] [--json out.json]
+"""
+import time
+import random
+import argparse
+from typing import Any, Dict, List
+
+from benchmarks.common import summarize, print_table, save_json
+from modules.tools.capacity_analytics import snapshot_frame, analyze_frame, analyze_course, snapshot_trends, \
+    latest, display_columns
+
+
+def make_snapshots(rng: random.Random, classes: int, snapshots: int) -> List[tuple]:
+    base = []
+    for i in range(classes):
+        capacity = rng.choice((30, 60, 70, 120))
+        base.append({"capacity": capacity, "enrolled": rng.randint(0, capacity), "expansion": 0})
+    result = []
+    for s in range(snapshots):
+        courses = []
+        for i, b in enumerate(base):
+            b["enrolled"] = max(0, b["enrolled"] + rng.randint(-2, 6))
+            if rng.random() < 0.01:
+                b["expansion"] += 10
+            courses.append({
+                "course_id": f"K{i:05d}", "class_id": f"J{i:05d}", "title": f"课程{i:05d}", "teacher": "教师",
+                "credit": 2.0, "time": "星期一第1-2节{1-10周}", "place": "A101",
+                "raw_data": {"jxbrs": str(b["capacity"]), "krrl": str(b["expansion"]), "yxzrs": str(b["enrolled"]),
+                             "sfxkbj": "1" if i % 7 else "0"},
+            })
+        result.append((f"snapshot_{s:03d}", courses))
+    return result
+
+
+def bench(classes: int, snapshots: int, rounds: int, seed: int) -> Dict[str, Any]:
+    data = make_snapshots(random.Random(seed), classes, snapshots)
+    loop_samples, frame_samples = [], []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _, courses in data:
+            expected = [analyze_course(c) for c in courses]
+        loop_samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        analysis = analyze_frame(snapshot_frame(data))
+        last = display_columns(latest(analysis))
+        if snapshots > 1:
+            snapshot_trends(analysis)
+        frame_samples.append(time.perf_counter() - started)
+
+    for name in ("status_str", "remaining", "capacity_display", "title", "time"):
+        assert list(last[name]) == [e[name] for e in expected], name
+    assert all(abs(a - e["rate"]) < 1e-9 for a, e in zip(last["rate"], expected))
+    return {"rows": classes * snapshots, "loop": summarize(loop_samples), "frame": summarize(frame_samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="课程状态分析耗时基准")
+    parser.add_argument("--classes", type=int, nargs="+", default=[500, 2000], help="每份快照的教学班数")
+    parser.add_argument("--snapshots", type=int, default=20, help="快照数")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    results = {str(n): bench(n, args.snapshots, args.rounds, args.seed) for n in args.classes}
+    print(f"\n========== 课程状态分析 ({args.snapshots} 份快照, {args.rounds} 轮) ==========")
+    rows = [[r["rows"], f"{r['loop']['mean'] * 1000:.1f}", f"{r['frame']['mean'] * 1000:.1f}",
+             f"{r['loop']['mean'] / r['frame']['mean']:.1f}x"] for r in results.values()]
+    print_table(["行数", "逐行(ms)", "列式(ms)", "加速"], rows)
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
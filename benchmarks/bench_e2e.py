@@ -0,0 +1,162 @@
+"""
+端到端基准测试：在本地模拟教务系统上测量登录耗时、搜索吞吐、每秒选课数以及首次选课成功时间
+
+用法:
+    python -m benchmarks.bench_e2e [--latency 0.02] [--duration 5] [--workers 8] [--json bench_e2e.json]
+"""
+import io
+import time
+import tempfile
+import argparse
+import contextlib
+import threading
+from typing import Dict, Any
+from loguru import logger
+
+from benchmarks.common import summarize, print_table, save_json
+from benchmarks.mock_jwxt import MockJwxtServer
+from modules.services.login_service import LoginService
+from modules.services.param_service import ParamService
+from modules.services.search_service import SearchService
+from modules.course_selector import CourseSelector
+
+SID = "20240001"
+PWD = "mock-password"
+
+
+def _login(server: MockJwxtServer):
+    login = LoginService(server.base_url, sso_url=server.sso_url)
+    res = login.login(SID, PWD)
+    if res["code"] != 1000:
+        raise RuntimeError(f"登录失败：{res['msg']}")
+    params = ParamService(login.sess, server.base_url).extract()["data"]
+    return login, params
+
+
+def bench_login(server: MockJwxtServer, rounds: int) -> Dict[str, Any]:
+    """顺序执行多次完整登录（SSO + 回跳 + 菜单初始化）"""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        res = LoginService(server.base_url, sso_url=server.sso_url).login(SID, PWD)
+        samples.append(time.perf_counter() - started)
+        if res["code"] != 1000:
+            raise RuntimeError(f"登录失败：{res['msg']}")
+    return summarize(samples)
+
+
+def bench_search(server: MockJwxtServer, duration: float, workers: int) -> Dict[str, Any]:
+    """多线程共享同一会话持续搜索，统计吞吐与耗时分布"""
+    login, params = _login(server)
+    searcher = SearchService(login.sess, server.base_url)
+    samples, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(n):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            res = searcher.search(SID, params, 2025, 2, "01", 1, 50, f"模拟课程{n % 10:02d}")
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples.append(elapsed)
+                if res["code"] != 1000:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    result = summarize(samples)
+    result["throughput"] = len(samples) / (time.perf_counter() - started)
+    result["errors"] = errors[0]
+    return result
+
+
+def bench_select(server: MockJwxtServer, duration: float) -> Dict[str, Any]:
+    """单会话顺序选课（含每次选课前的会话刷新），统计每秒选课数"""
+    login, params = _login(server)
+    selector = CourseSelector(login.sess, server.base_url)
+    course = dict(server.state.catalog[0])
+    samples, codes = [], {}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        res = selector.select_course(SID, course, params)
+        samples.append(time.perf_counter() - t0)
+        codes[res["code"]] = codes.get(res["code"], 0) + 1
+    result = summarize(samples)
+    result["throughput"] = len(samples) / (time.perf_counter() - started)
+    result["codes"] = codes
+    return result
+
+
+def bench_first_success(latency: float, open_after: float, release_interval: float,
+                        max_duration: float) -> Dict[str, Any]:
+    """
+    所有教学班初始满员，选课在 open_after 秒后开放，之后每 release_interval 秒随机释放一个座位；
+    用 CourseSniper 抢目标课程，统计从开放到首次选课成功的时间
+    """
+    from functions.course_sniper import CourseSniper
+    from functions.course_storage import CourseStorage
+
+    config = {"latency": latency, "free_seats": 0, "courses": 5, "classes_per_course": 1,
+              "select_open_after": open_after, "seat_release_interval": release_interval}
+    with MockJwxtServer(config) as server, tempfile.TemporaryDirectory() as tmp:
+        login, params = _login(server)
+        sniper = CourseSniper(CourseSelector(login.sess, server.base_url), SID, params, CourseStorage(tmp))
+        sniper.configure(interval_min=0.05, interval_max=0.1, max_attempts=0, randomize=True, backoff_factor=1.0)
+        sniper.add_target_courses([dict(c) for c in server.state.catalog])
+        opened_at = server.state.started + open_after
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = sniper.start(max_duration)
+        select_stats = server.stats().get("select", {})
+    first_success_at = stats.get("first_success_at")
+    return {
+        "successful": stats.get("successful", 0),
+        "attempts": stats.get("attempts", 0),
+        "time_to_first_success": first_success_at - opened_at if first_success_at else None,
+        "server_outcomes": select_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端基准测试（本地模拟教务系统）")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟服务器基础延迟(秒)")
+    parser.add_argument("--duration", type=float, default=5.0, help="吞吐测试时长(秒)")
+    parser.add_argument("--workers", type=int, default=8, help="搜索吞吐测试的并发线程数")
+    parser.add_argument("--login-rounds", type=int, default=20, help="登录测试次数")
+    parser.add_argument("--open-after", type=float, default=1.0, help="首次成功测试中选课开放前的等待(秒)")
+    parser.add_argument("--release-interval", type=float, default=0.5, help="首次成功测试中座位释放间隔(秒)")
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    logger.remove()
+    results = {}
+    with MockJwxtServer({"latency": args.latency}) as server:
+        results["login"] = bench_login(server, args.login_rounds)
+        results["search"] = bench_search(server, args.duration, args.workers)
+        results["select"] = bench_select(server, args.duration)
+    results["first_success"] = bench_first_success(args.latency, args.open_after, args.release_interval,
+                                                   max_duration=max(30.0, args.duration * 4))
+
+    print(f"\n========== 端到端基准 (模拟延迟 {args.latency * 1000:.0f}ms) ==========")
+    rows = []
+    for name in ("login", "search", "select"):
+        r = results[name]
+        rows.append([name, r["count"], f"{r['mean'] * 1000:.1f}", f"{r['p50'] * 1000:.1f}",
+                     f"{r['p90'] * 1000:.1f}", f"{r['p99'] * 1000:.1f}",
+                     f"{r['throughput']:.1f}" if "throughput" in r else "-"])
+    print_table(["测试", "次数", "平均(ms)", "p50(ms)", "p90(ms)", "p99(ms)", "吞吐(次/秒)"], rows)
+    fs = results["first_success"]
+    ttfs = f"{fs['time_to_first_success']:.2f} 秒" if fs["time_to_first_success"] is not None else "未成功"
+    print(f"\n首次选课成功时间（从开放算起）: {ttfs}，共尝试 {fs['attempts']} 次，成功 {fs['successful']} 门")
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
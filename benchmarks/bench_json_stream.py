@@ -0,0 +1,92 @@
+"""
+导出文件读取基准：生成不同大小的课程导出文件（export_course_json 的 JSON 与 JSON Lines 两种格式），比较
+  - load:    json.load 整体解析后再过滤（原 CourseStorage.load_target_courses / CourseStatusChecker.load_data 的做法）；
+  - stream:  modules/tools/json_stream.iter_courses 逐条读取并过滤（JSON 用内置扫描器，--ijson 时改用 ijson）；
+  - lines:   iter_courses 读取 JSON Lines 文件，
+的耗时与峰值内存（tracemalloc），并校验三者得到的课程相同。
+
+用法:
+    python -m benchmarks.bench_json_stream [--courses 10000 50000] [--rounds 3] [--ijson] [--json out.json]
+"""
+import io
+import os
+import json
+import contextlib
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from benchmarks.common import summarize, print_table, save_json
+from benchmarks.bench_checker import make_snapshots
+from modules.tools.display import export_course_json
+from modules.tools.json_stream import iter_courses
+
+
+def selected(course: dict) -> bool:
+    return course.get("raw_data", {}).get("sfxkbj") == "1"
+
+
+def measure(func: Callable[[], list], rounds: int) -> Dict[str, Any]:
+    samples, peak, result = [], 0, None
+    for _ in range(rounds):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {"time": summarize(samples), "peak": peak, "count": len(result), "result": result}
+
+
+def bench(courses: int, rounds: int, use_ijson: bool, directory: str) -> Dict[str, Any]:
+    data = make_snapshots(random.Random(courses), courses, 1)[0][1]
+    with contextlib.redirect_stdout(io.StringIO()):
+        json_path = export_course_json(data, os.path.join(directory, f"courses_{courses}.json"))
+        lines_path = export_course_json(data, os.path.join(directory, f"courses_{courses}.jsonl"))
+    del data
+
+    def load():
+        with open(json_path, "r", encoding="utf-8") as f:
+            return [0 for c in json.load(f)["courses"] if selected(c)]
+
+    # 三种方式都只计数不保留课程，峰值内存即读取本身的开销
+    results = {
+        "load": measure(load, rounds),
+        "stream": measure(lambda: [0 for _ in iter_courses(json_path, selected, use_ijson=use_ijson)], rounds),
+        "lines": measure(lambda: [0 for _ in iter_courses(lines_path, selected)], rounds),
+    }
+    with open(json_path, "r", encoding="utf-8") as f:
+        expected = [c for c in json.load(f)["courses"] if selected(c)]
+    assert list(iter_courses(json_path, selected, use_ijson=use_ijson)) == expected
+    assert list(iter_courses(lines_path, selected)) == expected
+    for r in results.values():
+        r.pop("result")
+    return {"courses": courses, "size": os.path.getsize(json_path), **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出文件读取耗时与峰值内存基准")
+    parser.add_argument("--courses", type=int, nargs="+", default=[10000, 50000], help="文件中的课程数")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--ijson", action="store_true", help="JSON 文件使用 ijson（需已安装）")
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {str(n): bench(n, args.rounds, args.ijson, directory) for n in args.courses}
+    print(f"\n========== 导出文件读取 ({args.rounds} 轮) ==========")
+    rows = []
+    for r in results.values():
+        for mode in ("load", "stream", "lines"):
+            rows.append([r["courses"], f"{r['size'] / 2 ** 20:.1f}", mode, r[mode]["count"],
+                         f"{r[mode]['time']['mean'] * 1000:.0f}", f"{r[mode]['peak'] / 2 ** 20:.2f}"])
+    print_table(["课程数", "文件(MB)", "方式", "命中", "耗时(ms)", "峰值内存(MB)"], rows)
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
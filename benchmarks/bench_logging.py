@@ -0,0 +1,85 @@
+"""
+日志开销基准：对比每次选课尝试的日志开销
+  - sync: 原有写法（同步写文件，每次尝试都格式化完整的请求与响应）
+  - hot_log: 后台队列写入 + 按消息类型限速 + 延迟格式化
+分别在 DEBUG 与 INFO 级别下测量，单位为微秒/次尝试。
+
+用法:
+    python -m benchmarks.bench_logging [--attempts 20000] [--json out.json]
+"""
+import os
+import time
+import tempfile
+import argparse
+from loguru import logger
+
+from benchmarks.common import print_table, save_json
+from modules.tools import debug_utils
+from modules.tools.debug_utils import init_logger, hot_log
+
+URL = "https://jwxt.shu.edu.cn/jwglxt/xsxk/zzxkyzbjk_xkBcZyZzxkYzb.html?gnmkdm=N253512&su=20240001"
+PAYLOAD = {"jxb_ids": "A" * 32, "kch_id": "0830A000", "qz": "0", "xkkz_id": "371D2220895ED5DDE063F1000A0ABC43",
+           "njdm_id": "2024", "njdm_id_xs": "2024", "zyh_id": "0830", "zyh_id_xs": "0830"}
+HEADERS = {"Referer": URL, "Origin": "https://jwxt.shu.edu.cn", "X-Requested-With": "XMLHttpRequest",
+           "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8"}
+RESPONSE_TEXT = '{"flag":"0","msg":"所选教学班的容量已满，无法选修！"}' + " " * 2000
+
+
+def attempt_sync():
+    logger.info("正在刷新会话状态...")
+    logger.info("会话状态已刷新")
+    logger.debug("准备选课请求 → {}", URL)
+    logger.debug("→ Payload: {}", PAYLOAD)
+    logger.debug("→ Headers: {}", HEADERS)
+    logger.debug("响应文本: {}", RESPONSE_TEXT)
+    logger.error("选课失败: {}", "所选教学班的容量已满")
+
+
+def attempt_hot():
+    hot_log("select.refresh", "INFO", "会话状态已刷新")
+    hot_log("select.request", "DEBUG", "准备选课请求 → {} Payload: {} Headers: {}", URL, PAYLOAD, HEADERS)
+    hot_log("select.response", "DEBUG", "响应文本: {}", lambda: RESPONSE_TEXT[:500])
+    hot_log("select.failed", "ERROR", "选课失败: {}", "所选教学班的容量已满")
+
+
+def _sync_logger(debug: bool, path: str):
+    """原有的 init_logger 配置：同步写文件"""
+    logger.remove()
+    level = "DEBUG" if debug else "INFO"
+    logger.add(path, level=level, encoding="utf-8",
+               format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{line} - {message}")
+    debug_utils._min_level_no = 0
+
+
+def measure(fn, attempts: int) -> float:
+    started = time.perf_counter()
+    for _ in range(attempts):
+        fn()
+    return (time.perf_counter() - started) / attempts * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热路径日志开销基准")
+    parser.add_argument("--attempts", type=int, default=20000)
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for debug in (True, False):
+            level = "DEBUG" if debug else "INFO"
+            _sync_logger(debug, os.path.join(tmp, f"sync_{level}.log"))
+            results[f"sync/{level}"] = measure(attempt_sync, args.attempts)
+            init_logger(debug, os.path.join(tmp, f"hot_{level}.log"), console=False)
+            results[f"hot_log/{level}"] = measure(attempt_hot, args.attempts)
+            logger.complete()
+        logger.remove()
+
+    print(f"\n========== 每次尝试的日志开销 ({args.attempts} 次) ==========")
+    print_table(["方式/级别", "微秒/次"], [[k, f"{v:.2f}"] for k, v in results.items()])
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+目标方案优化器基准：随机生成课程目录（每个教学班每周 1~2 次课，周次与单双周随机），
+测量 optimize_targets 在不同规模下求出最优方案与备选方案的耗时及搜索结果。
+
+用法:
+    python -m benchmarks.bench_optimizer [--courses 6 10 14] [--classes 12] [--rounds 20] [--json out.json]
+"""
+import time
+import random
+import argparse
+from typing import Any, Dict, List
+
+from benchmarks.common import summarize, print_table, save_json
+from functions.target_optimizer import optimize_targets
+from modules.tools.timetable import SlotIndex
+
+WEEKDAYS = "一二三四五"
+WEEK_SPECS = ("1-10周", "1-10周", "1-10周", "1-9周(单)", "2-10周(双)", "1-5周", "6-10周")
+
+
+def random_sksj(rng: random.Random) -> str:
+    times = []
+    for _ in range(rng.choice((1, 1, 2))):
+        start = rng.choice((1, 3, 5, 7, 9, 11))
+        times.append(f"星期{rng.choice(WEEKDAYS)}第{start}-{start + 1}节{{{rng.choice(WEEK_SPECS)}}}")
+    return ";".join(times)
+
+
+def make_catalog(rng: random.Random, courses: int, classes: int) -> List[Dict[str, Any]]:
+    catalog = []
+    for c in range(courses):
+        for k in range(classes):
+            capacity = rng.choice((30, 60, 120))
+            catalog.append({
+                "kch_id": f"C{c:03d}", "jxb_id": f"C{c:03d}-{k:02d}", "kcmc": f"课程{c:03d}",
+                "sksj": random_sksj(rng), "jxbrs": str(capacity), "krrl": "0",
+                "yxzrs": str(rng.randint(capacity // 2, capacity + 5)),
+            })
+    return catalog
+
+
+def bench(courses: int, classes: int, rounds: int, top_k: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    samples, covered = [], []
+    for _ in range(rounds):
+        catalog = make_catalog(rng, courses, classes)
+        fixed = SlotIndex.from_courses([{"kch_id": "FIXED", "sksj": random_sksj(rng)}])
+        preferences = {c["jxb_id"]: rng.uniform(0.5, 3) for c in catalog}
+        started = time.perf_counter()
+        plans = optimize_targets(catalog, preferences, fixed, top_k=top_k)
+        samples.append(time.perf_counter() - started)
+        covered.append(plans[0]["covered"] if plans else 0)
+    return {"time": summarize(samples), "covered_mean": sum(covered) / len(covered)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="目标方案优化器耗时基准")
+    parser.add_argument("--courses", type=int, nargs="+", default=[6, 10, 14], help="想选的课程数")
+    parser.add_argument("--classes", type=int, default=12, help="每门课程的教学班数")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=5, help="返回的方案数")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    results = {str(n): bench(n, args.classes, args.rounds, args.top_k, args.seed) for n in args.courses}
+    print(f"\n========== 目标方案优化器 (每门 {args.classes} 个教学班, {args.rounds} 轮) ==========")
+    rows = [[n, int(n) * args.classes, f"{r['covered_mean']:.1f}", f"{r['time']['mean'] * 1000:.2f}",
+             f"{r['time']['p50'] * 1000:.2f}", f"{r['time']['p99'] * 1000:.2f}"] for n, r in results.items()]
+    print_table(["课程数", "教学班数", "平均选上门数", "平均(ms)", "p50(ms)", "p99(ms)"], rows)
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+录制/回放基准：先在本地模拟教务系统上录制一次完整流程（登录、提取参数、搜索、选课、课表、考试），
+之后完全离线地回放夹具，测量各环节的解析与编排耗时。全速回放时网络耗时为零，
+测得的就是客户端自身的开销；--realtime 则按录制时的耗时回放。
+
+也可以用 --fixture 指定真实教务系统上录制的夹具（见 modules/tools/http_recorder.py）。
+
+用法:
+    python -m benchmarks.bench_replay [--rounds 50] [--realtime] [--fixture flow.jsonl.gz] [--json out.json]
+"""
+import os
+import time
+import tempfile
+import argparse
+from typing import Dict, Any, Callable
+from loguru import logger
+import requests
+
+from benchmarks.common import summarize, print_table, save_json
+from benchmarks.mock_jwxt import MockJwxtServer
+from modules.tools.http_recorder import RecordingSession, ReplaySession
+from modules.services.login_service import LoginService
+from modules.services.param_service import ParamService
+from modules.services.search_service import SearchService
+from modules.services.select_service import SelectService
+from modules.services.schedule_service import ScheduleService
+from modules.services.exam_service import ExamService
+
+SID = "20240001"
+PWD = "mock-password"
+YEAR, TERM = 2025, 2
+
+
+def run_flow(session, base_url: str, sso_url: str, timings: Dict[str, list] = None):
+    """
+    在给定会话上执行一次完整流程，timings 不为空时记录各环节耗时
+    :return: 各环节返回码
+    """
+    def timed(name: str, fn: Callable):
+        started = time.perf_counter()
+        res = fn()
+        if timings is not None:
+            timings.setdefault(name, []).append(time.perf_counter() - started)
+        return res
+
+    login = LoginService(base_url, sso_url=sso_url, session=session)
+    codes = {"login": timed("login", lambda: login.login(SID, PWD))["code"]}
+    res_params = timed("params", lambda: ParamService(login.sess, base_url).extract())
+    codes["params"] = res_params["code"]
+    params = res_params.get("data") or {}
+    res_search = timed("search", lambda: SearchService(login.sess, base_url).search(
+        SID, params, YEAR, TERM, "01", 1, 50, "模拟课程01"))
+    codes["search"] = res_search["code"]
+    courses = res_search.get("data") or []
+    if courses:
+        codes["select"] = timed("select", lambda: SelectService(login.sess, base_url).select(
+            SID, courses[0], params))["code"]
+    codes["schedule"] = timed("schedule", lambda: ScheduleService(login.sess, base_url).get(YEAR, TERM, SID))["code"]
+    codes["exam"] = timed("exam", lambda: ExamService(login.sess, base_url).get(YEAR, TERM, SID))["code"]
+    return codes
+
+
+def record_fixture(path: str, latency: float) -> Dict[str, Any]:
+    """在模拟服务器上录制一次完整流程"""
+    with MockJwxtServer({"latency": latency}) as server:
+        session = RecordingSession(requests.Session(), path, secrets=[SID])
+        try:
+            codes = run_flow(session, server.base_url, server.sso_url)
+        finally:
+            session.close()
+        return {"codes": codes, "base_url": server.base_url, "sso_url": server.sso_url}
+
+
+def bench_replay(path: str, base_url: str, sso_url: str, rounds: int, realtime: bool) -> Dict[str, Any]:
+    """重复回放夹具，统计各环节耗时"""
+    timings: Dict[str, list] = {}
+    misses = 0
+    for _ in range(rounds):
+        session = ReplaySession(path, realtime=realtime)
+        run_flow(session, base_url, sso_url, timings)
+        misses += session.misses
+    results = {name: summarize(samples) for name, samples in timings.items()}
+    results["misses"] = misses
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录制/回放基准（离线剖析解析与编排开销）")
+    parser.add_argument("--rounds", type=int, default=50, help="回放次数")
+    parser.add_argument("--latency", type=float, default=0.02, help="录制时模拟服务器基础延迟(秒)")
+    parser.add_argument("--realtime", action="store_true", help="按录制时的耗时回放")
+    parser.add_argument("--fixture", help="已有夹具路径；不存在时录制到该路径")
+    parser.add_argument("--base-url", default="http://127.0.0.1", help="回放已有夹具时使用的教务系统地址")
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    logger.remove()
+    tmp = tempfile.TemporaryDirectory()
+    path = args.fixture or os.path.join(tmp.name, "flow.jsonl.gz")
+    base_url, sso_url = args.base_url, args.base_url + "/login/mock"
+    if not os.path.exists(path):
+        recorded = record_fixture(path, args.latency)
+        base_url, sso_url = recorded["base_url"], recorded["sso_url"]
+        print(f"已录制夹具 {path} ({os.path.getsize(path)} 字节)，返回码: {recorded['codes']}")
+
+    results = bench_replay(path, base_url, sso_url, args.rounds, args.realtime)
+    tmp.cleanup()
+
+    mode = "按原始耗时" if args.realtime else "全速"
+    print(f"\n========== 回放基准 ({mode}, {args.rounds} 次) ==========")
+    rows = [[name, r["count"], f"{r['mean'] * 1000:.2f}", f"{r['p50'] * 1000:.2f}", f"{r['p90'] * 1000:.2f}",
+             f"{r['p99'] * 1000:.2f}"] for name, r in results.items() if isinstance(r, dict)]
+    print_table(["环节", "次数", "平均(ms)", "p50(ms)", "p90(ms)", "p99(ms)"], rows)
+    if results["misses"]:
+        print(f"⚠️ 有 {results['misses']} 个请求在夹具中没有匹配")
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
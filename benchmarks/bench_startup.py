@@ -0,0 +1,107 @@
+"""
+冷启动基准：每轮启动一个全新的 Python 进程，执行与 main.py 相同的启动路径
+（导入 AppOrchestrator、初始化日志、构造服务并登录本地模拟教务系统），测量
+  - interpreter: 空解释器启动耗时（基线）
+  - import: 进程内导入 functions.app_orchestrator 的耗时
+  - first_login: 从创建进程到模拟服务器收到第一个登录请求的时间
+  - login_done: 从创建进程到登录完成的时间
+--importtime 额外打印一次 python -X importtime 中累计耗时最多的模块。
+
+用法:
+    python -m benchmarks.bench_startup [--rounds 10] [--importtime] [--json out.json]
+"""
+import os
+import sys
+import time
+import json
+import tempfile
+import argparse
+import subprocess
+from typing import Dict, Any, List
+
+from benchmarks.common import summarize, print_table, save_json
+from benchmarks.mock_jwxt import MockJwxtServer
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import sys, time, json
+started = time.perf_counter()
+from functions.app_orchestrator import AppOrchestrator
+imported = time.perf_counter()
+base_url, sso_url, log_path, storage_dir = sys.argv[1:5]
+orchestrator = AppOrchestrator(base_url, "20240001", "mock-password", 2025, 2, False, storage_dir=storage_dir,
+                               log_path=log_path, console_log=False, sso_url=sso_url)
+res = orchestrator.login.login(orchestrator.sid, orchestrator.pwd)
+print(json.dumps({"import": imported - started, "code": res["code"], "done_at": time.time()}))
+"""
+
+
+def _spawn(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + args, cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+
+
+def bench_interpreter(rounds: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        _spawn(["-c", "pass"])
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def bench_cold_start(rounds: int, latency: float) -> Dict[str, Dict[str, Any]]:
+    samples = {"import": [], "first_login": [], "login_done": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(rounds):
+            # 每轮使用新的模拟服务器，以便记录本轮第一个登录请求的到达时间
+            with MockJwxtServer({"latency": latency}) as server:
+                spawned_at = time.time()
+                proc = _spawn(["-c", CHILD, server.base_url, server.sso_url,
+                               os.path.join(tmp, f"cold_{i}.log"), tmp])
+                result = json.loads(proc.stdout.strip().splitlines()[-1])
+                if result["code"] != 1000:
+                    raise RuntimeError(f"登录失败：{result}")
+                samples["import"].append(result["import"])
+                samples["first_login"].append(server.state.first_seen["login"] - spawned_at)
+                samples["login_done"].append(result["done_at"] - spawned_at)
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def print_importtime(top: int = 15):
+    """打印导入 functions.app_orchestrator 时累计耗时最多的模块"""
+    proc = _spawn(["-X", "importtime", "-c", "import functions.app_orchestrator"])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+    print(f"\n导入耗时 Top {top}（-X importtime，累计）:")
+    print_table(["模块", "累计(ms)", "自身(ms)"], [[n, f"{c / 1000:.1f}", f"{s / 1000:.1f}"] for c, s, n in rows[:top]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动到首次登录请求的基准")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟服务器延迟(秒)")
+    parser.add_argument("--importtime", action="store_true", help="打印导入耗时最多的模块")
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    results = {"interpreter": bench_interpreter(args.rounds)}
+    results.update(bench_cold_start(args.rounds, args.latency))
+
+    print(f"\n========== 冷启动基准 ({args.rounds} 轮) ==========")
+    rows = [[name, f"{r['mean'] * 1000:.1f}", f"{r['p50'] * 1000:.1f}", f"{r['p90'] * 1000:.1f}"]
+            for name, r in results.items()]
+    print_table(["阶段", "平均(ms)", "p50(ms)", "p90(ms)"], rows)
+    if args.importtime:
+        print_importtime()
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+换班基准：在本地模拟教务系统上比较两种换班方式下，服务端观察到的名额空窗
+（退课生效到新教学班选上的间隔）：
+  - naive: 依次调用 drop_course 与 select_course（各自先刷新会话，相当于网页上先退课再选课）；
+  - swap:  CourseSelector.swap_course（确认名额后，用预先构造好的请求连续发出退课与选课）。
+
+用法:
+    python -m benchmarks.bench_swap [--latency 0.02] [--rounds 30] [--json out.json]
+"""
+import argparse
+from typing import Any, Dict
+
+from loguru import logger
+
+from benchmarks.common import summarize, print_table, save_json
+from benchmarks.mock_jwxt import MockJwxtServer
+from modules.services.login_service import LoginService
+from modules.services.param_service import ParamService
+from modules.course_selector import CourseSelector
+
+SID = "20240001"
+PWD = "mock-password"
+
+
+def bench(mode: str, latency: float, rounds: int) -> Dict[str, Any]:
+    with MockJwxtServer({"latency": latency, "jitter": latency / 4, "courses": rounds}) as server:
+        login = LoginService(server.base_url, sso_url=server.sso_url)
+        if login.login(SID, PWD)["code"] != 1000:
+            raise RuntimeError("登录失败")
+        params = ParamService(login.sess, server.base_url).extract()["data"]
+        selector = CourseSelector(login.sess, server.base_url)
+        classes = {}
+        for cls in server.state.catalog:
+            classes.setdefault(cls["kch_id"], []).append(dict(cls))
+        failures, client_gaps = 0, []
+        for current, preferred, *_ in classes.values():
+            if selector.select_course(SID, current, params)["code"] != 1000:
+                raise RuntimeError("选课失败")
+            if mode == "naive":
+                ok = selector.drop_course(SID, current, params)["code"] == 1000 and \
+                    selector.select_course(SID, preferred, params)["code"] == 1000
+            else:
+                res = selector.swap_course(SID, current, preferred, params)
+                ok = res["code"] == 1000
+                client_gaps.append(res["data"].get("gap_ms", 0.0) / 1000)
+            failures += not ok
+        windows = list(server.state.swap_windows)
+    return {"window": summarize(windows), "client_gap": summarize(client_gaps), "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="换班名额空窗基准")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟服务端延迟(秒)")
+    parser.add_argument("--rounds", type=int, default=30, help="换班次数")
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    logger.remove()
+    results = {mode: bench(mode, args.latency, args.rounds) for mode in ("naive", "swap")}
+    print(f"\n========== 换班名额空窗 (服务端延迟 {args.latency * 1000:.0f}ms, {args.rounds} 次) ==========")
+    rows = [[mode, r["failures"], f"{r['window']['mean'] * 1000:.2f}", f"{r['window']['p50'] * 1000:.2f}",
+             f"{r['window']['p99'] * 1000:.2f}", f"{r['client_gap']['mean'] * 1000:.3f}" if r["client_gap"]["count"] else "-"]
+            for mode, r in results.items()]
+    print_table(["方式", "失败次数", "空窗均值(ms)", "空窗p50(ms)", "空窗p99(ms)", "客户端间隔(ms)"], rows)
+    if args.json:
+        save_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
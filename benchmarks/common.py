@@ -0,0 +1,53 @@
+"""
+基准测试的公共工具：分位数统计与结果输出
+"""
+import json
+import os
+from typing import Dict, List, Any, Sequence
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """
+    计算分位数（最近邻法）
+    :param samples: 样本（无需排序）
+    :param q: 分位数，取值 0~1
+    :return: 分位数值；无样本时返回 0
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """返回样本的数量、均值与 p50/p90/p99"""
+    if not samples:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0}
+    return {
+        "count": len(samples),
+        "mean": sum(samples) / len(samples),
+        "p50": percentile(samples, 0.5),
+        "p90": percentile(samples, 0.9),
+        "p99": percentile(samples, 0.99),
+    }
+
+
+def print_table(headers: List[str], rows: List[List[Any]]):
+    """打印对齐的文本表格（不依赖 tabulate）"""
+    cells = [[str(h) for h in headers]] + [[str(c) for c in row] for row in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(headers))]
+    for n, row in enumerate(cells):
+        print("  ".join(c.ljust(w) for c, w in zip(row, widths)))
+        if n == 0:
+            print("  ".join("-" * w for w in widths))
+
+
+def save_json(data: Any, path: str):
+    """保存结果为 JSON 文件"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 结果已保存到: {os.path.abspath(path)}")
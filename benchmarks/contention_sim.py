@@ -0,0 +1,212 @@
+"""
+contention_sim.py
+~~~~~~~~~~~~~~~~~
+抢课竞争模拟器：大量虚拟客户端按不同策略（间隔、随机化、并发、退避）争抢同一教学班的座位，
+座位随机释放、也会被其他学生随机占用，统计各策略的“抢到座位所需时间”分布，
+用数据为 CourseSniper.config 选择默认值。
+
+模拟采用离散事件（虚拟时间），几分钟的竞争可在数秒内跑完。每个客户端的每条循环（lane）
+对应真实抢课循环中只有一个目标的情形：一次失败后先等待 compute_wait_time（按退避放大），
+再等待一轮结束后的 compute_round_wait，两者都直接使用 functions.course_sniper 中的实现。
+randomize 只打乱多个目标的尝试顺序，单目标时没有影响，模拟中不起作用。
+策略中 "round_wait": false 可去掉每轮结束后的等待，用来评估不同的循环结构。
+
+用法:
+    python -m benchmarks.contention_sim [--runs 20] [--horizon 600] [--strategies my_strategies.json] [--json out.json]
+"""
+import heapq
+import json
+import random
+import argparse
+from typing import Dict, List, Any, Optional
+
+from benchmarks.common import summarize, print_table, save_json
+from functions.course_sniper import compute_wait_time, compute_round_wait
+
+# 策略：除 CourseSniper.config 的键外，concurrency 表示每个客户端同时进行的独立抢课循环数，
+# round_wait 为 false 时不模拟每轮结束后的等待（默认模拟，与真实循环一致）
+DEFAULT_STRATEGIES = {
+    "默认(1-3s,退避1.5)": {"interval_min": 1, "interval_max": 3, "backoff_factor": 1.5, "concurrency": 1, "clients": 40},
+    "快速(0.3-0.8s)": {"interval_min": 0.3, "interval_max": 0.8, "backoff_factor": 1.5, "concurrency": 1, "clients": 40},
+    "快速无退避": {"interval_min": 0.3, "interval_max": 0.8, "backoff_factor": 1.0, "concurrency": 1, "clients": 40},
+    "固定1s无随机": {"interval_min": 1, "interval_max": 1, "backoff_factor": 1.0, "concurrency": 1, "clients": 40},
+    "1-3s并发3": {"interval_min": 1, "interval_max": 3, "backoff_factor": 1.5, "concurrency": 3, "clients": 40},
+    "慢速(3-6s)": {"interval_min": 3, "interval_max": 6, "backoff_factor": 1.5, "concurrency": 1, "clients": 40},
+}
+
+# 环境：选课接口与座位变化
+DEFAULT_ENV = {
+    "initial_free": 3,        # 开放时空余座位
+    "free_rate": 0.05,        # 平均每秒释放座位数（有人退课）
+    "take_rate": 0.02,        # 平均每秒被模拟之外的学生占用的座位数
+    "base_latency": 0.08,     # 单次往返基础耗时(秒)
+    "latency_sigma": 0.35,    # 耗时对数正态分布的 sigma
+    "server_capacity": 50,    # 服务器并发容量，在途请求越多耗时越长
+    "round_trips": 2,         # 每次尝试的往返数（刷新会话 + 选课）
+    "start_spread": 2.0,      # 客户端在开放后多少秒内陆续开始
+    "horizon": 600.0,         # 模拟时长(秒)
+}
+
+
+class SimSelectEndpoint:
+    """选课接口的本地替身：维护空余座位与在途请求数"""
+
+    def __init__(self, env: Dict[str, Any], rng: random.Random):
+        self.env = env
+        self.rng = rng
+        self.free = env["initial_free"]
+        self.inflight = 0
+
+    def latency(self) -> float:
+        """按当前负载采样一次往返耗时"""
+        load = 1.0 + self.inflight / max(1, self.env["server_capacity"])
+        return self.env["base_latency"] * load * self.rng.lognormvariate(0.0, self.env["latency_sigma"])
+
+    def try_take(self) -> bool:
+        """请求到达服务器时尝试占座"""
+        if self.free > 0:
+            self.free -= 1
+            return True
+        return False
+
+
+class Client:
+    """虚拟客户端"""
+
+    def __init__(self, cid: int, strategy: str, config: Dict[str, Any]):
+        self.cid = cid
+        self.strategy = strategy
+        self.config = config
+        self.backoff = [1.0] * max(1, config.get("concurrency", 1))
+        self.seated_at: Optional[float] = None
+        self.holding = False
+        self.attempts = 0
+
+
+def simulate(strategies: Dict[str, Dict[str, Any]], env: Dict[str, Any], seed: int) -> List[Client]:
+    """
+    运行一次模拟
+    :param strategies: 策略名 -> 策略配置（含 clients 客户端数量）
+    :param env: 环境配置
+    :param seed: 随机种子
+    :return: 全部客户端（含是否抢到及用时）
+    """
+    rng = random.Random(seed)
+    endpoint = SimSelectEndpoint(env, rng)
+    clients: List[Client] = []
+    for name, config in strategies.items():
+        for _ in range(config.get("clients", 1)):
+            clients.append(Client(len(clients), name, config))
+
+    events = []
+    seq = 0
+
+    def push(t, kind, cid=-1, lane=0):
+        nonlocal seq
+        heapq.heappush(events, (t, seq, kind, cid, lane))
+        seq += 1
+
+    for c in clients:
+        for lane in range(len(c.backoff)):
+            push(rng.uniform(0, env["start_spread"]), "send", c.cid, lane)
+    if env["free_rate"] > 0:
+        push(rng.expovariate(env["free_rate"]), "free")
+    if env["take_rate"] > 0:
+        push(rng.expovariate(env["take_rate"]), "take")
+
+    horizon = env["horizon"]
+    while events:
+        t, _, kind, cid, lane = heapq.heappop(events)
+        if t > horizon:
+            break
+        if kind == "free":
+            endpoint.free += 1
+            push(t + rng.expovariate(env["free_rate"]), "free")
+        elif kind == "take":
+            endpoint.try_take()
+            push(t + rng.expovariate(env["take_rate"]), "take")
+        elif kind == "send":
+            client = clients[cid]
+            if client.seated_at is not None:
+                continue
+            client.attempts += 1
+            endpoint.inflight += 1
+            # 前 round_trips-1 个往返为会话刷新，最后一个往返的一半到达选课处理逻辑
+            lat = [endpoint.latency() for _ in range(env["round_trips"])]
+            push(t + sum(lat[:-1]) + lat[-1] / 2, "arrive", cid, lane)
+            push(t + sum(lat), "respond", cid, lane)
+        elif kind == "arrive":
+            client = clients[cid]
+            # 已占座的客户端重复选同一课程不会再占用座位
+            if not client.holding and endpoint.try_take():
+                client.holding = True
+        elif kind == "respond":
+            endpoint.inflight -= 1
+            client = clients[cid]
+            if client.seated_at is not None:
+                continue
+            if client.holding:
+                client.seated_at = t
+                continue
+            client.backoff[lane] *= client.config.get("backoff_factor", 1.0)
+            # 与 CourseSniper.start 相同：尝试后的退避等待 + 一轮结束后的等待
+            wait = compute_wait_time(client.config, client.backoff[lane], rng)
+            if client.config.get("round_wait", True):
+                wait += compute_round_wait(client.config, rng)
+            push(t + wait, "send", cid, lane)
+    return clients
+
+
+def run(strategies: Dict[str, Dict[str, Any]], env: Dict[str, Any], runs: int, seed: int) -> Dict[str, Any]:
+    """多次重复模拟并按策略汇总"""
+    times: Dict[str, List[float]] = {name: [] for name in strategies}
+    attempts: Dict[str, List[int]] = {name: [] for name in strategies}
+    totals: Dict[str, int] = {name: 0 for name in strategies}
+    for r in range(runs):
+        for c in simulate(strategies, env, seed + r):
+            totals[c.strategy] += 1
+            attempts[c.strategy].append(c.attempts)
+            if c.seated_at is not None:
+                times[c.strategy].append(c.seated_at)
+    report = {}
+    for name in strategies:
+        stats = summarize(times[name])
+        stats["win_rate"] = len(times[name]) / totals[name] if totals[name] else 0.0
+        stats["attempts_per_client"] = sum(attempts[name]) / totals[name] if totals[name] else 0.0
+        report[name] = stats
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抢课竞争模拟器")
+    parser.add_argument("--runs", type=int, default=20, help="重复模拟次数")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--horizon", type=float, default=DEFAULT_ENV["horizon"], help="每次模拟时长(秒)")
+    parser.add_argument("--strategies", help="策略 JSON 文件（策略名 -> 配置），默认使用内置策略")
+    parser.add_argument("--env", help="环境 JSON 文件，覆盖 DEFAULT_ENV")
+    parser.add_argument("--json", help="结果保存路径")
+    args = parser.parse_args()
+
+    strategies = DEFAULT_STRATEGIES
+    if args.strategies:
+        with open(args.strategies, "r", encoding="utf-8") as f:
+            strategies = json.load(f)
+    env = {**DEFAULT_ENV, "horizon": args.horizon}
+    if args.env:
+        with open(args.env, "r", encoding="utf-8") as f:
+            env.update(json.load(f))
+
+    report = run(strategies, env, args.runs, args.seed)
+    ranked = sorted(report.items(), key=lambda kv: (-kv[1]["win_rate"], kv[1]["p50"]))
+    print(f"\n========== 抢课竞争模拟 ({args.runs} 次 × {env['horizon']:.0f} 秒, "
+          f"{sum(s.get('clients', 1) for s in strategies.values())} 个客户端) ==========")
+    rows = [[name, f"{r['win_rate'] * 100:.1f}%", f"{r['p50']:.1f}", f"{r['p90']:.1f}", f"{r['p99']:.1f}",
+             f"{r['attempts_per_client']:.0f}"] for name, r in ranked]
+    print_table(["策略", "抢到比例", "p50(秒)", "p90(秒)", "p99(秒)", "人均请求"], rows)
+    print("注: 用时从选课开放算起，仅统计抢到座位的客户端；人均请求反映对服务器的压力。")
+    if args.json:
+        save_json({"env": env, "strategies": strategies, "report": report}, args.json)
+
+
+if __name__ == "__main__":
+    main()
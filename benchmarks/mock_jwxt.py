@@ -0,0 +1,444 @@
+"""
+mock_jwxt.py
+~~~~~~~~~~~~
+本地模拟教务系统：实现项目用到的全部接口（SSO 登录、index_initMenu、选课首页、
+PartDisplay 搜索、xkBcZyZzxkYzb 选课、ChoosedDisplay 已选课程、kscx 考试查询），
+延迟、并发容量、失败率、会话过期率都可以配置，用于基准测试与离线回归。
+
+单独运行:
+    python -m benchmarks.mock_jwxt --port 8080 --latency 0.05 --failure-rate 0.01
+在代码中使用:
+    server = MockJwxtServer({"latency": 0.02}).start()
+    LoginService(server.base_url, sso_url=server.sso_url).login("20240001", "pwd")
+"""
+import json
+import time
+import random
+import uuid
+import socket
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, Any, List
+
+# 接口路径 -> 接口名（用于分接口配置延迟与统计）
+ROUTES = {
+    ("GET", "/"): "index",
+    ("GET", "/jwglxt/xtgl/index_initMenu.html"): "menu",
+    ("GET", "/jwglxt/xsxk/zzxkyzb_cxZzxkYzbIndex.html"): "refresh",
+    ("POST", "/jwglxt/xsxk/zzxkyzb_cxZzxkYzbPartDisplay.html"): "search",
+    ("POST", "/jwglxt/xsxk/zzxkyzbjk_xkBcZyZzxkYzb.html"): "select",
+    ("POST", "/jwglxt/xsxk/zzxkyzb_tuikBcZzxkYzb.html"): "drop",
+    ("POST", "/jwglxt/xsxk/zzxkyzb_cxZzxkYzbChoosedDisplay.html"): "schedule",
+    ("POST", "/jwglxt/kwgl/kscx_cxXsksxxIndex.html"): "exam",
+}
+
+DEFAULT_CONFIG = {
+    "latency": 0.01,            # 基础延迟(秒)
+    "jitter": 0.005,            # 延迟随机抖动上限(秒)
+    "endpoint_latency": {},     # 按接口覆盖基础延迟，例如 {"select": 0.2}
+    "capacity": 0,              # 同时处理的最大请求数，0 表示不限
+    "reject_when_busy": False,  # 超出容量时直接返回 503，否则排队
+    "failure_rate": 0.0,        # 返回 502 的概率
+    "expire_rate": 0.0,         # 已登录请求被判定为会话过期（返回统一认证页）的概率
+    "courses": 200,             # 课程数量
+    "classes_per_course": 3,    # 每门课的教学班数
+    "capacity_per_class": 60,   # 每个教学班容量
+    "free_seats": 5,            # 每个教学班初始空余座位，0 表示初始全满
+    "select_open_after": 0.0,   # 服务启动多少秒后开放选课
+    "seat_release_interval": 0.0,  # 每隔多少秒随机释放一个已满教学班的座位，0 表示不释放
+    "exams": 20,                # 每个学生的考试数量
+    "seed": 42,
+    "year": "2025",
+    "term": "12",
+}
+
+WEEKDAYS = "一二三四五六日"
+LOGIN_PAGE = "<html><head><title>上海大学统一认证</title></head><body>用户登录</body></html>"
+INDEX_PAGE = "<html><head><title>教学管理信息服务平台</title></head><body>教学管理信息服务平台</body></html>"
+
+
+class MockState:
+    """模拟服务器的内存状态：课程目录、会话、已选课程与统计"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.rng = random.Random(config["seed"])
+        self.lock = threading.Lock()
+        self.first_seen: Dict[str, float] = {}  # 接口 -> 首次收到请求的时间戳
+        self.started = time.time()
+        self.sessions: Dict[str, str] = {}            # JSESSIONID -> 学号
+        self.chosen: Dict[str, Dict[str, str]] = {}   # 学号 -> {kch_id: jxb_id}
+        # 退课后名额空窗：(学号, kch_id) -> 退课时间；同一课程再次选上时记下间隔(秒)到 swap_windows
+        self.dropped_at: Dict[tuple, float] = {}
+        self.swap_windows: List[float] = []
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.classes: Dict[str, Dict[str, Any]] = {}
+        self.catalog: List[Dict[str, Any]] = self._build_catalog()
+        limit = config["capacity"]
+        self.slots = threading.BoundedSemaphore(limit) if limit else None
+
+    def _build_catalog(self) -> List[Dict[str, Any]]:
+        rng = self.rng
+        catalog = []
+        for c in range(self.config["courses"]):
+            kch_id = f"0830A{c:03d}"
+            kcmc = f"模拟课程{c:03d}"
+            for k in range(self.config["classes_per_course"]):
+                day = rng.randrange(7)
+                start = rng.choice((1, 3, 5, 7, 9, 11))
+                capacity = self.config["capacity_per_class"]
+                item = {
+                    "kch_id": kch_id,
+                    "kch": kch_id,
+                    "kcmc": kcmc,
+                    "jxb_id": uuid.UUID(int=rng.getrandbits(128)).hex.upper(),
+                    "jxbmc": f"{kcmc}-{k + 1:02d}",
+                    "jsxx": f"{1000 + c}/教师{c:03d}{k}/讲师",
+                    "xf": str(rng.choice((1, 2, 3, 4))),
+                    "sksj": f"星期{WEEKDAYS[day]}第{start}-{start + 1}节{{1-10周}}",
+                    "jxdd": f"校本部A{rng.randrange(100, 600)}",
+                    "jxbrs": str(capacity),
+                    "jxbrl": str(capacity),
+                    "krrl": "0",
+                    "yxzrs": str(max(0, capacity - self.config["free_seats"])),
+                    "kklxdm": "01",
+                }
+                catalog.append(item)
+                self.classes[item["jxb_id"]] = item
+        return catalog
+
+    def record(self, endpoint: str, outcome: str):
+        with self.lock:
+            counter = self.stats.setdefault(endpoint, {})
+            counter[outcome] = counter.get(outcome, 0) + 1
+
+    def release_seat(self):
+        """随机释放一个已满教学班的座位"""
+        with self.lock:
+            full = [c for c in self.classes.values() if int(c["yxzrs"]) >= int(c["jxbrs"])]
+            if full:
+                target = self.rng.choice(full)
+                target["yxzrs"] = str(int(target["yxzrs"]) - 1)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """请求处理器，server.state 为 MockState"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # 响应头与响应体分两次写出，关闭 Nagle 避免与客户端延迟确认叠加出约 40ms 的额外延迟
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, fmt, *args):
+        pass
+
+    @property
+    def state(self) -> MockState:
+        return self.server.state
+
+    # ---------- 通用 ----------
+
+    def _send(self, status: int, body, content_type: str = "text/html; charset=utf-8", cookies: Dict[str, str] = None):
+        if not isinstance(body, (bytes, str)):
+            body = json.dumps(body, ensure_ascii=False)
+            content_type = "application/json;charset=UTF-8"
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (cookies or {}).items():
+            self.send_header("Set-Cookie", f"{k}={v}; Path=/")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _form(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+        return {k: v[-1] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+
+    def _student(self):
+        cookie = self.headers.get("Cookie", "")
+        for part in cookie.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "JSESSIONID":
+                return self.state.sessions.get(value)
+        return None
+
+    def _delay(self, endpoint: str):
+        cfg = self.state.config
+        base = cfg["endpoint_latency"].get(endpoint, cfg["latency"])
+        time.sleep(base + random.uniform(0, cfg["jitter"]))
+
+    def _dispatch(self, method: str):
+        path = urlparse(self.path).path
+        if method == "POST" and path.startswith("/login/"):
+            endpoint = "login"
+        elif path == "/__mock__/stats":
+            with self.state.lock:
+                return self._send(200, {"stats": self.state.stats, "sessions": len(self.state.sessions)})
+        else:
+            endpoint = ROUTES.get((method, path))
+        form = self._form() if method == "POST" else {}
+        if endpoint is None:
+            self.state.record("unknown", "404")
+            return self._send(404, "not found")
+        with self.state.lock:
+            self.state.first_seen.setdefault(endpoint, time.time())
+
+        slots = self.state.slots
+        if slots is not None:
+            if not slots.acquire(blocking=not self.state.config["reject_when_busy"]):
+                self.state.record(endpoint, "503")
+                return self._send(503, "Service Unavailable")
+        try:
+            self._delay(endpoint)
+            if random.random() < self.state.config["failure_rate"]:
+                self.state.record(endpoint, "502")
+                return self._send(502, "Bad Gateway")
+            getattr(self, f"_handle_{endpoint}")(form)
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _require_login(self, endpoint: str):
+        """校验会话；未登录或随机过期时返回统一认证页并返回 None"""
+        sid = self._student()
+        if sid is None or random.random() < self.state.config["expire_rate"]:
+            self.state.record(endpoint, "expired")
+            self._send(200, LOGIN_PAGE)
+            return None
+        return sid
+
+    # ---------- 接口 ----------
+
+    def _handle_login(self, form):
+        sid = form.get("username", "")
+        if not sid or not form.get("password"):
+            self.state.record("login", "rejected")
+            return self._send(200, LOGIN_PAGE)
+        token = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.sessions[token] = sid
+            self.state.chosen.setdefault(sid, {})
+        self.state.record("login", "ok")
+        self._send(200, INDEX_PAGE, cookies={"JSESSIONID": token})
+
+    def _handle_index(self, form):
+        if self._require_login("index"):
+            self.state.record("index", "ok")
+            self._send(200, INDEX_PAGE)
+
+    def _handle_menu(self, form):
+        if self._require_login("menu"):
+            self.state.record("menu", "ok")
+            self._send(200, "<ul id='menu'></ul>")
+
+    def _handle_refresh(self, form):
+        if not self._require_login("refresh"):
+            return
+        cfg = self.state.config
+        fields = {"rwlx": "1", "xkly": "1", "zyh_id": "0830", "njdm_id": "2024", "bh_id": "24083001",
+                  "xkxnm": cfg["year"], "xkxqm": cfg["term"], "kklxdm": "01"}
+        inputs = "".join(f'<input type="hidden" name="{k}" id="{k}" value="{v}"/>\n' for k, v in fields.items())
+        inputs += '<input type="hidden" name="zyh_id_1" id="zyh_id_1" value="0830"/>\n'
+        inputs += '<input type="hidden" name="njdm_id_1" id="njdm_id_1" value="2024"/>\n'
+        self.state.record("refresh", "ok")
+        self._send(200, f"<html><body><form>{inputs}</form></body></html>")
+
+    def _handle_search(self, form):
+        if not self._require_login("search"):
+            return
+        keyword = form.get("filter_list[0]", "")
+        kspage = int(form.get("kspage") or 1)
+        jspage = int(form.get("jspage") or 10)
+        with self.state.lock:
+            matched = [dict(c) for c in self.state.catalog
+                       if not keyword or keyword in c["kcmc"] or keyword in c["kch_id"] or keyword in c["jsxx"]]
+        page = matched[kspage - 1:jspage]
+        self.state.record("search", "ok")
+        if not page:
+            return self._send(200, '"0"', "application/json;charset=UTF-8")
+        self._send(200, {"tmpList": page, "sfxsjc": "1"})
+
+    def _handle_select(self, form):
+        sid = self._require_login("select")
+        if not sid:
+            return
+        state = self.state
+        if time.time() - state.started < state.config["select_open_after"]:
+            state.record("select", "not_open")
+            return self._send(200, {"flag": "0", "msg": "当前不在选课时间内"})
+        jxb_id = form.get("jxb_ids", "")
+        with state.lock:
+            cls = state.classes.get(jxb_id)
+            chosen = state.chosen.setdefault(sid, {})
+            if cls is None:
+                outcome, body = "invalid", {"flag": "0", "msg": "教学班不存在"}
+            elif chosen.get(cls["kch_id"]) == jxb_id:
+                outcome, body = "duplicate", {"flag": "0", "msg": "该教学班已选"}
+            elif cls["kch_id"] in chosen:
+                outcome, body = "conflict", {"flag": "0", "msg": "一门课程只能选一个教学班"}
+            elif int(cls["yxzrs"]) >= int(cls["jxbrs"]) + int(cls["krrl"]):
+                outcome, body = "full", {"flag": "0", "msg": "所选教学班的容量已满"}
+            else:
+                cls["yxzrs"] = str(int(cls["yxzrs"]) + 1)
+                chosen[cls["kch_id"]] = jxb_id
+                dropped = state.dropped_at.pop((sid, cls["kch_id"]), None)
+                if dropped is not None:
+                    state.swap_windows.append(time.perf_counter() - dropped)
+                outcome, body = "ok", {"flag": "1", "msg": "选课成功"}
+        state.record("select", outcome)
+        self._send(200, body)
+
+    def _handle_drop(self, form):
+        sid = self._require_login("drop")
+        if not sid:
+            return
+        state = self.state
+        jxb_id = form.get("jxb_ids", "")
+        with state.lock:
+            cls = state.classes.get(jxb_id)
+            chosen = state.chosen.setdefault(sid, {})
+            if cls is None or chosen.get(cls["kch_id"]) != jxb_id:
+                outcome, body = "invalid", "该教学班未选或已退选"
+            else:
+                del chosen[cls["kch_id"]]
+                cls["yxzrs"] = str(int(cls["yxzrs"]) - 1)
+                state.dropped_at[(sid, cls["kch_id"])] = time.perf_counter()
+                outcome, body = "ok", '"1"'
+        state.record("drop", outcome)
+        # 与真实接口一致：成功返回 "1"，失败返回提示文本
+        self._send(200, body, *(("application/json;charset=UTF-8",) if outcome == "ok" else ()))
+
+    def _handle_schedule(self, form):
+        sid = self._require_login("schedule")
+        if not sid:
+            return
+        with self.state.lock:
+            items = [dict(self.state.classes[j], sfxkbj="1") for j in self.state.chosen.get(sid, {}).values()]
+        self.state.record("schedule", "ok")
+        self._send(200, items)
+
+    def _handle_exam(self, form):
+        sid = self._require_login("exam")
+        if not sid:
+            return
+        total = self.state.config["exams"]
+        show = max(1, int(form.get("queryModel.showCount") or 15))
+        current = max(1, int(form.get("queryModel.currentPage") or 1))
+        items = []
+        for i in range((current - 1) * show, min(total, current * show)):
+            items.append({
+                "xh": sid, "xm": "模拟学生", "kch": f"0830A{i:03d}", "kcmc": f"模拟课程{i:03d}",
+                "kssj": f"2026-01-{10 + i % 15:02d}({8 + i % 3 * 2:02d}:00-{10 + i % 3 * 2:02d}:00)",
+                "cdmc": f"A{100 + i}", "cdxqmc": "宝山", "zwh": str(i + 1), "ksmc": "期末考试",
+                "jsxx": f"教师{i:03d}", "jxbmc": f"模拟课程{i:03d}-01", "kkxy": "计算机学院",
+                "xf": "2", "ksfs": "闭卷", "sjbh": f"P{i:04d}", "cxbj": "0", "bz1": "",
+            })
+        self.state.record("exam", "ok")
+        self._send(200, {"items": items, "totalCount": total, "totalPage": (total + show - 1) // show,
+                         "currentPage": current, "showCount": show})
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # listen() 在构造时调用，backlog 必须在类上设置才会生效
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class MockJwxtServer:
+    """在后台线程中运行的模拟教务系统"""
+
+    def __init__(self, config: Dict[str, Any] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        :param config: 覆盖 DEFAULT_CONFIG 的配置
+        :param host: 监听地址
+        :param port: 监听端口，0 表示随机端口
+        """
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self.state = MockState(self.config)
+        self.httpd = _HTTPServer((host, port), MockHandler)
+        self.httpd.state = self.state
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def sso_url(self) -> str:
+        return f"{self.base_url}/login/mock"
+
+    def start(self) -> "MockJwxtServer":
+        self.state.started = time.time()
+        serve = threading.Thread(target=self.httpd.serve_forever, name="mock-jwxt", daemon=True)
+        serve.start()
+        self._threads.append(serve)
+        interval = self.config["seat_release_interval"]
+        if interval > 0:
+            releaser = threading.Thread(target=self._release_loop, args=(interval,), daemon=True)
+            releaser.start()
+            self._threads.append(releaser)
+        return self
+
+    def _release_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.state.release_seat()
+
+    def stop(self):
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self.state.lock:
+            return json.loads(json.dumps(self.state.stats))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟教务系统")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=DEFAULT_CONFIG["latency"])
+    parser.add_argument("--jitter", type=float, default=DEFAULT_CONFIG["jitter"])
+    parser.add_argument("--capacity", type=int, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--expire-rate", type=float, default=0.0)
+    parser.add_argument("--free-seats", type=int, default=DEFAULT_CONFIG["free_seats"])
+    parser.add_argument("--config", help="JSON 配置文件，覆盖以上参数")
+    args = parser.parse_args()
+
+    config = {"latency": args.latency, "jitter": args.jitter, "capacity": args.capacity,
+              "failure_rate": args.failure_rate, "expire_rate": args.expire_rate, "free_seats": args.free_seats}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    server = MockJwxtServer(config, args.host, args.port).start()
+    print(f"模拟教务系统已启动: {server.base_url}  (SSO: {server.sso_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
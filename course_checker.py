@@ -1,94 +1,85 @@
-import json
 import os
-from prettytable import PrettyTable
+import argparse
 
 # 文件路径配置
 COURSE_FILE_PATH = "schedule_2025_2.json"
+# 课程数组在导出文件中的位置：{"courses": [...]}、{"data": {"courses": [...]}} 或顶层数组
+SNAPSHOT_PREFIXES = ("courses", "data.courses", "")
 
 
 class CourseStatusChecker:
-    def __init__(self, file_path):
-        self.file_path = file_path
-        self.courses_data = []
+    def __init__(self, file_path, where=None):
+        """
+        :param file_path: 导出的课表 JSON（或 JSON Lines）文件；传入多个文件时视为按时间先后的多份快照
+        :param where: 课程过滤条件，读取时即丢弃不满足的课程
+        """
+        self.file_paths = [file_path] if isinstance(file_path, str) else list(file_path)
+        self.file_path = self.file_paths[-1]
+        self.where = where
+        self.snapshots = []
+        self._analysis = None
+        self._rows = None
 
     def load_data(self):
-        if not os.path.exists(self.file_path):
-            print(f"❌ 文件不存在: {self.file_path}")
-            return False
+        self.snapshots, self._analysis, self._rows = [], None, None
+        for path in self.file_paths:
+            if not os.path.exists(path):
+                print(f"❌ 文件不存在: {path}")
+                return False
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, dict):
-                self.courses_data = data.get("courses", []) or data.get("data", {}).get("courses", [])
-            elif isinstance(data, list):
-                self.courses_data = data
-            return True
+            self._read()
         except Exception as e:
             print(f"❌ 读取错误: {e}")
             return False
-
-    def analyze_course(self, course_data):
-        raw = course_data.get("raw_data", {})
-
-        # 1. 基础信息
-        title = course_data.get("title", "未知")
-        teacher = course_data.get("teacher", "未知")
-        credit = course_data.get("credit", 0)
-
-        # 2. 核心数据
-        base_capacity = int(raw.get("jxbrs", 0))  # 基础 (70)
-        expansion = int(raw.get("krrl", 0))  # 扩容 (10)
-        enrolled = int(raw.get("yxzrs", 0))  # 已选 (145)
-
-        # 总计 = 基础 + 扩容
-        total_capacity = base_capacity + expansion
-
-        # 3. 状态判定逻辑
-        # 🟢 已选上：总计 >= 已选
-        # 🔴 待筛选：总计 < 已选
-        # (前提是 sfxkbj=1)
-        is_in_list = raw.get("sfxkbj") == "1"
-
-        if not is_in_list:
-            status_str = "⚪ 未选"
-        else:
-            if total_capacity >= enrolled:
-                status_str = "🟢 已选上"
-            else:
-                status_str = "🔴 待筛选"
-
-        # 4. 容量显示格式 (70+10 格式)
-        if expansion > 0:
-            capacity_display = f"{enrolled}/{base_capacity}+{expansion}"
+        self.snapshots = [os.path.basename(path) for path in self.file_paths]
+        return True
+
+    def _read(self):
+        """
+        逐条读取各文件中的课程（不整体载入文件）并分析：多份快照或行数较多时用列式流水线，
+        单份小快照逐门计算（构造 DataFrame 的开销大于计算本身）
+        """
+        from modules.tools.capacity_analytics import snapshot_frame, analyze_frame, analyze_course, FRAME_MIN_ROWS
+        from modules.tools.json_stream import iter_courses
+        if len(self.file_paths) == 1:
+            path = self.file_paths[0]
+            courses = list(iter_courses(path, self.where, SNAPSHOT_PREFIXES))
+            if len(courses) < FRAME_MIN_ROWS:
+                self._rows = [analyze_course(c) for c in courses]
+                return
+            snapshots = [(os.path.basename(path), courses)]
         else:
-            capacity_display = f"{enrolled}/{base_capacity}"
+            snapshots = ((os.path.basename(path), iter_courses(path, self.where, SNAPSHOT_PREFIXES))
+                         for path in self.file_paths)
+        self._analysis = analyze_frame(snapshot_frame(snapshots))
+
+    @property
+    def analysis(self):
+        """所有快照、所有课程的分析结果（DataFrame，见 modules/tools/capacity_analytics.py），只计算一次"""
+        if self._analysis is None:
+            from modules.tools.capacity_analytics import snapshot_frame, analyze_frame
+            from modules.tools.json_stream import iter_courses
+            self._analysis = analyze_frame(snapshot_frame(
+                (os.path.basename(path), iter_courses(path, self.where, SNAPSHOT_PREFIXES)) for path in self.file_paths
+            ))
+        return self._analysis
+
+    def latest_rows(self):
+        """最后一份快照的分析结果，逐行返回字典"""
+        if self._rows is None:
+            from modules.tools.capacity_analytics import latest, display_columns
+            self._rows = display_columns(latest(self.analysis)).to_dict("records")
+        return self._rows
 
-        # 5. 选课率
-        if total_capacity > 0:
-            rate = (enrolled / total_capacity) * 100
-        else:
-            rate = 0
-
-        return {
-            "title": title,
-            "teacher": teacher,
-            "credit": credit,
-            "base_capacity": base_capacity,
-            "expansion": expansion,
-            "total_capacity": total_capacity,
-            "enrolled": enrolled,
-            "capacity_display": capacity_display,
-            "remaining": total_capacity - enrolled,
-            "rate": rate,
-            "status_str": status_str,
-            # 详情用
-            "course_id": course_data.get("course_id"),
-            "time": course_data.get("time", "").replace('\n', ' '),
-            "place": course_data.get("place", "").replace('\n', ' ')
-        }
+    def analyze_course(self, course_data):
+        """分析单门课程（与表格结果相同），返回字段同 latest_rows"""
+        from modules.tools.capacity_analytics import analyze_course
+        return analyze_course(course_data)
 
     def display_table(self):
-        if not self.courses_data: return
+        rows = self.latest_rows()
+        if not rows: return
+        from prettytable import PrettyTable
 
         print(f"\n📚 课程选课状况表")
 
@@ -114,9 +105,7 @@ class CourseStatusChecker:
         # 增加内边距，不那么拥挤
         table.padding_width = 1
 
-        processed = [self.analyze_course(c) for c in self.courses_data]
-
-        for idx, c in enumerate(processed, 1):
+        for idx, c in enumerate(rows, 1):
             # 标题截断优化 (稍微宽一点)
             title_display = c["title"][:18] + "..." if len(c["title"]) > 18 else c["title"]
 
@@ -137,8 +126,7 @@ class CourseStatusChecker:
     def display_detail(self):
         print("\n📖 课程详细信息")
         print("=" * 60)
-        for idx, c_data in enumerate(self.courses_data, 1):
-            c = self.analyze_course(c_data)
+        for idx, c in enumerate(self.latest_rows(), 1):
             print(f"{idx}. {c['title']} ({c['teacher']})")
             print(f"   🆔 课程号: {c['course_id']}")
             print(f"   👥 容量: {c['capacity_display']} (基础{c['base_capacity']} + 扩容{c['expansion']})")
@@ -148,10 +136,28 @@ class CourseStatusChecker:
             print(f"   📍 地点: {c['place']}")
             print("-" * 40)
 
+    def display_trends(self):
+        """多份快照时，显示各教学班已选人数与扩容的变化"""
+        if len(self.snapshots) < 2:
+            return
+        from prettytable import PrettyTable
+        from modules.tools.capacity_analytics import snapshot_trends
+        trends = snapshot_trends(self.analysis)
+        print(f"\n📈 {len(self.snapshots)} 份快照间的变化（{self.snapshots[0]} → {self.snapshots[-1]}）")
+        table = PrettyTable()
+        table.field_names = ["课程名称", "快照数", "已选变化", "扩容变化", "最高选课率", "最近状态"]
+        table.align["课程名称"] = "l"
+        for row in trends.itertuples():
+            title = row.title[:18] + "..." if len(row.title) > 18 else row.title
+            table.add_row([title, row.snapshots, f"{row.first_enrolled} → {row.last_enrolled} ({row.change:+d})",
+                           f"{row.expansion_change:+d}", f"{row.max_rate:.1f}%", row.status_str])
+        print(table)
+
     def run(self):
         if not self.load_data(): return
 
         self.display_table()
+        self.display_trends()
 
         while True:
             print("\n[1] 显示课程详细信息  [2] 退出")
@@ -165,5 +171,34 @@ class CourseStatusChecker:
                 print("❌ 无效输入")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="课程选课状况查看")
+    parser.add_argument("file", nargs="*", default=[COURSE_FILE_PATH],
+                        help="导出的课表 JSON 或 JSON Lines 文件；多个文件按先后视为多份快照，额外显示变化")
+    parser.add_argument("--keyword", help="只分析课程名称、教师或课程号包含该关键字的课程")
+    parser.add_argument("--profile", nargs="?", const="profile", metavar="DIR",
+                        help="非交互地剖析数据加载与表格生成，结果保存到 DIR（默认 profile/）")
+    args = parser.parse_args()
+
+    where = None
+    if args.keyword:
+        def where(course):
+            return any(args.keyword in str(course.get(name) or "") for name in ("title", "teacher", "course_id"))
+    checker = CourseStatusChecker(args.file, where)
+    if not args.profile:
+        checker.run()
+        return
+
+    from modules.tools.profiler import Profiler
+    profiler = Profiler(args.profile)
+    with profiler.section("load"):
+        loaded = checker.load_data()
+    if loaded:
+        with profiler.section("table"):
+            checker.display_table()
+            checker.display_trends()
+    profiler.report()
+
+
 if __name__ == "__main__":
-    CourseStatusChecker(COURSE_FILE_PATH).run()
\ No newline at end of file
+    main()
\ No newline at end of file
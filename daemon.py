@@ -0,0 +1,147 @@
+"""
+常驻进程入口：登录一次后保持会话、选课参数与课程目录缓存，通过本机控制接口接受命令
+
+用法:
+    SHU_SID=学号 SHU_PWD=密码 python daemon.py serve daemon_config.json [--port 9465 | --socket /tmp/shu.sock]
+    python daemon.py ctl status
+    python daemon.py ctl search 高等数学
+    python daemon.py ctl add <jxb_id> [<jxb_id> ...]
+    python daemon.py ctl remove <jxb_id>
+    python daemon.py ctl plan 高等数学 大学英语 [--apply 1]
+    python daemon.py ctl start | pause | resume | stop | targets | shutdown
+
+配置文件格式同 snipe.py，另可包含:
+    "control_port": 9465, "control_socket": "/tmp/shu.sock", "control_token_env": "SHU_DAEMON_TOKEN",
+    "control_token_file": "data/daemon.token",
+    "catalog_keywords": ["高等数学"], "catalog_ttl": 300, "keepalive": 300
+未设置 SHU_DAEMON_TOKEN 时启动时生成随机令牌并写入令牌文件（0600），ctl 自动读取。
+也可以直接用 curl 调用，例如
+    curl --unix-socket /tmp/shu.sock -H "Authorization: Bearer $(cat data/daemon.token)" http://localhost/status；
+POST/DELETE 须带 -H "Content-Type: application/json"。
+接口列表见 functions/daemon.py。
+"""
+import os
+import sys
+import json
+import argparse
+from urllib.parse import quote
+
+from functions.daemon import DEFAULT_CONTROL_PORT, DEFAULT_TOKEN_FILE
+
+# ctl 子命令 -> (方法, 路径)
+COMMANDS = {
+    "status": ("GET", "/status"),
+    "targets": ("GET", "/targets"),
+    "start": ("POST", "/job/start"),
+    "pause": ("POST", "/job/pause"),
+    "resume": ("POST", "/job/resume"),
+    "stop": ("POST", "/job/stop"),
+    "shutdown": ("POST", "/shutdown"),
+}
+
+
+def serve(args):
+    from functions.run_config import load_run_config
+    from functions.app_orchestrator import AppOrchestrator
+    from functions.daemon import SniperDaemon
+
+    run_cfg = load_run_config(args.config)
+    if not run_cfg["sid"] or not run_cfg["pwd"]:
+        print("❌ 缺少学号或密码，请设置环境变量 SHU_SID / SHU_PWD")
+        sys.exit(1)
+
+    orchestrator = AppOrchestrator(
+        run_cfg["base_url"], run_cfg["sid"], run_cfg["pwd"], run_cfg["year"], run_cfg["term"],
+        run_cfg.get("debug", False),
+        hedge=run_cfg.get("hedge", False),
+        pool_size=run_cfg.get("pool_size", 1),
+        sso_url=run_cfg.get("sso_url"),
+        metrics_port=run_cfg.get("metrics_port", 0),
+        metrics_socket=run_cfg.get("metrics_socket"),
+        json_logs=run_cfg.get("json_logs"),
+    )
+    print(f"日志文件：{orchestrator.log_path}")
+    daemon = SniperDaemon(
+        orchestrator,
+        port=args.port if args.port is not None else run_cfg.get("control_port", DEFAULT_CONTROL_PORT),
+        unix_socket=args.socket or run_cfg.get("control_socket"),
+        token=os.getenv(run_cfg.get("control_token_env", "SHU_DAEMON_TOKEN")),
+        token_file=args.token_file or run_cfg.get("control_token_file", DEFAULT_TOKEN_FILE),
+        catalog_keywords=run_cfg.get("catalog_keywords", []),
+        catalog_ttl=run_cfg.get("catalog_ttl", 300),
+        keepalive=run_cfg.get("keepalive", 300),
+        config=run_cfg["config"],
+        max_duration=run_cfg["max_duration"],
+    )
+    if not daemon.start(run_cfg["targets"]):
+        print("❌ 登录或提取选课参数失败")
+        sys.exit(1)
+    print(f"✅ 常驻进程已就绪，控制接口: {daemon.address}")
+    try:
+        daemon.wait()
+    finally:
+        daemon.close()
+
+
+def ctl(args):
+    from functions.daemon import DaemonClient
+
+    client = DaemonClient(args.port or DEFAULT_CONTROL_PORT, unix_socket=args.socket,
+                          token=os.getenv("SHU_DAEMON_TOKEN"), token_file=args.token_file or DEFAULT_TOKEN_FILE)
+    if args.command in COMMANDS:
+        method, path = COMMANDS[args.command]
+        body = {"max_duration": args.duration} if args.command == "start" and args.duration is not None else None
+        res = client.call(method, path, body)
+    elif args.command == "search" and args.args:
+        res = client.call("GET", f"/catalog?q={quote(' '.join(args.args), safe='')}")
+    elif args.command == "add" and args.args:
+        res = client.call("POST", "/targets", {"jxb_ids": args.args})
+    elif args.command == "plan" and args.args:
+        res = client.call("POST", "/plan", {"keywords": args.args, "apply": args.apply})
+    elif args.command == "remove" and len(args.args) == 1:
+        res = client.call("DELETE", f"/targets/{args.args[0]}")
+    else:
+        print(f"❌ 无效的命令或参数: {args.command} {' '.join(args.args)}")
+        sys.exit(1)
+
+    if args.command == "status" and res["code"] == 1000:
+        print(res["data"]["line"])
+    elif args.command == "search" and res["code"] == 1000:
+        from modules.tools.display import display_course_info
+        display_course_info({"courses": res["data"]})
+    elif args.command == "plan" and res["code"] == 1000:
+        from modules.tools.display import display_target_plans
+        display_target_plans(res["data"])
+        print(f"\n{res['msg']}")
+    else:
+        print(json.dumps(res, ensure_ascii=False, indent=2))
+    sys.exit(0 if res["code"] == 1000 else 1)
+
+
+def run():
+    parser = argparse.ArgumentParser(description="上海大学选课助手 - 常驻进程")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    p_serve = sub.add_parser("serve", help="登录并启动常驻进程")
+    p_serve.add_argument("config", help="运行配置文件 (JSON)")
+    p_serve.add_argument("--port", type=int, help=f"控制接口端口（默认 {DEFAULT_CONTROL_PORT}，仅监听本机回环）")
+    p_serve.add_argument("--socket", help="改为监听该 Unix 套接字路径")
+    p_serve.add_argument("--token-file", help=f"控制令牌写入的文件（默认 {DEFAULT_TOKEN_FILE}）")
+    p_serve.set_defaults(func=serve)
+
+    p_ctl = sub.add_parser("ctl", help="向常驻进程发送命令")
+    p_ctl.add_argument("command", help="status/targets/search/add/remove/plan/start/pause/resume/stop/shutdown")
+    p_ctl.add_argument("args", nargs="*", help="search/plan 的关键词，add/remove 的教学班ID")
+    p_ctl.add_argument("--port", type=int, help="控制接口端口")
+    p_ctl.add_argument("--socket", help="控制接口 Unix 套接字路径")
+    p_ctl.add_argument("--token-file", help=f"控制令牌文件（默认 {DEFAULT_TOKEN_FILE}）")
+    p_ctl.add_argument("--duration", type=int, help="start 时的最大运行时间(秒)")
+    p_ctl.add_argument("--apply", type=int, default=0, help="plan 时把该序号的方案加入抢课列表")
+    p_ctl.set_defaults(func=ctl)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    run()
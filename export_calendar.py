@@ -0,0 +1,89 @@
+"""
+日历导出入口：把本地课表库（functions/schedule_store.py）中的课表与导出的考试 JSON 写成 iCalendar
+
+用法:
+    python export_calendar.py --term 2025-2:2026-02-23 -o calendar.ics
+    python export_calendar.py --term 2025-1:2025-09-08 --term 2025-2:2026-02-23 \\
+        --store data/accounts/20240001 --store data/accounts/20240002 --exams exams_2025_2.json --vdir ~/.calendars/shu
+
+--term 为 学年-学期:第1周星期一的日期，可重复；--store 为课表库所在目录（默认 data），可重复，
+多个目录一起导出时以目录名区分事件；--vdir 改为增量同步到 vdir 目录（只重写变化的事件，
+只删除本次成功读取的学期、学生中已不存在的事件）。
+各学期、各学生的数据逐个读取，事件逐条写出。
+"""
+import os
+import sys
+import json
+import argparse
+import datetime
+
+
+def parse_term(text: str):
+    term, _, start = text.partition(":")
+    year, _, number = term.partition("-")
+    return int(year), int(number), datetime.date.fromisoformat(start)
+
+
+def iter_events(stores, terms, exam_files, scopes=None):
+    """
+    逐个读取课表与考试并产生事件
+    :param scopes: 传入列表时，每读取一个来源（学生的某个学期、考试文件）就追加其 UID 前缀，
+                   跳过的来源不追加，供 sync_vdir 只删除这些来源中已不存在的事件
+    """
+    from functions.schedule_store import ScheduleStore
+    from modules.tools.calendar_export import schedule_events, exam_events
+
+    for store_dir in stores:
+        if not os.path.isdir(os.path.join(store_dir, "schedules")):
+            print(f"⚠️ {store_dir} 下没有本地课表，跳过")
+            continue
+        store = ScheduleStore(store_dir)
+        prefix = f"{os.path.basename(os.path.normpath(store_dir))}-" if len(stores) > 1 else ""
+        for year, term, start in terms:
+            local = store.load(year, term)
+            if local is None:
+                print(f"⚠️ {store_dir} 没有 {year}-{term} 的课表，请先在菜单中查看一次课表以同步")
+                continue
+            scope = f"{prefix}{year}-{term}-"
+            if scopes is not None:
+                scopes.append(scope)
+            yield from schedule_events(local["courses"], start, uid_prefix=scope)
+    for path in exam_files:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        prefix = f"{data.get('sid')}-" if len(exam_files) > 1 and data.get("sid") else ""
+        if scopes is not None:
+            scopes.append(f"{prefix}exam-")
+        yield from exam_events(data.get("courses", []), uid_prefix=prefix)
+
+
+def run():
+    parser = argparse.ArgumentParser(description="上海大学选课助手 - 课表与考试日历导出")
+    parser.add_argument("--term", action="append", default=[], type=parse_term,
+                        help="学年-学期:第1周星期一的日期，例如 2025-2:2026-02-23")
+    parser.add_argument("--store", action="append", help="课表库所在目录（默认 data）")
+    parser.add_argument("--exams", action="append", default=[], help="export_exam_json 导出的考试 JSON")
+    out = parser.add_mutually_exclusive_group(required=True)
+    out.add_argument("-o", "--output", help="输出的 .ics 文件")
+    out.add_argument("--vdir", help="增量同步到该 vdir 目录（一个事件一个文件）")
+    args = parser.parse_args()
+    if not args.term and not args.exams:
+        parser.error("至少需要 --term 或 --exams")
+    missing = [path for path in args.exams if not os.path.exists(path)]
+    if missing:
+        parser.error(f"考试文件不存在: {', '.join(missing)}")
+
+    from modules.tools.calendar_export import write_ics, sync_vdir
+    scopes = []
+    events = iter_events(args.store or ["data"], args.term, args.exams, scopes)
+    if args.vdir:
+        stats = sync_vdir(args.vdir, events, scopes)
+        print(f"✅ 已同步到 {args.vdir}：更新 {stats['written']}，未变 {stats['unchanged']}，删除 {stats['removed']}")
+    else:
+        count = write_ics(args.output, events, name="上海大学课表")
+        print(f"✅ 已导出 {count} 个事件到 {args.output}")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    run()
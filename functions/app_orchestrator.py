@@ -1,28 +1,63 @@
 import sys
 import time
-from modules.tools.display import display_course_info, select_course_interactive, display_schedule_text, export_schedule_json, display_exam_text, export_exam_json
+import contextlib
+from loguru import logger
 from modules.tools.debug_utils import init_logger
+from modules.tools.http_timing import instrument_session
 from modules.services.login_service import LoginService
 from modules.services.param_service import ParamService
 from modules.services.search_service import SearchService
 from modules.services.select_service import SelectService
 from functions.course_sniper import CourseSniper
+from functions.job_manager import JobManager
 from functions.course_storage import CourseStorage
+from functions.schedule_store import ScheduleStore
+from functions.result import ok, err
+from utils import wait_until, is_interrupted
 
 class AppOrchestrator:
-    def __init__(self, base_url: str, sid: str, pwd: str, year: int, term: int, debug_flag: bool = True):
+    def __init__(self, base_url: str, sid: str, pwd: str, year: int, term: int, debug_flag: bool = True,
+                 hedge: bool = False, pool_size: int = 1, storage_dir: str = "data",
+                 log_path: str = None, console_log: bool = True, sso_url: str = None, session=None,
+                 metrics_port: int = 0, metrics_socket: str = None, json_logs: bool = None, profiler=None):
         self.base_url = base_url
         self.sid = sid
         self.pwd = pwd
         self.year = year
         self.term = term
         self.debug_flag = debug_flag
-        self.log_path = init_logger(self.debug_flag)
-        self.login = LoginService(self.base_url)
+        self.hedge = hedge
+        self.pool_size = pool_size
+        self.pool = None
+        self.log_path = init_logger(self.debug_flag, log_path, console_log, json_logs)
+        self.sso_url = sso_url
+        # session 可传入 RecordingSession/ReplaySession，用于录制或离线回放整个流程
+        self.login = LoginService(self.base_url, sso_url=sso_url, session=session)
+        # 共享会话上挂载计时适配器，按接口统计 DNS/建连/TLS/首字节/下载耗时
+        self.timings = instrument_session(self.login.sess)
         self.selector = None
         self.sniper = None
+        # 交互式菜单中的后台抢课任务
+        self.jobs = None
+        self._job_reported = True
         self.course_params = None
-        self.storage = CourseStorage()
+        self.storage = CourseStorage(storage_dir)
+        # 本地课表库：多学期同步、变更记录，有效期内查看课表不请求教务系统
+        self.schedules = ScheduleStore(storage_dir)
+        # 监控指标：metrics_port > 0 时监听本机回环端口，metrics_socket 指定时监听 Unix 套接字
+        self.metrics_port = metrics_port
+        self.metrics_socket = metrics_socket
+        self.metrics = None
+        # 剖析器（modules.tools.profiler.Profiler），为空时不剖析
+        self.profiler = profiler
+
+    def _profile(self, name: str):
+        """开启剖析时返回对应阶段的上下文，否则为空上下文"""
+        return self.profiler.section(name) if self.profiler else contextlib.nullcontext()
+
+    def _max_duration(self, max_duration: int) -> int:
+        """剖析时抢课必须有界"""
+        return self.profiler.bound_duration(max_duration) if self.profiler else max_duration
 
     def _login_and_prepare(self) -> bool:
         res_login = self.login.login(self.sid, self.pwd)
@@ -34,23 +69,160 @@ class AppOrchestrator:
             print(f"提取选课参数失败：{params_result['msg']}")
             return False
         self.course_params = params_result["data"]
-        self.selector = SelectService(self.login.sess, self.base_url)
-        self.sniper = CourseSniper(self.selector.selector, self.sid, self.course_params)
+        self.selector = SelectService(self.login.sess, self.base_url, hedge=self.hedge)
+        select_backend = self.selector.selector
+        if self.pool_size > 1:
+            from modules.session_pool import SessionPool
+            self.pool = SessionPool(self.base_url, self.sid, self.pwd, self.pool_size,
+                                    hedge=self.hedge, primary=self.login, sso_url=self.sso_url,
+                                    timings=self.timings)
+            res_pool = self.pool.start()
+            if res_pool["code"] != 1000:
+                print(f"会话池初始化失败：{res_pool['msg']}")
+                return False
+            select_backend = self.pool
+        self.sniper = CourseSniper(select_backend, self.sid, self.course_params, self.storage, self.timings)
+        self.sniper.slot_index = self._load_slot_index()
+        self.sniper.capacity_provider = self._search_capacity
+        self.jobs = JobManager(self.sniper, self._profile)
+        if (self.metrics_port or self.metrics_socket) and self.metrics is None:
+            from functions.metrics import MetricsServer
+            self.metrics = MetricsServer(self.sniper, self.metrics_port, unix_socket=self.metrics_socket).start()
+        elif self.metrics is not None:
+            self.metrics.attach(self.sniper)
+        return True
+
+    def _load_slot_index(self):
+        """读取当前课表并建立时间索引，抢课前据此排除必然冲突的目标；课表获取失败时不做冲突检查"""
+        from modules.tools.timetable import SlotIndex
+        res = self.schedules.get(self.year, self.term, self._fetch_schedule, force=True)
+        if res["code"] == 1000 and res["data"]["changes"]:
+            logger.info("课表自上次同步以来有 {} 处变化", len(res["data"]["changes"]))
+        if res["code"] == 1000:
+            return SlotIndex.from_courses(res["data"]["courses"])
+        if res["code"] == 1001:
+            return SlotIndex()
+        logger.warning("获取课表失败，跳过时间冲突检查：{}", res["msg"])
+        return None
+
+    def _search_capacity(self, kch_id: str) -> list:
+        """按课程号搜索该课程所有教学班的最新余量，供抢课时在备选教学班间加权轮换"""
+        res = SearchService(self.login.sess, self.base_url).search(
+            self.sid, self.course_params, self.year, self.term, "01", 1, 50, kch_id)
+        return res["data"] if res["code"] == 1000 else []
+
+    def _check_conflicts(self, course: dict, pending: list) -> bool:
+        """
+        提示课程与课表或抢课列表的时间冲突
+        :param pending: 本次搜索中已选但尚未写入抢课列表的课程
+        :return: 与已选课程冲突（必然选不上）时返回 False
+        """
+        from modules.tools.timetable import SlotIndex
+        index = self.sniper.slot_index
+        clash = index.conflicts_with(course) if index is not None else []
+        if clash and not index.is_certain(course, clash):
+            names = "、".join(index.label(k) for k in clash)
+            print(f"\n⚠️ 可能与已选课程 {names} 时间冲突（周次无法识别），请自行确认")
+        elif clash:
+            names = "、".join(index.label(k) for k in clash)
+            print(f"\n❌ 与已选课程 {names} 时间冲突（{index.describe_conflict(course, clash[0])}），未添加")
+            return False
+        targets = SlotIndex.from_courses(self.sniper.load_target_courses() + pending)
+        clash = targets.conflicts_with(course)
+        if clash:
+            names = "、".join(targets.label(k) for k in clash)
+            print(f"\n⚠️ 与抢课列表中的 {names} 时间冲突，最多只能选上其中一门")
+        return True
+
+    def prepare(self) -> bool:
+        """登录、提取选课参数并创建抢课实例（供常驻进程等不走菜单的调用方使用）"""
+        with self._profile("startup"):
+            return self._login_and_prepare()
+
+    def relogin(self) -> bool:
+        """
+        会话过期后在原会话上重新登录并刷新选课参数；抢课实例与后台任务保持不变，
+        新的 Cookie 与参数在下一次选课请求时生效
+        """
+        res_login = self.login.login(self.sid, self.pwd)
+        if res_login["code"] != 1000:
+            logger.error("重新登录失败：{}", res_login["msg"])
+            return False
+        params_result = ParamService(self.login.sess, self.base_url).extract()
+        if params_result["code"] != 1000:
+            logger.error("重新提取选课参数失败：{}", params_result["msg"])
+            return False
+        self.course_params = params_result["data"]
+        if self.sniper is not None:
+            self.sniper.course_params = self.course_params
         return True
 
+    def run_headless(self, courses: list = None, config: dict = None, max_duration: int = 0,
+                     start_at: float = None) -> dict:
+        """
+        非交互式运行：登录、写入目标课程并立即开始抢课
+        :param courses: 目标课程列表，为空时使用已保存的抢课列表
+        :param config: 抢课配置，键与 CourseSniper.config 一致
+        :param max_duration: 最大运行时间(秒)，0表示无限制
+        :param start_at: 开始抢课的时间戳；登录与参数提取会提前完成，到点后再开始
+        :return: 统一返回结构，data 为抢课统计
+        """
+        with self._profile("startup"):
+            prepared = self._login_and_prepare()
+        if not prepared:
+            return err(1002, "登录或提取选课参数失败")
+        if courses and not self.sniper.add_target_courses(courses):
+            return err(1001, "写入目标课程失败")
+        if config:
+            self.sniper.configure(**config)
+        try:
+            if start_at and not wait_until(start_at, "等待抢课开始", is_interrupted):
+                return err(1001, "等待开始时被中断")
+            with self._profile("snipe"):
+                stats = self.sniper.start(self._max_duration(max_duration))
+        finally:
+            self.close()
+        return ok(stats, "抢课结束")
+
     def run_assistant(self):
         print(f"日志文件：{self.log_path}")
-        if not self._login_and_prepare():
+        with self._profile("startup"):
+            prepared = self._login_and_prepare()
+        if not prepared:
             sys.exit(1)
         print("\n✅ 成功提取选课参数")
+        try:
+            self._menu_loop()
+        except (KeyboardInterrupt, EOFError):
+            print("\n\n程序已中止")
+        finally:
+            if self.jobs.active:
+                print("正在停止后台抢课任务...")
+                self.jobs.stop()
+            self.close()
+
+    def close(self):
+        """释放选课与会话池的对冲线程池（抢课结束或退出时调用）"""
+        if self.pool is not None:
+            self.pool.close()
+        if self.selector is not None:
+            self.selector.close()
+
+    def _menu_loop(self):
         while True:
+            self._report_finished_job()
             print("\n========== 上海大学选课助手 ==========")
+            if self.jobs.state != "idle":
+                print(self.jobs.status_line())
             print("1. 搜索课程并添加到抢课列表")
             print("2. 查看当前抢课列表")
-            print("3. 开始抢课")
+            print("3. " + ("管理抢课任务（暂停/继续/停止）" if self.jobs.active else "开始抢课（后台运行）"))
             print("4. 清空抢课列表")
             print("5. 查看当前课表")
             print("6. 查看考试信息")
+            print("7. 从抢课列表移除课程")
+            print("8. 按偏好自动规划抢课列表")
+            print("9. 换班（已选课程换到同一课程的其他教学班）")
             print("0. 退出程序")
             choice = input("\n请选择功能: ")
             if choice == '0':
@@ -61,7 +233,10 @@ class AppOrchestrator:
             elif choice == '2':
                 self.display_target_courses()
             elif choice == '3':
-                self.start_course_sniping()
+                if self.jobs.active:
+                    self.manage_snipe_job()
+                else:
+                    self.start_course_sniping()
             elif choice == '4':
                 if self.storage.clear_all_statuses():
                     self.storage.save_target_courses([])
@@ -72,10 +247,17 @@ class AppOrchestrator:
                 self.view_current_schedule()
             elif choice == '6':
                 self.view_exam_schedule()
+            elif choice == '7':
+                self.remove_target_course()
+            elif choice == '8':
+                self.plan_target_courses()
+            elif choice == '9':
+                self.swap_class()
             else:
                 print("\n❌ 无效的选择，请重新输入")
 
     def search_and_add_courses(self):
+        from modules.tools.display import display_course_info, select_course_interactive
         searcher = SearchService(self.login.sess, self.base_url)
         target_courses = []
         while True:
@@ -87,16 +269,17 @@ class AppOrchestrator:
             if not keyword:
                 print("请输入有效的关键词")
                 continue
-            search_result = searcher.search(
-                student_id=self.sid,
-                params=self.course_params,
-                year=self.year,
-                term=self.term,
-                kklxdm="01",
-                kspage=1,
-                jspage=50,
-                keyW=keyword
-            )
+            with self._profile("search"):
+                search_result = searcher.search(
+                    student_id=self.sid,
+                    params=self.course_params,
+                    year=self.year,
+                    term=self.term,
+                    kklxdm="01",
+                    kspage=1,
+                    jspage=50,
+                    keyW=keyword
+                )
             if search_result["code"] == 1000:
                 if not search_result["data"]:
                     print("❌ 暂无课程数据")
@@ -109,6 +292,8 @@ class AppOrchestrator:
                 add_option = input("\n是否要添加课程到抢课列表? (y/n): ").lower()
                 if add_option == 'y':
                     selected_course = select_course_interactive(search_result["data"])
+                    if selected_course and not self._check_conflicts(selected_course, target_courses):
+                        continue
                     if selected_course:
                         target_courses.append(selected_course)
                         print(f"\n✅ 已添加 {selected_course.get('kcmc', '未知课程')} 到抢课列表")
@@ -117,13 +302,119 @@ class AppOrchestrator:
             else:
                 print(f"搜索课程失败：{search_result['msg']}")
         if target_courses:
-            if self.sniper.add_target_courses(target_courses):
+            if self.sniper.add_target_courses(target_courses, merge=True):
                 print(f"\n✅ 成功添加 {len(target_courses)} 门课程到抢课列表")
+                if self.jobs.active:
+                    print("后台抢课任务将在下一轮开始时纳入新课程")
             else:
                 print("\n❌ 添加课程到抢课列表失败")
         else:
             print("\n未添加任何课程")
 
+    def plan_target_courses(self):
+        from modules.tools.display import display_plan_candidates, display_target_plans
+        from functions.target_optimizer import optimize_targets, with_fallbacks
+        keywords = input("\n请输入想选的课程（课程号或名称，用空格分隔）: ").split()
+        if not keywords:
+            return
+        searcher = SearchService(self.login.sess, self.base_url)
+        candidates, seen = [], set()
+        for keyword in keywords:
+            res = searcher.search(self.sid, self.course_params, self.year, self.term, "01", 1, 50, keyword)
+            if res["code"] != 1000:
+                print(f"搜索 {keyword} 失败：{res['msg']}")
+                continue
+            if not res["data"]:
+                print(f"❌ 没有找到 {keyword}")
+            for course in res["data"]:
+                if course.get("jxb_id") not in seen:
+                    seen.add(course.get("jxb_id"))
+                    candidates.append(course)
+        if not candidates:
+            return
+        display_plan_candidates(candidates)
+        raw = input("\n输入偏好分数，例如 1:3 4:2 7:-1（未填写的为 1 分，-1 表示不考虑；回车跳过）: ").split()
+        preferences = {}
+        for item in raw:
+            index, _, score = item.partition(":")
+            try:
+                preferences[candidates[int(index) - 1]["jxb_id"]] = float(score)
+            except (ValueError, IndexError):
+                print(f"忽略无效的偏好: {item}")
+
+        with self._profile("plan"):
+            plans = optimize_targets(candidates, preferences, self.sniper.slot_index)
+        if not plans:
+            print("\n❌ 没有可行的方案（候选教学班都与课表冲突或被排除）")
+            return
+        display_target_plans(plans)
+        choice = input("\n请选择要加入抢课列表的方案序号 (默认1，0取消): ").strip() or "1"
+        if not choice.isdigit() or not 1 <= int(choice) <= len(plans):
+            print("\n已取消")
+            return
+        plan = plans[int(choice) - 1]
+        courses = plan["courses"]
+        if len(plans) > 1 and input("是否把其他方案中同一课程的教学班作为备选一并加入? (y/n，默认y): ").lower() != 'n':
+            courses = with_fallbacks(plan, plans)
+        if self.sniper.add_target_courses(courses, merge=True):
+            print(f"\n✅ 已添加 {len(plan['courses'])} 门课程（{len(courses)} 个教学班）到抢课列表")
+        else:
+            print("\n❌ 添加课程到抢课列表失败")
+
+    def swap_class(self):
+        from modules.services.schedule_service import ScheduleService
+        from modules.tools.display import display_plan_candidates
+        res = ScheduleService(self.login.sess, self.base_url).get(self.year, self.term, self.sid)
+        if res["code"] != 1000:
+            print(f"\n❌ 获取课表失败：{res['msg']}")
+            return
+        chosen = [c["raw_data"] for c in res["data"].get("courses", []) if c.get("raw_data", {}).get("jxb_id")]
+        if not chosen:
+            print("\n❌ 当前没有已选课程")
+            return
+        display_plan_candidates(chosen)
+        choice = input("\n请选择要换班的课程序号 (0取消): ").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= len(chosen):
+            return
+        current = chosen[int(choice) - 1]
+        others = [c for c in self._search_capacity(current["kch_id"]) if c.get("jxb_id") != current["jxb_id"]]
+        if not others:
+            print("\n❌ 该课程没有其他教学班")
+            return
+        display_plan_candidates(others)
+        choice = input("\n请选择要换到的教学班序号 (0取消): ").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= len(others):
+            return
+        preferred = others[int(choice) - 1]
+        index = self.sniper.slot_index
+        clash = index.conflicts_with(preferred) if index is not None else []
+        if clash and not index.is_certain(preferred, clash):
+            names = "、".join(index.label(k) for k in clash)
+            print(f"\n⚠️ 可能与已选课程 {names} 时间冲突（周次无法识别），请自行确认")
+        elif clash:
+            names = "、".join(index.label(k) for k in clash)
+            print(f"\n❌ 与已选课程 {names} 时间冲突（{index.describe_conflict(preferred, clash[0])}），无法换班")
+            return
+        if input(f"\n确认从 {current.get('jxbmc')} 换到 {preferred.get('jxbmc')}? "
+                 f"将先退课再选课，失败时自动选回原教学班 (y/n): ").lower() != 'y':
+            return
+        with self._profile("swap"):
+            res = self.selector.swap(self.sid, current, preferred, self.course_params,
+                                     seat_lookup=self._search_capacity)
+        data = res["data"]
+        if "window_ms" in data:
+            print(f"\n退课 {data['drop_ms']:.1f}ms，选课 {data['select_ms']:.1f}ms，"
+                  f"两次请求间隔 {data['gap_ms']:.2f}ms，名额空窗约 {data['window_ms']:.1f}ms")
+        if data.get("dropped"):
+            self.schedules.invalidate(self.year, self.term)
+        if res["code"] == 1000:
+            print(f"\n✅ {res['msg']}")
+            if index is not None:
+                index.remove(current["kch_id"])
+                index.add_course(preferred)
+        else:
+            print(f"\n{'⚠️' if res['code'] == 1001 else '❌'} {res['msg']}")
+
     def display_target_courses(self):
         courses = self.sniper.load_target_courses()
         if not courses:
@@ -167,48 +458,144 @@ class AppOrchestrator:
         print(f"尝试间隔: {interval_min}-{interval_max} 秒")
         print(f"最大尝试: {'无限' if max_attempts == 0 else max_attempts} 次/每门课")
         print("抢课顺序: " + ("随机" if randomize else "顺序"))
-        print("\n按 Ctrl+C 可随时中止抢课")
-        countdown_seconds = 3
-        for i in range(countdown_seconds, 0, -1):
-            print(f"\r准备开始... {i} ", end="", flush=True)
-            time.sleep(1)
-        print("\r开始抢课!             ")
-        try:
-            max_duration = 0
-            result = self.sniper.start(max_duration)
-            print("\n========== 抢课结束 ==========")
-            print(f"尝试次数: {result.get('attempts', 0)}")
-            print(f"成功课程: {result.get('successful', 0)}/{result.get('total_courses', 0)}")
-            if result.get('successful', 0) > 0 and 'successful_courses' in result:
-                print("\n成功选上的课程:")
-                for course_id, course_name in result['successful_courses'].items():
-                    print(f"- {course_name} (课程号: {course_id})")
-        except KeyboardInterrupt:
-            print("\n\n抢课已手动中止")
+        res = self.jobs.start(self._max_duration(0))
+        if res["code"] != 1000:
+            print(f"\n❌ {res['msg']}")
+            return
+        self._job_reported = False
+        print(f"\n✅ {res['msg']}，可继续使用菜单；选择 3 可暂停、继续或停止")
 
-    def view_current_schedule(self):
+    def manage_snipe_job(self):
+        print("\n========== 抢课任务 ==========")
+        print(self.jobs.status_line())
+        action = input("p 暂停 / r 继续 / s 停止 / 回车返回: ").strip().lower()
+        if action == 'p':
+            res = self.jobs.pause()
+        elif action == 'r':
+            res = self.jobs.resume()
+        elif action == 's':
+            print("正在停止（等待当前选课请求返回）...")
+            res = self.jobs.stop()
+        else:
+            return
+        print(("\n✅ " if res["code"] == 1000 else "\n❌ ") + res["msg"])
+
+    def _report_finished_job(self):
+        """后台任务结束后，在下次显示菜单时打印一次结果"""
+        if self._job_reported or self.jobs.state != "finished":
+            return
+        self._job_reported = True
+        result = self.jobs.result or {}
+        if result.get('successful', 0) > 0:
+            self.schedules.invalidate(self.year, self.term)
+        print("\n========== 抢课结束 ==========")
+        print(f"尝试次数: {result.get('attempts', 0)}")
+        print(f"成功课程: {result.get('successful', 0)}/{result.get('total_courses', 0)}")
+        if result.get('successful', 0) > 0 and 'successful_courses' in result:
+            print("\n成功选上的课程:")
+            for course_id, course_name in result['successful_courses'].items():
+                print(f"- {course_name} (课程号: {course_id})")
+
+    def remove_target_course(self):
+        courses = self.sniper.load_target_courses()
+        if not courses:
+            print("\n❌ 抢课列表为空")
+            return
+        for i, course in enumerate(courses, 1):
+            print(f"{i}. {course.get('kcmc', '未知课程')} - {course.get('jxbmc', '未知')}")
+        choice = input("\n请输入要移除的课程序号 (回车取消): ").strip()
+        if not choice:
+            return
+        if not choice.isdigit() or not 1 <= int(choice) <= len(courses):
+            print("\n❌ 无效的序号")
+            return
+        course = courses[int(choice) - 1]
+        if self.sniper.remove_target_course(course.get('jxb_id')):
+            print(f"\n✅ 已移除 {course.get('kcmc', '未知课程')}")
+            if self.jobs.active:
+                print("后台抢课任务将在下一轮开始时生效")
+        else:
+            print("\n❌ 移除失败")
+
+    def _fetch_schedule(self, year: int, term: int) -> dict:
         from modules.services.schedule_service import ScheduleService
-        svc = ScheduleService(self.login.sess, self.base_url)
-        res = svc.get(self.year, self.term, self.sid)
-        if res.get("code") != 1000:
-            print(f"\n❌ 获取课表失败：{res.get('msg')}")
+        return ScheduleService(self.login.sess, self.base_url).get(year, term, self.sid)
+
+    def _parse_terms(self, raw: list) -> list:
+        """解析菜单中输入的学年-学期（如 2024-1），当前学期总在第一个"""
+        terms = [(self.year, self.term)]
+        for item in raw:
+            year, _, term = item.partition("-")
+            if year.isdigit() and term.isdigit():
+                if (int(year), int(term)) not in terms:
+                    terms.append((int(year), int(term)))
+            else:
+                print(f"忽略无效的学期: {item}")
+        return terms
+
+    def view_current_schedule(self):
+        from modules.tools.display import display_schedule_text, display_schedule_changes, export_schedule_json
+        raw = input("\n同步其他学期请输入学年-学期（如 2024-1 2024-2），加 r 强制从教务系统刷新（回车只看当前学期）: ").split()
+        force = "r" in raw
+        terms = self._parse_terms([item for item in raw if item != "r"])
+        with self._profile("schedule"):
+            res = self.schedules.sync(terms, self._fetch_schedule, force=force)
+        if res["code"] != 1000:
+            print(f"\n❌ 获取课表失败：{res['msg']}")
             return
-        data = res.get("data", {})
-        display_schedule_text(data, self.year, self.term)
-        opt = input("\n是否导出为 JSON 文件? (y/n): ").lower()
+        for (year, term), term_res in zip(terms, res["data"].values()):
+            if term_res["code"] not in (1000, 1001):
+                print(f"\n❌ 获取 {year}-{term} 课表失败：{term_res['msg']}")
+                continue
+            data = term_res["data"]
+            if (year, term) == (self.year, self.term):
+                # 顺便刷新冲突检查用的时间索引（课表可能在网页上被修改过）
+                from modules.tools.timetable import SlotIndex
+                self.sniper.slot_index = SlotIndex.from_courses(data["courses"])
+            display_schedule_text(data, year, term)
+            if data["cached"]:
+                print(f"\n（本地课表，{(time.time() - data['synced_at']) / 60:.0f} 分钟前同步；输入 r 可强制刷新）")
+            display_schedule_changes(data["changes"])
+        data = res["data"][f"{self.year}-{self.term}"]["data"]
+        if not data:
+            return
+        opt = input("\n是否导出? (y=JSON 文件，l=JSON Lines，c=日历 .ics，其他跳过): ").lower()
         if opt == 'y':
             filename = f"schedule_{self.year}_{self.term}.json"
-            export_schedule_json(data, filename)
+            export_schedule_json({"courses": data["courses"]}, filename)
+        elif opt == 'l':
+            from modules.tools.display import export_course_json
+            export_course_json(data["courses"], f"schedule_{self.year}_{self.term}.jsonl")
+        elif opt == 'c':
+            import datetime
+            from modules.tools.calendar_export import schedule_events, write_ics
+            try:
+                start = datetime.date.fromisoformat(input("请输入第1周星期一的日期 (如 2026-02-23): ").strip())
+            except ValueError:
+                print("❌ 日期格式错误")
+                return
+            filename = f"schedule_{self.year}_{self.term}.ics"
+            count = write_ics(filename, schedule_events(data["courses"], start), name=f"{self.year}-{self.term} 课表")
+            print(f"✅ 已导出 {count} 个日历事件到 {filename}")
+
     def view_exam_schedule(self):
         from modules.services.exam_service import ExamService
+        from modules.tools.display import display_exam_text, export_exam_json
         svc = ExamService(self.login.sess, self.base_url)
-        res = svc.get(self.year, self.term, self.sid)
+        raw = input("\n查询其他学期请输入学年-学期（如 2024-1 2024-2，回车只查当前学期）: ").split()
+        terms = self._parse_terms(raw)
+        with self._profile("exam"):
+            res = svc.get(self.year, self.term, self.sid) if len(terms) == 1 else svc.get_many(terms, self.sid)
         if res.get("code") != 1000:
             print(f"\n❌ 获取考试信息失败：{res.get('msg')}")
             return
         data = res.get("data", {})
         display_exam_text(data)
-        opt = input("\n是否导出为 JSON 文件? (y/n): ").lower()
+        opt = input("\n是否导出? (y=JSON 文件，c=日历 .ics，其他跳过): ").lower()
+        filename = "exams_" + "_".join(f"{y}_{t}" for y, t in terms)
         if opt == 'y':
-            filename = f"exams_{self.year}_{self.term}.json"
-            export_exam_json(data, filename)
\ No newline at end of file
+            export_exam_json(data, filename + ".json")
+        elif opt == 'c':
+            from modules.tools.calendar_export import exam_events, write_ics
+            count = write_ics(filename + ".ics", exam_events(data.get("courses", [])), name="考试安排")
+            print(f"✅ 已导出 {count} 个日历事件到 {filename}.ics")
\ No newline at end of file
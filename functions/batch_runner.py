@@ -0,0 +1,208 @@
+"""
+多账号批量抢课：每个账号在独立的工作进程中运行，由监督进程负责调度、崩溃重启与结果汇总
+"""
+import os
+import sys
+import json
+import time
+import queue
+import multiprocessing as mp
+from typing import Dict, List, Any
+from loguru import logger
+
+from utils import print_status, format_time
+
+
+def _account_worker(account: Dict[str, Any], workdir: str, results) -> None:
+    """
+    工作进程入口：在账号独立目录下运行一次非交互式抢课，并把结果放入结果队列
+    :param account: 账号配置
+    :param workdir: 账号工作目录（存储、日志、输出都写在这里，避免账号之间互相干扰）
+    :param results: 结果队列
+    """
+    os.makedirs(workdir, exist_ok=True)
+    # 终端输出写入账号自己的文件，避免多个进程在同一终端交错
+    output = open(os.path.join(workdir, "output.log"), "a", encoding="utf-8", buffering=1)
+    sys.stdout = sys.stderr = output
+
+    from functions.app_orchestrator import AppOrchestrator
+    orchestrator = AppOrchestrator(
+        account["base_url"], account["sid"], account["pwd"], account["year"], account["term"],
+        account.get("debug", False),
+        hedge=account.get("hedge", False),
+        pool_size=account.get("pool_size", 1),
+        storage_dir=workdir,
+        log_path=os.path.join(workdir, "auto_course.log"),
+        console_log=False,
+        sso_url=account.get("sso_url"),
+        metrics_port=account.get("metrics_port", 0),
+        metrics_socket=account.get("metrics_socket"),
+        json_logs=account.get("json_logs"),
+    )
+    res = orchestrator.run_headless(account.get("targets"), account.get("config"), account.get("max_duration", 0),
+                                    account.get("start_at"))
+    results.put({"sid": account["sid"], "result": res})
+    output.flush()
+
+
+class BatchSupervisor:
+    """批量抢课监督者"""
+
+    def __init__(self, accounts: List[Dict[str, Any]], data_dir: str = "data/accounts", max_workers: int = 0,
+                 max_restarts: int = 3, stagger: float = 1.0, restart_delay: float = 5.0):
+        """
+        :param accounts: 账号配置列表（见 functions.run_config.load_accounts）
+        :param data_dir: 账号工作目录的根目录
+        :param max_workers: 同时运行的最大进程数，0 表示全部同时运行
+        :param max_restarts: 每个账号进程崩溃后的最大重启次数
+        :param stagger: 相邻两个进程的启动间隔(秒)，避免同时冲击统一认证
+        :param restart_delay: 崩溃后重启前的等待时间(秒)
+        """
+        self.accounts = {a["sid"]: a for a in accounts}
+        self.data_dir = data_dir
+        self.max_workers = max_workers or len(accounts)
+        self.max_restarts = max_restarts
+        self.stagger = stagger
+        self.restart_delay = restart_delay
+        self.ctx = mp.get_context("spawn")
+        self.results_queue = self.ctx.Queue()
+        self.processes: Dict[str, Any] = {}
+        self.restarts = {sid: 0 for sid in self.accounts}
+        # 等待重启的账号 -> 重启时间；由 run 的轮询循环到期后重新排队，不阻塞对其他进程的监督
+        self.restart_at: Dict[str, float] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._last_launch = 0.0
+
+    def _workdir(self, sid: str) -> str:
+        return os.path.join(self.data_dir, sid)
+
+    def _launch(self, sid: str):
+        """启动账号的工作进程"""
+        wait = self._last_launch + self.stagger - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        proc = self.ctx.Process(
+            target=_account_worker,
+            args=(self.accounts[sid], self._workdir(sid), self.results_queue),
+            name=f"snipe-{sid}",
+            daemon=False,
+        )
+        proc.start()
+        self._last_launch = time.time()
+        self.processes[sid] = proc
+        logger.info("账号 {} 工作进程已启动 (pid={})", sid, proc.pid)
+
+    def _drain_results(self, timeout: float = 0.0):
+        """收取工作进程上报的结果"""
+        try:
+            while True:
+                msg = self.results_queue.get(timeout=timeout)
+                self.results[msg["sid"]] = msg["result"]
+                timeout = 0.0
+        except queue.Empty:
+            pass
+
+    def _reap(self):
+        """检查已退出的进程，必要时安排重启（记录重启时间，由 _requeue 到期后重新排队）"""
+        for sid, proc in list(self.processes.items()):
+            if proc.is_alive():
+                continue
+            proc.join()
+            del self.processes[sid]
+            self._drain_results()
+            if sid in self.results:
+                continue
+            if self.restarts[sid] < self.max_restarts:
+                self.restarts[sid] += 1
+                print_status(f"账号 {sid} 工作进程异常退出 (exitcode={proc.exitcode})，"
+                             f"{self.restart_delay:.0f} 秒后第 {self.restarts[sid]} 次重启", "warning")
+                self.restart_at[sid] = time.time() + self.restart_delay
+            else:
+                print_status(f"账号 {sid} 工作进程多次崩溃，放弃", "error")
+                self.results[sid] = {"code": 999, "msg": f"工作进程崩溃 (exitcode={proc.exitcode})", "data": None}
+
+    def _requeue(self, pending: List[str]):
+        """把已到重启时间的账号放回待启动队列的最前面"""
+        now = time.time()
+        for sid, at in list(self.restart_at.items()):
+            if at <= now:
+                del self.restart_at[sid]
+                pending.insert(0, sid)
+
+    def run(self, poll_interval: float = 1.0) -> Dict[str, Any]:
+        """
+        运行全部账号直至结束
+        :param poll_interval: 监督轮询间隔(秒)
+        :return: 汇总结果
+        """
+        started = time.time()
+        pending = list(self.accounts)
+        print_status(f"批量抢课开始 - 账号数: {len(pending)}, 并发进程: {self.max_workers}", "info")
+        try:
+            while pending or self.processes or self.restart_at:
+                self._requeue(pending)
+                while pending and len(self.processes) < self.max_workers:
+                    self._launch(pending.pop(0))
+                self._drain_results(timeout=poll_interval)
+                self._reap()
+        except KeyboardInterrupt:
+            # 中断信号同样会送达各工作进程，等待它们收尾并上报结果
+            print_status("批量抢课被用户中断，等待工作进程退出...", "warning")
+            deadline = time.time() + 15
+            for proc in self.processes.values():
+                proc.join(max(0.0, deadline - time.time()))
+                if proc.is_alive():
+                    proc.terminate()
+            self._drain_results(timeout=0.5)
+        return self.summarize(time.time() - started)
+
+    def summarize(self, duration: float) -> Dict[str, Any]:
+        """汇总各账号结果"""
+        accounts = {}
+        total_success = total_courses = total_attempts = 0
+        for sid in self.accounts:
+            res = self.results.get(sid) or {"code": 999, "msg": "未返回结果", "data": None}
+            stats = res.get("data") or {}
+            accounts[sid] = {
+                "code": res.get("code"),
+                "msg": res.get("msg"),
+                "restarts": self.restarts[sid],
+                "successful": stats.get("successful", 0),
+                "total_courses": stats.get("total_courses", 0),
+                "attempts": stats.get("attempts", 0),
+                "successful_courses": stats.get("successful_courses", {}),
+            }
+            total_success += accounts[sid]["successful"]
+            total_courses += accounts[sid]["total_courses"]
+            total_attempts += accounts[sid]["attempts"]
+        return {
+            "finished_at": format_time(),
+            "duration": duration,
+            "accounts": accounts,
+            "successful": total_success,
+            "total_courses": total_courses,
+            "attempts": total_attempts,
+        }
+
+
+def print_summary(summary: Dict[str, Any]):
+    """打印批量抢课汇总"""
+    print("\n========== 批量抢课汇总 ==========")
+    for sid, acc in summary["accounts"].items():
+        flag = "✅" if acc["code"] == 1000 else "❌"
+        print(f"{flag} {sid}: 成功 {acc['successful']}/{acc['total_courses']}，"
+              f"尝试 {acc['attempts']} 次，重启 {acc['restarts']} 次 - {acc['msg']}")
+        for kch_id, name in acc["successful_courses"].items():
+            print(f"     - {name} (课程号: {kch_id})")
+    print(f"合计: 成功 {summary['successful']}/{summary['total_courses']}，"
+          f"尝试 {summary['attempts']} 次，用时 {summary['duration']:.1f} 秒")
+
+
+def save_summary(summary: Dict[str, Any], path: str) -> str:
+    """保存汇总结果到 JSON 文件"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return os.path.abspath(path)
@@ -4,31 +4,134 @@
 import time
 import random
 import threading
-from typing import Dict, List, Any, Optional, Union, Tuple
+from collections import deque, Counter
+from typing import Callable, Dict, List, Any, Optional, Union, Tuple
 from loguru import logger
 
 from modules.course_selector import CourseSelector
+from modules.course_searcher import CourseSearcher
 from functions.course_storage import CourseStorage
+from modules.tools.latency import EndpointTimings
+from modules.tools.debug_utils import hot_log
+from modules.tools.timetable import SlotIndex
 from utils import print_status, countdown, is_interrupted, setup_interrupt_handler
 
 
+MAX_BACKOFF = 5.0  # 最大退避系数
+MAX_WAIT = 10.0  # 单次等待上限(秒)
+# 安静模式下各状态写入日志的级别
+REPORT_LEVELS = {"attempt": "DEBUG", "error": "WARNING", "warning": "WARNING", "success": "SUCCESS", "info": "INFO"}
+
+
+def compute_wait_time(config: Dict[str, Any], backoff: float, rng: Optional[random.Random] = None) -> float:
+    """
+    计算两次尝试之间的等待时间：在 [interval_min, interval_max] 内随机，并按退避系数放大
+
+    :param config: 抢课配置（同 CourseSniper.config）
+    :param backoff: 当前退避系数
+    :param rng: 随机数生成器，默认使用 random 模块（模拟器传入带种子的实例以便复现）
+    :return: 等待时间(秒)
+    """
+    backoff = min(MAX_BACKOFF, backoff)  # 限制最大退避系数
+    wait_time = (rng or random).uniform(config["interval_min"] * backoff, config["interval_max"] * backoff)
+    return min(wait_time, MAX_WAIT)  # 限制最大等待时间
+
+
+def compute_round_wait(config: Dict[str, Any], rng: Optional[random.Random] = None) -> float:
+    """
+    所有目标尝试一轮后、开始下一轮前的等待时间：在 [interval_min, interval_max] 内随机（不退避）
+
+    :param rng: 随机数生成器，默认使用 random 模块
+    """
+    return (rng or random).uniform(config["interval_min"], config["interval_max"])
+
+
+def classify_select_error(result: Dict[str, Any]) -> str:
+    """
+    把选课失败结果归类，用于统计错误分布
+
+    :param result: CourseSelector.select_course 的返回
+    :return: 错误类别
+    """
+    code = result.get("code")
+    msg = result.get("msg", "")
+    if code == 1006:
+        return "session_expired"
+    if code == 1003:
+        return "timeout"
+    if code == 1002:
+        return "refresh_failed"
+    if code == 1007:
+        return "parse_error"
+    if code == 1001:
+        if "已满" in msg or "容量" in msg:
+            return "full"
+        if "时间" in msg:
+            return "not_open"
+        if "冲突" in msg:
+            return "conflict"
+        return "rejected"
+    return "unknown"
+
+
+def group_targets(courses: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    按课程号把目标教学班分组：同一课程的多个教学班互为备选，按抢课列表中的顺序排列
+
+    :param courses: 目标课程列表
+    :return: 课程号 -> 候选教学班列表
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for i, course in enumerate(courses):
+        groups.setdefault(course.get('kch_id', f'unknown_{i}'), []).append(course)
+    return groups
+
+
 class CourseSniper:
     """课程抢课系统"""
 
-    def __init__(self, selector: CourseSelector, student_id: str, course_params: Dict):
+    def __init__(self, selector: CourseSelector, student_id: str, course_params: Dict,
+                 storage: Optional[CourseStorage] = None, timings: Optional[EndpointTimings] = None):
         """
         初始化抢课系统
 
-        :param selector: 课程选择器实例
+        :param selector: 课程选择器实例（也可以是接口相同的 SessionPool）
         :param student_id: 学生ID
         :param course_params: 选课所需参数
+        :param storage: 课程存储，默认使用 data 目录
+        :param timings: 请求阶段耗时直方图（见 modules.tools.http_timing），结束时打印摘要
         """
         self.selector = selector
         self.student_id = student_id
         self.course_params = course_params
-        self.storage = CourseStorage()
+        self.storage = storage or CourseStorage()
+        self.timings = timings
         self.running = False
         self.successful_courses = set()  # 已成功选上的课程
+        # 运行中的状态，供监控指标读取
+        self.stats: Dict[str, Any] = {}
+        self.backoff_factors: Dict[str, float] = {}
+        self.course_names: Dict[str, str] = {}  # 课程号 -> 课程名
+        self.error_counts = Counter()  # 错误类别 -> 次数
+        self._attempt_times = deque(maxlen=10000)  # 最近的尝试时间戳
+        # 安静模式：后台运行时不逐次打印尝试结果（仍写入日志），避免刷屏干扰菜单
+        self.quiet = False
+        # 停止与暂停：后台线程中运行时由 JobManager 控制，等待期间可被立即唤醒
+        self._stop_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._targets_dirty = False
+        # 已选课程（课表）的时间索引：与其冲突的目标课程不会被尝试，选上的课程随后加入索引
+        self.slot_index: Optional[SlotIndex] = None
+        self.conflicts: Dict[str, str] = {}  # 教学班ID -> 冲突说明
+        self.week_warnings = set()  # 已提示“周次无法识别、可能冲突”的教学班ID
+        # 同一课程有多个候选教学班时按剩余名额加权轮换；capacity_provider(kch_id) 返回该课程的最新搜索结果
+        self.free_seats: Dict[str, int] = {}  # 教学班ID -> 最近一次得知的剩余名额
+        self.capacity_provider: Optional[Callable[[str], List[Dict[str, Any]]]] = None
+        self._rotation: Dict[str, float] = {}  # 平滑加权轮询的当前权重
+        self._capacity_checked = 0.0
+        # 选课返回会话过期（1006）时调用，例如常驻进程借此立即重新登录，不必等到下一次保持会话
+        self.on_session_expired: Optional[Callable[[], None]] = None
 
         # 默认配置
         self.config = {
@@ -36,7 +139,8 @@ class CourseSniper:
             "interval_max": 3,  # 最大间隔时间(秒)
             "max_attempts": 100,  # 每门课最大尝试次数
             "randomize": True,  # 是否随机顺序
-            "backoff_factor": 1.5  # 退避系数(连续失败时增加等待时间)
+            "backoff_factor": 1.5,  # 退避系数(连续失败时增加等待时间)
+            "capacity_refresh": 60  # 有备选教学班时刷新剩余名额的间隔(秒)，0 表示不刷新
         }
 
     def configure(self, **kwargs):
@@ -52,11 +156,12 @@ class CourseSniper:
 
         return self
 
-    def add_target_courses(self, courses: List[Dict[str, Any]]) -> bool:
+    def add_target_courses(self, courses: List[Dict[str, Any]], merge: bool = False) -> bool:
         """
-        添加目标课程
+        添加目标课程；抢课运行中添加时，下一轮开始时生效
 
         :param courses: 课程列表
+        :param merge: 为 True 时追加到现有列表（按教学班去重），否则替换整个列表
         :return: 是否成功
         """
         # 确保课程数据完整
@@ -72,9 +177,25 @@ class CourseSniper:
             logger.error("没有有效的课程数据")
             return False
 
+        if merge:
+            existing = self.storage.load_target_courses()
+            known = {c.get('jxb_id') for c in existing}
+            valid_courses = existing + [c for c in valid_courses if c.get('jxb_id') not in known]
+
         # 保存到存储
+        self._targets_dirty = True
         return self.storage.save_target_courses(valid_courses)
 
+    def remove_target_course(self, jxb_id: str) -> bool:
+        """
+        移除目标课程；抢课运行中移除时，下一轮开始时生效
+
+        :param jxb_id: 教学班ID
+        :return: 是否找到并移除
+        """
+        self._targets_dirty = True
+        return self.storage.remove_target_course(jxb_id)
+
     def load_target_courses(self) -> List[Dict[str, Any]]:
         """
         加载目标课程
@@ -112,73 +233,282 @@ class CourseSniper:
                 self.successful_courses.add(kch_id)
                 return True, "选课成功"
             else:
+                category = classify_select_error(result)
+                self.error_counts[category] += 1
+                if category == "full":
+                    self.free_seats[jxb_id] = 0
+                elif category == "session_expired" and self.on_session_expired is not None:
+                    self.on_session_expired()
                 return False, result.get("msg", "未知错误")
 
         except Exception as e:
+            self.error_counts["exception"] += 1
             logger.exception(f"选课异常: {e}")
             return False, f"选课异常: {str(e)}"
 
+    def stop(self):
+        """请求停止抢课，正在进行的等待会立即结束"""
+        self.running = False
+        self._stop_event.set()
+        self._resume_event.set()
+
+    def pause(self):
+        """暂停抢课：当前这次选课请求完成后进入等待，直到 resume 或 stop"""
+        self._resume_event.clear()
+
+    def resume(self):
+        """继续已暂停的抢课"""
+        self._resume_event.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume_event.is_set()
+
+    def _should_stop(self) -> bool:
+        return self._stop_event.is_set() or is_interrupted()
+
+    def _wait(self, seconds: float) -> bool:
+        """
+        可中断的等待：收到停止请求时立即返回；暂停时一直等到继续或停止
+
+        :param seconds: 等待时间(秒)
+        :return: 是否应继续运行
+        """
+        if self._stop_event.wait(seconds):
+            return False
+        while not self._resume_event.wait(0.5):
+            if is_interrupted():
+                return False
+        return not self._should_stop()
+
+    def _report(self, message: str, status: str = "info"):
+        """输出状态：安静模式下只写日志文件（按状态类型限速）"""
+        if self.quiet:
+            hot_log(f"sniper.{status}", REPORT_LEVELS.get(status, "INFO"), "{}", message, file_only=True)
+        else:
+            print_status(message, status)
+
+    def _reload_targets(self, target_courses: List[Dict[str, Any]], version) -> Tuple[List[Dict[str, Any]], Any]:
+        """
+        目标课程文件被修改（菜单中添加/移除课程或手动编辑）时重新加载；
+        读取失败（如手动编辑到一半）时沿用当前列表与版本，下一轮再试
+
+        :return: (目标课程列表, 文件版本)
+        """
+        current = self.storage.targets_version()
+        if current == version and not self._targets_dirty:
+            return target_courses, version
+        try:
+            courses = self.storage.load_target_courses(strict=True)
+        except Exception as e:
+            hot_log("sniper.reload", "WARNING", "重新加载抢课列表失败，沿用当前列表: {}", e)
+            return target_courses, version
+        self._targets_dirty = False
+        added = [c for c in courses if c.get('kch_id') not in self.stats["course_attempts"]]
+        for course in added:
+            kch_id = course.get('kch_id')
+            self.stats["course_attempts"][kch_id] = 0
+            self.backoff_factors[kch_id] = 1.0
+            self.course_names[kch_id] = course.get('kcmc') or course.get('jxbmc', '')
+        self.stats["total_courses"] = len(group_targets(courses))
+        removed = len({c.get('jxb_id') for c in target_courses} - {c.get('jxb_id') for c in courses})
+        self._report(f"抢课列表已更新 - 新增: {len(added)}, 移除: {removed}, 当前: {len(courses)} 门", "info")
+        return courses, current
+
+    def _drop_conflicts(self, target_courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        去掉与课表时间冲突的目标课程（必然被服务器拒绝，不必浪费选课请求）；每个教学班只提示一次
+
+        :return: 不冲突的目标课程
+        """
+        if self.slot_index is None or not self.slot_index.occupied:
+            return target_courses
+        kept = []
+        for course in target_courses:
+            clash = self.slot_index.conflicts_with(course)
+            if not clash:
+                kept.append(course)
+                continue
+            jxb_id = course.get('jxb_id')
+            if not self.slot_index.is_certain(course, clash):
+                # 周次无法识别，按整个学期估计的冲突不一定存在：只提示，仍然尝试
+                kept.append(course)
+                if jxb_id not in self.week_warnings:
+                    self.week_warnings.add(jxb_id)
+                    names = "、".join(self.slot_index.label(k) for k in clash)
+                    self._report(f"[{course.get('kcmc') or course.get('jxbmc', '未知课程')}] 可能与 {names} 时间冲突"
+                                 f"（周次无法识别，仍会尝试）", "warning")
+                continue
+            if jxb_id not in self.conflicts:
+                names = "、".join(self.slot_index.label(k) for k in clash)
+                message = f"与已选课程 {names} 时间冲突（{self.slot_index.describe_conflict(course, clash[0])}）"
+                self.conflicts[jxb_id] = message
+                self.storage.update_course_status(course.get('kch_id'), "conflict", message)
+                self._report(f"跳过 [{course.get('kcmc') or course.get('jxbmc', '未知课程')}]：{message}", "warning")
+        return kept
+
+    def _candidate_weight(self, course: Dict[str, Any]) -> float:
+        """候选教学班的轮换权重：1 + 剩余名额（未知时按 0 计），已满的教学班仍会偶尔尝试"""
+        jxb_id = course.get('jxb_id')
+        free = self.free_seats.get(jxb_id)
+        if free is None:
+            free = CourseSearcher.free_seats(course)
+        return 1.0 + max(0, free or 0)
+
+    def _pick_candidate(self, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        在同一课程的候选教学班中选出本轮要尝试的一个（平滑加权轮询：按权重比例轮换，权重相同时按列表顺序）
+
+        :param candidates: 候选教学班，按优先顺序排列
+        :return: 本轮尝试的教学班
+        """
+        if len(candidates) == 1:
+            return candidates[0]
+        total = 0.0
+        best = None
+        for course in candidates:
+            jxb_id = course.get('jxb_id')
+            weight = self._candidate_weight(course)
+            self._rotation[jxb_id] = self._rotation.get(jxb_id, 0.0) + weight
+            total += weight
+            if best is None or self._rotation[jxb_id] > self._rotation[best.get('jxb_id')]:
+                best = course
+        self._rotation[best.get('jxb_id')] -= total
+        return best
+
+    def _refresh_capacity(self, groups: Dict[str, List[Dict[str, Any]]]):
+        """按 capacity_refresh 间隔重新查询有备选教学班的课程的剩余名额"""
+        interval = self.config.get("capacity_refresh", 0)
+        if self.capacity_provider is None or interval <= 0 or time.time() - self._capacity_checked < interval:
+            return
+        self._capacity_checked = time.time()
+        for kch_id, candidates in groups.items():
+            if len(candidates) < 2:
+                continue
+            try:
+                results = self.capacity_provider(kch_id)
+            except Exception as e:
+                logger.warning(f"刷新课程 {kch_id} 剩余名额失败: {e}")
+                continue
+            for course in results:
+                free = CourseSearcher.free_seats(course)
+                if free is not None:
+                    self.free_seats[course.get('jxb_id')] = free
+
+    def attempt_rate(self, window: float = 10.0) -> float:
+        """
+        最近 window 秒内的每秒尝试次数
+
+        :param window: 统计窗口(秒)
+        """
+        cutoff = time.time() - window
+        recent = sum(1 for t in list(self._attempt_times) if t >= cutoff)
+        return recent / window
+
     def start(self, max_duration: int = 0) -> Dict[str, Any]:
         """
-        开始抢课
+        开始抢课；可在后台线程中运行，此时通过 stop/pause/resume 控制
 
         :param max_duration: 最大运行时间(秒)，0表示无限制
         :return: 抢课结果统计
         """
-        # 设置中断处理
-        setup_interrupt_handler()
+        # 设置中断处理（信号处理只能在主线程注册，后台运行时由 stop() 结束）
+        if threading.current_thread() is threading.main_thread():
+            setup_interrupt_handler()
 
         # 加载目标课程
+        targets_version = self.storage.targets_version()
         target_courses = self.load_target_courses()
         if not target_courses:
-            print_status("没有找到目标课程，请先添加", "error")
+            self._report("没有找到目标课程，请先添加", "error")
             return {"success": 0, "failed": 0, "total": 0}
+        self.conflicts.clear()
+        target_courses = self._drop_conflicts(target_courses)
+        if not target_courses:
+            self._report("所有目标课程都与已选课程时间冲突", "error")
+            return {"success": 0, "failed": 0, "total": 0, "conflicts": dict(self.conflicts)}
 
         # 显示抢课信息
-        print_status(f"开始抢课任务 - 目标课程数: {len(target_courses)}", "info")
-        for i, course in enumerate(target_courses, 1):
-            print(f"  {i}. {course.get('jxbmc', '未知课程')} (课程号: {course.get('kch_id')})")
+        groups = group_targets(target_courses)
+        self._report(f"开始抢课任务 - 目标课程数: {len(groups)}（教学班 {len(target_courses)} 个）", "info")
+        if not self.quiet:
+            for i, candidates in enumerate(groups.values(), 1):
+                course = candidates[0]
+                alternates = f"，另有 {len(candidates) - 1} 个备选教学班" if len(candidates) > 1 else ""
+                print(f"  {i}. {course.get('jxbmc', '未知课程')} (课程号: {course.get('kch_id')}{alternates})")
 
         # 初始化统计数据
         stats = {
             "start_time": time.time(),
-            "total_courses": len(target_courses),
+            "total_courses": len(groups),
             "successful": 0,
             "attempts": 0,
-            "course_attempts": {c.get('kch_id', f'unknown_{i}'): 0 for i, c in enumerate(target_courses)},
+            "course_attempts": {kch_id: 0 for kch_id in groups},
+            "class_attempts": {},
             "completed": False,
-            "successful_courses": {}
+            "successful_courses": {},
+            "conflicts": self.conflicts
         }
+        self.stats = stats
+        self.error_counts.clear()
+        self.course_names = {c.get('kch_id'): c.get('kcmc') or c.get('jxbmc', '') for c in target_courses}
+        self._rotation.clear()
 
         # 设置运行状态
         self.running = True
+        self._stop_event.clear()
+        self._targets_dirty = False
         end_time = time.time() + max_duration if max_duration > 0 else float('inf')
 
-        # 初始化每个课程的尝试次数和退避系数
-        attempt_counts = {c.get('kch_id', f'unknown_{i}'): 0 for i, c in enumerate(target_courses)}
-        backoff_factors = {c.get('kch_id', f'unknown_{i}'): 1.0 for i, c in enumerate(target_courses)}
+        # 初始化每个课程的退避系数（尝试次数记在 stats["course_attempts"]）
+        attempt_counts = stats["course_attempts"]
+        self.backoff_factors = {kch_id: 1.0 for kch_id in groups}
+        backoff_factors = self.backoff_factors
+
+        def remaining():
+            return [c for c in target_courses if c.get('kch_id') not in self.successful_courses]
 
         try:
             # 主循环 - 直到所有课程都选上或超时
             while self.running:
+                # 暂停时在这里等待；期间修改的抢课列表在继续后生效
+                if self.paused and not self._wait(0):
+                    self._report("抢课任务被停止", "warning")
+                    break
+
+                # 抢课列表被修改时重新加载
+                target_courses, targets_version = self._reload_targets(target_courses, targets_version)
+
+                if not target_courses:
+                    self._report("抢课列表已清空，结束抢课任务", "warning")
+                    break
+
+                # 上一轮选上的课程已加入时间索引，与之冲突的其余目标不再尝试
+                target_courses = self._drop_conflicts(target_courses)
+                if not target_courses:
+                    self._report("剩余目标课程都与已选课程时间冲突，结束抢课任务", "warning")
+                    break
+
                 # 检查是否所有课程都已选上
-                if len(self.successful_courses) >= len(target_courses):
-                    print_status("所有课程已选上，抢课任务完成！", "success")
+                groups = group_targets(remaining())
+                if not groups:
+                    self._report("所有课程已选上，抢课任务完成！", "success")
                     stats["completed"] = True
                     break
 
                 # 检查是否超时
                 if time.time() > end_time:
-                    print_status(f"已达到最大运行时间 ({max_duration}秒)，停止抢课", "warning")
+                    self._report(f"已达到最大运行时间 ({max_duration}秒)，停止抢课", "warning")
                     break
 
                 # 检查是否被中断
-                if is_interrupted():
-                    print_status("抢课任务被用户中断", "warning")
+                if self._should_stop():
+                    self._report("抢课任务被用户中断", "warning")
                     break
 
-                # 创建可选课程的副本
-                available_courses = [c for c in target_courses if c.get('kch_id') not in self.successful_courses]
+                # 每门课程本轮只尝试一个教学班，在候选教学班间按剩余名额加权轮换
+                self._refresh_capacity(groups)
+                available_courses = [self._pick_candidate(candidates) for candidates in groups.values()]
 
                 # 如果配置为随机顺序，打乱课程顺序
                 if self.config["randomize"]:
@@ -187,25 +517,30 @@ class CourseSniper:
                 # 循环尝试每门课
                 for course in available_courses:
                     # 如果被中断，退出循环
-                    if is_interrupted():
+                    if self._should_stop():
                         break
 
                     kch_id = course.get('kch_id', 'unknown')
                     kcmc = course.get('kcmc', '未知课程')
+                    siblings = len(groups.get(kch_id, ())) - 1
+                    if siblings:
+                        kcmc = course.get('jxbmc') or kcmc
 
                     # 检查最大尝试次数
                     max_attempts = self.config["max_attempts"]
                     if max_attempts > 0 and attempt_counts[kch_id] >= max_attempts:
-                        print_status(f"课程 [{kcmc}] 已达到最大尝试次数 ({max_attempts}次)，跳过", "warning")
+                        self._report(f"课程 [{kcmc}] 已达到最大尝试次数 ({max_attempts}次)，跳过", "warning")
                         continue
 
                     # 增加尝试次数
-                    attempt_counts[kch_id] += 1
                     stats["attempts"] += 1
-                    stats["course_attempts"][kch_id] += 1
+                    attempt_counts[kch_id] += 1
+                    jxb_id = course.get('jxb_id')
+                    stats["class_attempts"][jxb_id] = stats["class_attempts"].get(jxb_id, 0) + 1
+                    self._attempt_times.append(time.time())
 
                     # 尝试选课
-                    print_status(f"尝试选课 [{kcmc}] (第 {attempt_counts[kch_id]} 次)", "attempt")
+                    self._report(f"尝试选课 [{kcmc}] (第 {attempt_counts[kch_id]} 次)", "attempt")
                     success, message = self._select_single_course(course)
 
                     # 更新状态
@@ -214,39 +549,37 @@ class CourseSniper:
 
                     # 处理结果
                     if success:
-                        print_status(f"课程 [{kcmc}] 选课成功！", "success")
+                        self._report(f"课程 [{kcmc}] 选课成功！", "success")
+                        if siblings:
+                            self._report(f"已取消同课程的其他 {siblings} 个备选教学班", "info")
                         stats["successful"] += 1
                         stats["successful_courses"][kch_id] = kcmc
+                        stats.setdefault("first_success_at", time.time())
+                        if self.slot_index is not None:
+                            self.slot_index.add_course(course)
                         # 重置该课程的退避系数
                         backoff_factors[kch_id] = 1.0
                     else:
-                        print_status(f"课程 [{kcmc}] 选课失败: {message}", "error")
+                        self._report(f"课程 [{kcmc}] 选课失败: {message}", "error")
                         # 增加退避系数
                         backoff_factors[kch_id] *= self.config["backoff_factor"]
 
                     # 计算下一次尝试的等待时间
-                    interval_min = self.config["interval_min"]
-                    interval_max = self.config["interval_max"]
-                    backoff = min(5.0, backoff_factors[kch_id])  # 限制最大退避系数
-
-                    wait_time = random.uniform(
-                        interval_min * backoff,
-                        interval_max * backoff
-                    )
+                    wait_time = compute_wait_time(self.config, backoff_factors[kch_id])
 
                     # 等待一段时间再尝试下一门课
-                    if not is_interrupted() and len(self.successful_courses) < len(target_courses):
-                        time.sleep(min(wait_time, 10.0))  # 限制最大等待时间为10秒
+                    if remaining() and not self._wait(wait_time):
+                        break
 
                 # 所有课程尝试一轮后，等待一段时间再开始下一轮
-                if not is_interrupted() and len(self.successful_courses) < len(target_courses):
-                    next_round_wait = random.uniform(self.config["interval_min"], self.config["interval_max"])
-                    print_status(f"本轮抢课完成，等待 {next_round_wait:.1f} 秒后开始下一轮...", "info")
-                    time.sleep(next_round_wait)
+                if remaining() and not self._should_stop():
+                    next_round_wait = compute_round_wait(self.config)
+                    self._report(f"本轮抢课完成，等待 {next_round_wait:.1f} 秒后开始下一轮...", "info")
+                    self._wait(next_round_wait)
 
         except Exception as e:
             logger.exception(f"抢课过程发生异常: {e}")
-            print_status(f"抢课过程发生异常: {e}", "error")
+            self._report(f"抢课过程发生异常: {e}", "error")
 
         finally:
             # 结束抢课，更新统计信息
@@ -254,9 +587,34 @@ class CourseSniper:
             stats["end_time"] = time.time()
             stats["duration"] = stats["end_time"] - stats["start_time"]
             stats["successful"] = len(self.successful_courses)
+            stats["errors"] = dict(self.error_counts)
+
+            # 会话池健康状况
+            if hasattr(self.selector, "health"):
+                stats["sessions"] = self.selector.health()
+                for h in stats["sessions"]:
+                    latency = f"{h['latency_ewma'] * 1000:.0f}ms" if h["latency_ewma"] is not None else "-"
+                    self._report(
+                        f"会话 #{h['index']} - 请求: {h['requests']}, 失败: {h['failures']}, "
+                        f"平均耗时: {latency}, 替换: {h['evictions']}", "info")
+
+            # 对冲请求统计
+            if getattr(self.selector, "hedge", False):
+                hedge_stats = dict(self.selector.hedge_stats)
+                stats["hedge"] = hedge_stats
+                self._report(
+                    f"对冲请求 - 触发: {hedge_stats['fired']}/{hedge_stats['requests']}, "
+                    f"采用对冲响应: {hedge_stats['hedge_won']}, 累计节省: {hedge_stats['saved_seconds']:.2f}秒",
+                    "info")
+
+            # 各接口请求阶段耗时
+            if self.timings is not None:
+                stats["timings"] = self.timings.snapshot()
+                for line in self.timings.summary_lines():
+                    self._report(f"接口耗时 {line}", "info")
 
             # 显示最终结果
-            print_status(
+            self._report(
                 f"抢课任务结束 - 成功: {stats['successful']}/{stats['total_courses']}, 总尝试次数: {stats['attempts']}",
                 "success" if stats["successful"] > 0 else "info")
 
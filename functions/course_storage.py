@@ -4,9 +4,11 @@
 import os
 import json
 import time
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from loguru import logger
 
+from modules.tools.json_stream import iter_courses
+
 
 class CourseStorage:
     """课程信息存储类"""
@@ -40,8 +42,11 @@ class CourseStorage:
                 "courses": courses
             }
 
-            with open(self.target_file, 'w', encoding='utf-8') as f:
+            # 先写临时文件再替换：后台抢课任务随时可能重新读取该文件，不能让它读到半个文件
+            tmp = f"{self.target_file}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.target_file)
 
             logger.debug(f"已保存{len(courses)}门目标课程到 {self.target_file}")
             return True
@@ -49,27 +54,58 @@ class CourseStorage:
             logger.error(f"保存目标课程失败: {e}")
             return False
 
-    def load_target_courses(self) -> List[Dict[str, Any]]:
+    def load_target_courses(self, where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                            strict: bool = False) -> List[Dict[str, Any]]:
         """
-        加载目标课程列表
+        加载目标课程列表（逐条读取，不整体解析文件）
 
+        :param where: 过滤条件，只保留使其为真的课程
+        :param strict: 为真时文件为空或格式错误直接抛出异常，而不是返回空列表
+                       （抢课循环据此区分“列表被清空”与“读取失败”）
         :return: 课程列表
         """
         try:
             if not os.path.exists(self.target_file):
                 logger.warning(f"目标课程文件不存在: {self.target_file}")
                 return []
+            if os.path.getsize(self.target_file) == 0:
+                raise ValueError(f"{self.target_file} 为空文件")
 
-            with open(self.target_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            courses = data.get("courses", [])
+            courses = list(iter_courses(self.target_file, where))
             logger.debug(f"已加载{len(courses)}门目标课程")
             return courses
         except Exception as e:
+            if strict:
+                raise
             logger.error(f"加载目标课程失败: {e}")
             return []
 
+    def remove_target_course(self, jxb_id: str) -> bool:
+        """
+        从目标课程列表中移除一个教学班
+
+        :param jxb_id: 教学班ID
+        :return: 是否找到并移除
+        """
+        courses = self.load_target_courses()
+        remaining = [c for c in courses if c.get("jxb_id") != jxb_id]
+        if len(remaining) == len(courses):
+            return False
+        return self.save_target_courses(remaining)
+
+    def targets_version(self) -> Optional[tuple]:
+        """
+        目标课程文件的版本标识（修改时间与大小），文件不存在时返回 None；
+        抢课循环据此判断列表是否被修改过
+
+        :return: (mtime_ns, size) 或 None
+        """
+        try:
+            st = os.stat(self.target_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
     def update_course_status(self, course_id: str, status: str, message: str = "") -> bool:
         """
         更新课程状态
@@ -0,0 +1,553 @@
+"""
+daemon.py
+~~~~~~~~~
+常驻进程模式：登录一次后在内存中保持已认证会话、选课参数与课程目录缓存，
+通过本机回环 HTTP 端口或 Unix 套接字接受控制命令，客户端每次请求都能立即得到结果，
+不必重新走 SSO 登录与选课页面解析。会话过期时自动在原会话上重新登录。
+
+接口（请求体与响应均为 JSON，响应为统一返回结构 {"code", "msg", "data"}）：
+    GET    /status                 任务状态、抢课统计、会话与目录缓存信息
+    GET    /targets                当前抢课列表
+    POST   /targets                {"jxb_ids": [...]} 从目录缓存中添加，或 {"courses": [...]} 直接添加；
+                                   "replace": true 时替换整个列表
+    DELETE /targets/<jxb_id>       移除目标课程
+    GET    /catalog?q=关键词        搜索课程，命中缓存时不请求教务系统（&refresh=1 强制刷新）
+    POST   /plan                   {"keywords": [...], "preferences": {jxb_id: 分数}, "top_k": 5, "apply": 1}
+                                   按偏好规划不冲突的教学班组合，apply 指定时把该序号的方案加入抢课列表，
+                                   其他方案中同一课程的教学班作为备选（"fallbacks": false 时不加）
+    POST   /job/start              {"config": {...}, "max_duration": 0}，省略时使用配置文件中的值
+    POST   /job/pause | /job/resume | /job/stop
+    POST   /shutdown               停止任务并退出常驻进程
+    GET    /metrics                Prometheus 指标（同 functions.metrics）
+客户端（DaemonClient）只依赖标准库，发送命令时不必导入 requests 等模块。
+
+控制接口只接受本机请求：Host 须为回环地址（或监听地址），带 Origin 头的请求（浏览器发起）一律拒绝，
+POST/DELETE 须为 Content-Type: application/json；未指定令牌时启动时生成一个随机令牌，
+写入权限为 0600 的令牌文件（默认 data/daemon.token），DaemonClient 从该文件读取。
+"""
+
+import os
+import json
+import time
+import secrets
+import signal
+import socket
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote, quote
+from loguru import logger
+
+from functions.result import ok, err
+
+DEFAULT_CONTROL_PORT = 9465
+DEFAULT_TOKEN_FILE = os.path.join("data", "daemon.token")
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def write_token(path: str, token: str):
+    """把令牌写入只有当前用户可读写的文件（0600）"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    # 文件已存在时 os.open 不会修改权限
+    os.chmod(path, 0o600)
+
+
+def read_token(path: str) -> Optional[str]:
+    """读取令牌文件，不存在时返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _host_name(host: str) -> str:
+    """从 Host 头中取出主机名（去掉端口与 IPv6 方括号）"""
+    if host.startswith("["):
+        return host[1:host.find("]")] if "]" in host else host
+    return host.rsplit(":", 1)[0] if host.count(":") == 1 else host
+
+
+class CatalogCache:
+    """按 (课程类型, 关键词) 缓存课程搜索结果，并按教学班ID建立索引，供添加目标时查找"""
+
+    def __init__(self, search: Callable[[str, str], dict], ttl: float = 300):
+        """
+        :param search: 搜索函数 (kklxdm, keyword) -> 统一返回结构
+        :param ttl: 缓存有效期(秒)
+        """
+        self.search = search
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, str], Tuple[float, List[dict]]] = {}
+        self._by_jxb: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def query(self, keyword: str, kklxdm: str = "01", refresh: bool = False) -> dict:
+        """
+        搜索课程，缓存未过期时直接返回
+        :return: 统一返回结构，data 为课程列表
+        """
+        key = (kklxdm, keyword)
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry is not None and not refresh and time.monotonic() - entry[0] < self.ttl
+            # 计数在控制接口的各请求线程中更新，同样在锁内
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if fresh:
+            return ok(entry[1], "命中缓存")
+        res = self.search(kklxdm, keyword)
+        if res["code"] == 1000:
+            courses = res["data"] or []
+            with self._lock:
+                self._entries[key] = (time.monotonic(), courses)
+                self._by_jxb.update((c.get("jxb_id"), c) for c in courses if c.get("jxb_id"))
+        return res
+
+    def get(self, jxb_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._by_jxb.get(jxb_id)
+
+    def refresh_stale(self):
+        """重新搜索已过期的关键词，保持目录中的余量等信息不过时"""
+        now = time.monotonic()
+        with self._lock:
+            stale = [key for key, (at, _) in self._entries.items() if now - at >= self.ttl]
+        for kklxdm, keyword in stale:
+            self.query(keyword, kklxdm, refresh=True)
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {"keywords": len(self._entries), "courses": len(self._by_jxb),
+                    "hits": self.hits, "misses": self.misses}
+
+
+class _ControlHandler(BaseHTTPRequestHandler):
+    server_version = "SniperDaemon/1.0"
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json; charset=utf-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_result(self, status: int, result: dict):
+        self._send(status, json.dumps(result, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def _reject(self, method: str) -> Optional[str]:
+        """
+        拒绝可能来自浏览器的跨站请求（DNS 重绑定、表单或 fetch 提交）
+        :return: 拒绝原因，允许时返回 None
+        """
+        allowed = set(LOOPBACK_HOSTS) | {self.server.controller.host}
+        if _host_name(self.headers.get("Host") or "").lower() not in allowed:
+            return "Host 不是本机地址"
+        if self.headers.get("Origin") is not None:
+            return "不接受带 Origin 的请求"
+        if method in ("POST", "DELETE"):
+            content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            if content_type != "application/json":
+                return "Content-Type 须为 application/json"
+        return None
+
+    def _handle(self, method: str):
+        controller = self.server.controller
+        reason = self._reject(method)
+        if reason:
+            logger.warning("拒绝控制请求 {} {}：{}", method, self.path, reason)
+            self._send_result(403, err(1001, f"拒绝请求：{reason}"))
+            return
+        if controller.token and not secrets.compare_digest(self.headers.get("Authorization") or "",
+                                                           f"Bearer {controller.token}"):
+            self._send_result(401, err(1001, "未授权"))
+            return
+        url = urlsplit(self.path)
+        if method == "GET" and url.path == "/metrics":
+            from functions.metrics import render_metrics, CONTENT_TYPE
+            self._send(200, render_metrics(controller.app.sniper).encode("utf-8"), CONTENT_TYPE)
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else {}
+        except ValueError:
+            self._send_result(400, err(2334, "请求体不是合法 JSON"))
+            return
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            result = controller.dispatch(method, url.path, query, body)
+        except Exception as e:
+            logger.exception("处理控制请求 {} {} 失败：", method, url.path)
+            self._send_result(500, err(999, f"未知异常：{e}"))
+            return
+        if result is None:
+            self._send_result(404, err(1001, f"未知接口：{method} {url.path}"))
+            return
+        self._send_result(200, result)
+
+    def address_string(self):
+        # Unix 套接字没有客户端地址
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug("control: " + format, *args)
+
+
+class SniperDaemon:
+    """常驻进程：持有一个已登录的 AppOrchestrator，并提供本机控制接口"""
+
+    def __init__(self, app: "AppOrchestrator", port: int = DEFAULT_CONTROL_PORT, host: str = "127.0.0.1",
+                 unix_socket: Optional[str] = None, token: Optional[str] = None,
+                 token_file: Optional[str] = DEFAULT_TOKEN_FILE, catalog_keywords: Iterable[str] = (), catalog_ttl: float = 300, keepalive: float = 300,
+                 config: Optional[dict] = None, max_duration: int = 0):
+        """
+        :param app: 尚未登录的 AppOrchestrator
+        :param port: 控制接口端口（0 表示随机端口）
+        :param host: 监听地址，默认只监听本机回环
+        :param unix_socket: 指定时改为监听该 Unix 套接字路径（权限 0600）
+        :param token: 请求须带 Authorization: Bearer <token>；未指定时启动时随机生成
+        :param token_file: 令牌写入的文件（权限 0600），供 DaemonClient 读取；None 表示不写文件
+        :param catalog_keywords: 启动时预先搜索并缓存的关键词
+        :param catalog_ttl: 目录缓存有效期(秒)
+        :param keepalive: 空闲时刷新会话与过期目录的间隔(秒)
+        :param config: /job/start 未给出时使用的抢课配置
+        :param max_duration: /job/start 未给出时使用的最大运行时间(秒)
+        """
+        self.app = app
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.token = token
+        self.token_file = token_file
+        self.catalog_keywords = list(catalog_keywords)
+        self.catalog = CatalogCache(self._search, catalog_ttl)
+        self.keepalive = keepalive
+        self.config = dict(config or {})
+        self.max_duration = max_duration
+        self.started_at = None
+        self.logged_in_at = None
+        self.last_keepalive = None
+        self.relogins = 0
+        self._server = None
+        self._searcher = None
+        self._shutdown = threading.Event()
+        # 重新登录与空闲刷新互斥，避免多个控制请求同时重新登录
+        self._session_lock = threading.Lock()
+        self._relogin_thread: Optional[threading.Thread] = None
+        self._relogin_guard = threading.Lock()
+
+    @property
+    def address(self) -> str:
+        if self.unix_socket:
+            return f"unix:{self.unix_socket}"
+        return f"http://{self.host}:{self.port}"
+
+    # ---------- 会话 ----------
+
+    def _relogin(self) -> bool:
+        with self._session_lock:
+            logger.warning("会话已过期，重新登录")
+            if not self.app.relogin():
+                return False
+            self.relogins += 1
+            self.logged_in_at = time.time()
+            return True
+
+    def _on_session_expired(self):
+        """抢课中选课返回会话过期时立即在后台重新登录；已有重新登录在进行时忽略"""
+        with self._relogin_guard:
+            if self._relogin_thread is not None and self._relogin_thread.is_alive():
+                return
+            self._relogin_thread = threading.Thread(target=self._relogin, name="relogin", daemon=True)
+            self._relogin_thread.start()
+
+    def _search(self, kklxdm: str, keyword: str) -> dict:
+        """搜索课程，会话过期时重新登录后再试一次"""
+        def search():
+            return self._searcher.search(self.app.sid, self.app.course_params, self.app.year, self.app.term,
+                                         kklxdm, 1, 50, keyword)
+        res = search()
+        if res["code"] == 1006 and self._relogin():
+            res = search()
+        return res
+
+    def keepalive_once(self):
+        """空闲时访问选课页面保持会话，发现过期则重新登录；随后刷新过期的目录缓存"""
+        selector = self.app.selector.selector
+        if not self.app.jobs.active:
+            with self._session_lock:
+                selector.refresh_session(self.app.sid)
+        if selector.session_expired:
+            self._relogin()
+        self.last_keepalive = time.time()
+        self.catalog.refresh_stale()
+
+    def _keepalive_loop(self):
+        while not self._shutdown.wait(self.keepalive):
+            try:
+                self.keepalive_once()
+            except Exception:
+                logger.exception("保持会话失败：")
+
+    # ---------- 命令 ----------
+
+    def status(self) -> dict:
+        jobs = self.app.jobs
+        sniper = self.app.sniper
+        stats = jobs.result if jobs.state == "finished" and jobs.result is not None else sniper.stats
+        return ok({
+            "state": jobs.state,
+            "line": jobs.status_line(),
+            "stats": stats,
+            "errors": dict(sniper.error_counts),
+            "targets": len(sniper.load_target_courses()),
+            "session": {"logged_in_at": self.logged_in_at, "relogins": self.relogins,
+                        "last_keepalive": self.last_keepalive,
+                        "expired": bool(getattr(self.app.selector.selector, "session_expired", False))},
+            "catalog": self.catalog.summary(),
+            "uptime": time.time() - self.started_at if self.started_at else 0,
+        })
+
+    def targets(self) -> dict:
+        return ok(self.app.sniper.load_target_courses())
+
+    def add_targets(self, body: dict) -> dict:
+        courses = list(body.get("courses") or [])
+        missing = []
+        for jxb_id in body.get("jxb_ids") or []:
+            course = self.catalog.get(jxb_id)
+            if course is None:
+                missing.append(jxb_id)
+            else:
+                courses.append(course)
+        if missing:
+            return err(1001, f"目录缓存中没有教学班 {', '.join(missing)}，请先通过 /catalog 搜索")
+        if not courses:
+            return err(1001, "没有要添加的课程")
+        if not self.app.sniper.add_target_courses(courses, merge=not body.get("replace")):
+            return err(1001, "写入目标课程失败")
+        return ok(self.app.sniper.load_target_courses(), f"已添加 {len(courses)} 门课程")
+
+    def remove_target(self, jxb_id: str) -> dict:
+        if not self.app.sniper.remove_target_course(jxb_id):
+            return err(1001, f"抢课列表中没有教学班 {jxb_id}")
+        return ok(self.app.sniper.load_target_courses(), "已移除")
+
+    def plan(self, body: dict) -> dict:
+        from functions.target_optimizer import optimize_targets, with_fallbacks
+        if not body.get("keywords"):
+            return err(1001, "缺少 keywords")
+        candidates, seen = [], set()
+        for keyword in body["keywords"]:
+            res = self.catalog.query(keyword, body.get("kklxdm", "01"))
+            if res["code"] != 1000:
+                return res
+            for course in res["data"]:
+                if course.get("jxb_id") not in seen:
+                    seen.add(course.get("jxb_id"))
+                    candidates.append(course)
+        plans = optimize_targets(candidates, body.get("preferences"), self.app.sniper.slot_index,
+                                 int(body.get("top_k", 5)))
+        apply = int(body.get("apply") or 0)
+        if not apply:
+            return ok(plans, f"共 {len(plans)} 个方案")
+        if not 1 <= apply <= len(plans):
+            return err(1001, f"方案序号无效：{apply}", plans)
+        plan = plans[apply - 1]
+        courses = with_fallbacks(plan, plans) if body.get("fallbacks", True) else plan["courses"]
+        if not self.app.sniper.add_target_courses(courses, merge=True):
+            return err(1001, "写入目标课程失败", plans)
+        return ok(plans, f"已把方案 {apply} 加入抢课列表")
+
+    def start_job(self, body: dict) -> dict:
+        config = {**self.config, **(body.get("config") or {})}
+        if config:
+            self.app.sniper.configure(**config)
+        return self.app.jobs.start(int(body.get("max_duration", self.max_duration)))
+
+    def shutdown(self) -> dict:
+        self._shutdown.set()
+        return ok(None, "常驻进程即将退出")
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str], body: Dict[str, Any]) -> Optional[dict]:
+        """
+        按路径分发控制命令
+        :return: 统一返回结构；未知接口返回 None
+        """
+        parts = [unquote(p) for p in path.split("/") if p]
+        jobs = self.app.jobs
+        if method == "GET":
+            if parts == ["status"]:
+                return self.status()
+            if parts == ["targets"]:
+                return self.targets()
+            if parts == ["catalog"]:
+                if not query.get("q"):
+                    return err(1001, "缺少关键词 q")
+                return self.catalog.query(query["q"], query.get("kklxdm", "01"), query.get("refresh") == "1")
+        elif method == "POST":
+            if parts == ["targets"]:
+                return self.add_targets(body)
+            if parts == ["plan"]:
+                return self.plan(body)
+            if parts == ["job", "start"]:
+                return self.start_job(body)
+            if parts == ["job", "pause"]:
+                return jobs.pause()
+            if parts == ["job", "resume"]:
+                return jobs.resume()
+            if parts == ["job", "stop"]:
+                return jobs.stop()
+            if parts == ["shutdown"]:
+                return self.shutdown()
+        elif method == "DELETE":
+            if len(parts) == 2 and parts[0] == "targets":
+                return self.remove_target(parts[1])
+        return None
+
+    # ---------- 运行 ----------
+
+    def start(self, targets: Optional[List[dict]] = None) -> bool:
+        """
+        登录、提取参数、预热目录缓存并开始监听控制接口
+        :param targets: 启动时追加到抢课列表的课程
+        :return: 是否成功
+        """
+        from functions.metrics import make_http_server
+        from modules.services.search_service import SearchService
+        if not self.app.prepare():
+            return False
+        self.started_at = self.logged_in_at = time.time()
+        self._searcher = SearchService(self.app.login.sess, self.app.base_url)
+        if targets:
+            self.app.sniper.add_target_courses(targets, merge=True)
+        if self.app.pool is None:
+            # 会话池自行处理过期的会话（见 SessionPool.evict）
+            self.app.sniper.on_session_expired = self._on_session_expired
+        for keyword in self.catalog_keywords:
+            res = self.catalog.query(keyword)
+            if res["code"] != 1000:
+                logger.warning("预热目录缓存失败（{}）：{}", keyword, res["msg"])
+
+        if not self.token:
+            self.token = secrets.token_urlsafe(32)
+        if self.token_file:
+            write_token(self.token_file, self.token)
+        # Unix 套接字在 bind 时即以 umask 决定的权限创建，先收紧 umask，避免 chmod 之前被其他用户连接
+        old_umask = os.umask(0o077) if self.unix_socket else None
+        try:
+            self._server = make_http_server(_ControlHandler, self.host, self.port, self.unix_socket)
+        finally:
+            if old_umask is not None:
+                os.umask(old_umask)
+        if self.unix_socket:
+            os.chmod(self.unix_socket, 0o600)
+        else:
+            self.port = self._server.server_address[1]
+        self._server.controller = self
+        threading.Thread(target=self._server.serve_forever, name="control-server", daemon=True).start()
+        if self.keepalive > 0:
+            threading.Thread(target=self._keepalive_loop, name="keepalive", daemon=True).start()
+        logger.info("常驻进程已就绪，控制接口: {}", self.address)
+        return True
+
+    def wait(self):
+        """阻塞到收到 /shutdown、SIGTERM 或 Ctrl+C"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self._shutdown.set())
+        try:
+            while not self._shutdown.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+
+    def close(self):
+        """停止后台任务与控制接口"""
+        self._shutdown.set()
+        if self.app.jobs is not None and self.app.jobs.active:
+            self.app.jobs.stop()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if self.unix_socket and os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+            if self.token_file and read_token(self.token_file) == self.token:
+                os.unlink(self.token_file)
+        if self.app.metrics is not None:
+            self.app.metrics.stop()
+        self.app.close()
+        logger.info("常驻进程已退出")
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class DaemonClient:
+    """控制接口的客户端"""
+
+    def __init__(self, port: int = DEFAULT_CONTROL_PORT, host: str = "127.0.0.1",
+                 unix_socket: Optional[str] = None, token: Optional[str] = None, timeout: float = 30,
+                 token_file: Optional[str] = DEFAULT_TOKEN_FILE):
+        """
+        :param token: 令牌；未指定时从 token_file 读取（常驻进程启动时写入）
+        """
+        self.port = port
+        self.host = host
+        self.unix_socket = unix_socket
+        self.token = token or (read_token(token_file) if token_file else None)
+        # 停止任务时要等待当前选课请求返回，超时应大于 JobManager.stop 的等待时间
+        self.timeout = timeout
+
+    def call(self, method: str, path: str, body: Optional[dict] = None) -> dict:
+        """
+        发送一条控制命令
+        :param path: 请求路径；查询参数的值须已用 urllib.parse.quote 编码
+        :return: 统一返回结构；连接失败返回 2333
+        """
+        if self.unix_socket:
+            conn = _UnixHTTPConnection(self.unix_socket, self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+        try:
+            # 保留调用方已编码的 %XX，只编码其余字符
+            conn.request(method, quote(path, safe="/?=&%"), payload, headers)
+            resp = conn.getresponse()
+            return json.loads(resp.read())
+        except (OSError, http.client.HTTPException) as e:
+            return err(2333, f"无法连接常驻进程：{e}")
+        except ValueError:
+            return err(2334, "响应不是合法 JSON")
+        finally:
+            conn.close()
@@ -0,0 +1,120 @@
+"""
+job_manager.py
+~~~~~~~~~~~~~~
+在后台线程中运行抢课任务，交互式菜单在抢课期间仍可搜索、添加/移除目标课程与查看课表。
+支持开始、暂停、继续与停止；运行中修改的抢课列表在下一轮开始时生效。
+"""
+
+import time
+import threading
+import contextlib
+from typing import Any, Callable, Dict, Optional
+from loguru import logger
+
+from functions.course_sniper import CourseSniper
+from functions.result import ok, err
+
+# 状态行中显示的错误类别
+ERROR_LABELS = {"full": "满员", "not_open": "未开放", "conflict": "冲突", "session_expired": "过期",
+                "timeout": "超时", "rejected": "拒绝"}
+
+
+class JobManager:
+    """管理一个 CourseSniper 的后台抢课任务（同一时间最多一个）"""
+
+    def __init__(self, sniper: CourseSniper, profile: Callable[[str], Any] = None):
+        """
+        :param sniper: 抢课实例
+        :param profile: 返回剖析上下文的函数（见 AppOrchestrator._profile），在任务线程内进入
+        """
+        self.sniper = sniper
+        self.profile = profile or (lambda name: contextlib.nullcontext())
+        self.result: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> str:
+        """idle（未开始）、running、paused 或 finished"""
+        if self._thread is None:
+            return "idle"
+        if not self._thread.is_alive():
+            return "finished"
+        return "paused" if self.sniper.paused else "running"
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, max_duration: int):
+        try:
+            with self.profile("snipe"):
+                self.result = self.sniper.start(max_duration)
+        except Exception as e:
+            logger.exception("后台抢课任务异常：")
+            self.result = {"error": str(e)}
+
+    def start(self, max_duration: int = 0) -> dict:
+        """
+        在后台开始抢课
+        :param max_duration: 最大运行时间(秒)，0表示无限制
+        :return: 统一返回结构
+        """
+        if self.active:
+            return err(1001, "已有抢课任务在运行")
+        if not self.sniper.load_target_courses():
+            return err(1001, "抢课列表为空，请先添加课程")
+        self.result = None
+        self.sniper.quiet = True
+        self.sniper.resume()
+        self._thread = threading.Thread(target=self._run, args=(max_duration,), name="snipe-job", daemon=True)
+        self._thread.start()
+        return ok(None, "抢课任务已在后台开始")
+
+    def pause(self) -> dict:
+        if self.state != "running":
+            return err(1001, "没有正在运行的抢课任务")
+        self.sniper.pause()
+        return ok(None, "抢课任务已暂停（当前请求完成后生效）")
+
+    def resume(self) -> dict:
+        if self.state != "paused":
+            return err(1001, "抢课任务未暂停")
+        self.sniper.resume()
+        return ok(None, "抢课任务已继续")
+
+    def stop(self, timeout: float = 15.0) -> dict:
+        """
+        停止抢课并等待任务线程结束（最多等到当前选课请求返回）
+        :param timeout: 最长等待时间(秒)
+        :return: 统一返回结构，data 为抢课统计
+        """
+        if not self.active:
+            return err(1001, "没有正在运行的抢课任务")
+        deadline = time.monotonic() + timeout
+        # 任务刚启动时 start() 可能尚未进入循环，重复发送停止请求直到线程退出
+        while self._thread.is_alive() and time.monotonic() < deadline:
+            self.sniper.stop()
+            self._thread.join(0.2)
+        if self._thread.is_alive():
+            return err(1003, "等待抢课任务结束超时")
+        return ok(self.result, "抢课任务已停止")
+
+    def status_line(self) -> str:
+        """一行紧凑的任务状态，例如 [抢课中] 01:23 尝试 45 (2.1/s) 成功 1/3 | 满员 30 超时 2"""
+        state = self.state
+        if state == "idle":
+            return "[空闲] 未开始抢课"
+        stats = self.sniper.stats
+        if state == "finished" and self.result is not None:
+            stats = self.result
+        elapsed = (stats.get("end_time") or time.time()) - stats.get("start_time", time.time())
+        label = {"running": "抢课中", "paused": "已暂停", "finished": "已结束"}[state]
+        line = (f"[{label}] {int(elapsed) // 60:02d}:{int(elapsed) % 60:02d} "
+                f"尝试 {stats.get('attempts', 0)}")
+        if state == "running":
+            line += f" ({self.sniper.attempt_rate():.1f}/s)"
+        line += f" 成功 {len(self.sniper.successful_courses)}/{stats.get('total_courses', 0)}"
+        errors = [f"{ERROR_LABELS.get(k, k)} {v}" for k, v in self.sniper.error_counts.most_common(3)]
+        if errors:
+            line += " | " + " ".join(errors)
+        return line
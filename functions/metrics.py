@@ -0,0 +1,221 @@
+"""
+抢课监控指标：以 Prometheus 文本格式暴露 CourseSniper 的运行状态，
+通过本机回环 HTTP 端口或 Unix 套接字提供 /metrics，仪表盘可直接抓取而无需解析日志。
+"""
+import os
+import time
+import socketserver
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Optional
+from loguru import logger
+
+from functions.course_sniper import MAX_BACKOFF
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+QUANTILES = ("0.5", "0.9", "0.99")
+
+
+def _escape(value) -> str:
+    """转义标签值"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Writer:
+    """按 Prometheus 文本格式逐个写出指标"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples):
+        """
+        :param samples: [(标签字典, 数值)]，数值为 None 的样本跳过
+        """
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if not samples:
+            return
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(**labels)} {float(value):g}")
+
+    def sample(self, name: str, labels: dict, value):
+        """追加一个不带 HELP/TYPE 的样本（用于 summary 的 _sum/_count）"""
+        self.lines.append(f"{name}{_labels(**labels)} {float(value):g}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(sniper) -> str:
+    """
+    读取 CourseSniper 当前状态，生成 Prometheus 文本格式的指标
+    :param sniper: CourseSniper 实例
+    :return: 指标文本
+    """
+    w = _Writer()
+    # 抢课线程会在重新加载目标时向这些字典添加课程，先复制再遍历
+    stats = dict(sniper.stats)
+    course_attempts = dict(stats.get("course_attempts", {}))
+    names = dict(sniper.course_names)
+    selector = sniper.selector
+
+    w.metric("sniper_running", "gauge", "抢课循环是否在运行", [({}, 1 if sniper.running else 0)])
+    w.metric("sniper_attempts_total", "counter", "选课尝试总次数", [({}, stats.get("attempts", 0))])
+    w.metric("sniper_attempts_per_second", "gauge", "最近 10 秒内每秒尝试次数", [({}, sniper.attempt_rate())])
+    w.metric("sniper_successes_total", "counter", "已成功选上的课程数", [({}, len(sniper.successful_courses))])
+    w.metric("sniper_target_courses", "gauge", "目标课程数", [({}, stats.get("total_courses", 0))])
+    if stats.get("start_time"):
+        w.metric("sniper_uptime_seconds", "gauge", "本次抢课已运行时长",
+                 [({}, (stats.get("end_time") or time.time()) - stats["start_time"])])
+    w.metric("sniper_course_attempts_total", "counter", "每门课程的尝试次数",
+             [({"kch_id": k, "kcmc": names.get(k, "")}, v) for k, v in course_attempts.items()])
+    w.metric("sniper_course_success", "gauge", "课程是否已选上",
+             [({"kch_id": k, "kcmc": names.get(k, "")}, 1 if k in sniper.successful_courses else 0)
+              for k in course_attempts])
+    w.metric("sniper_backoff_factor", "gauge", "每门课程当前生效的退避系数",
+             [({"kch_id": k}, min(MAX_BACKOFF, v)) for k, v in dict(sniper.backoff_factors).items()])
+    w.metric("sniper_errors_total", "counter", "按类别统计的选课失败次数",
+             [({"class": k}, v) for k, v in dict(sniper.error_counts).items()])
+    w.metric("sniper_session_refreshes_total", "counter", "会话刷新次数",
+             [({}, getattr(selector, "refresh_count", None))])
+    w.metric("sniper_session_refresh_failures_total", "counter", "会话刷新失败次数",
+             [({}, getattr(selector, "refresh_failures", None))])
+
+    if getattr(selector, "hedge", False):
+        hedge = selector.hedge_stats
+        w.metric("sniper_hedge_fired_total", "counter", "触发对冲请求次数", [({}, hedge.get("fired"))])
+        w.metric("sniper_hedge_won_total", "counter", "采用对冲请求响应的次数", [({}, hedge.get("hedge_won"))])
+    if hasattr(selector, "health"):
+        health = selector.health()
+        w.metric("sniper_pool_session_healthy", "gauge", "会话池成员是否可用",
+                 [({"index": h["index"]}, 1 if h.get("healthy") else 0) for h in health])
+        w.metric("sniper_pool_session_latency_seconds", "gauge", "会话池成员耗时滑动平均",
+                 [({"index": h["index"]}, h.get("latency_ewma")) for h in health])
+
+    # 请求耗时分位数：优先使用阶段计时直方图，否则退回选择器的滑动窗口
+    timings = sniper.timings.snapshot() if sniper.timings is not None else {}
+    samples, totals = [], []  # totals: [(接口, 累计次数, 累计耗时)]
+    for endpoint, phases in sorted(timings.items()):
+        total = phases.get("total")
+        if total:
+            for q in QUANTILES:
+                samples.append(({"endpoint": endpoint, "quantile": q}, total[f"p{int(float(q) * 100)}"]))
+            totals.append((endpoint, total["count"], total["mean"] * total["count"]))
+    if not samples and hasattr(selector, "latency"):
+        # 滑动窗口的分位数，_count/_sum 为累计值
+        samples = [({"endpoint": "select", "quantile": q}, selector.latency.percentile("select", float(q)))
+                   for q in QUANTILES]
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if samples:
+            totals.append(("select", *selector.latency.totals("select")))
+    w.metric("sniper_request_latency_seconds", "summary", "各接口请求耗时", samples)
+    for endpoint, count, seconds in totals:
+        w.sample("sniper_request_latency_seconds_sum", {"endpoint": endpoint}, seconds)
+        w.sample("sniper_request_latency_seconds_count", {"endpoint": endpoint}, count)
+    return w.text()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server_version = "SniperMetrics/1.0"
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics(self.server.sniper).encode("utf-8")
+        except Exception as e:
+            logger.exception(f"生成监控指标失败: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix 套接字没有客户端地址
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logger.trace("metrics: " + format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def make_http_server(handler, host: str = "127.0.0.1", port: int = 0, unix_socket: Optional[str] = None):
+    """
+    创建多线程 HTTP 服务器：指定 unix_socket 时监听该 Unix 套接字（已存在的旧套接字文件会被删除），
+    否则监听 host:port
+    :param handler: BaseHTTPRequestHandler 子类
+    :return: 服务器实例，尚未开始 serve_forever
+    """
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        return UnixHTTPServer(unix_socket, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+class MetricsServer:
+    """在后台线程中提供 /metrics"""
+
+    def __init__(self, sniper, port: int = 9464, host: str = "127.0.0.1", unix_socket: Optional[str] = None):
+        """
+        :param sniper: CourseSniper 实例
+        :param port: 监听端口（0 表示随机端口）
+        :param host: 监听地址，默认只监听本机回环
+        :param unix_socket: 指定时改为监听该 Unix 套接字路径
+        """
+        self.sniper = sniper
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        if self.unix_socket:
+            return f"unix:{self.unix_socket}"
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._server = make_http_server(_MetricsHandler, self.host, self.port, self.unix_socket)
+        if not self.unix_socket:
+            self.port = self._server.server_address[1]
+        self._server.sniper = self.sniper
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info("监控指标已开启: {}", self.address)
+        return self
+
+    def attach(self, sniper):
+        """切换到新的 CourseSniper（重新登录后会重建）"""
+        self.sniper = sniper
+        if self._server is not None:
+            self._server.sniper = sniper
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if self.unix_socket and os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
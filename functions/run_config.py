@@ -0,0 +1,132 @@
+"""
+非交互运行的配置读取：账号文件解析与凭据获取
+"""
+import os
+import json
+import time
+import datetime
+from typing import Dict, List, Any, Optional
+
+DEFAULT_BASE_URL = "https://jwxt.shu.edu.cn"
+
+# 可以直接写在配置顶层的抢课参数，会并入 config
+SNIPER_KEYS = ("interval_min", "interval_max", "max_attempts", "randomize", "backoff_factor")
+
+# 账号级配置的默认值，未在账号或 defaults 中给出时使用
+ACCOUNT_DEFAULTS = {
+    "base_url": DEFAULT_BASE_URL,
+    "year": 2025,
+    "term": 2,
+    "debug": False,
+    "max_duration": 0,
+    "config": {},
+    "targets": [],
+}
+
+
+def load_json(path: str) -> Any:
+    """读取 JSON 文件"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def resolve_password(account: Dict[str, Any]) -> str:
+    """
+    获取账号密码：优先读取 pwd_env 指定的环境变量，其次是 SHU_PWD_<学号>，最后是文件中的 pwd 字段
+    :param account: 账号配置
+    :return: 密码，找不到时返回空字符串
+    """
+    sid = str(account.get("sid", ""))
+    env_name = account.get("pwd_env") or f"SHU_PWD_{sid}"
+    return os.getenv(env_name) or account.get("pwd", "")
+
+
+def load_targets(targets: Any, base_dir: str = "") -> List[Dict[str, Any]]:
+    """
+    解析目标课程：既可以是课程列表，也可以是指向 target_courses.json 格式文件的路径
+    :param targets: 课程列表或文件路径
+    :param base_dir: 相对路径的基准目录
+    :return: 课程列表
+    """
+    if isinstance(targets, str):
+        data = load_json(os.path.join(base_dir, targets))
+        return data.get("courses", []) if isinstance(data, dict) else data
+    return list(targets or [])
+
+
+def load_accounts(path: str) -> List[Dict[str, Any]]:
+    """
+    读取账号文件，格式为：
+        {"defaults": {...}, "accounts": [{"sid": "...", "pwd_env": "...", "targets": [...], "config": {...}}]}
+    也可以直接是账号列表。每个账号会与 defaults、ACCOUNT_DEFAULTS 合并，config 字段按键合并。
+    :param path: 账号文件路径
+    :return: 合并后的账号配置列表
+    """
+    data = load_json(path)
+    if isinstance(data, list):
+        data = {"accounts": data}
+    defaults = {**ACCOUNT_DEFAULTS, **data.get("defaults", {})}
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    accounts = []
+    for raw in data.get("accounts", []):
+        account = {**defaults, **raw}
+        account["sid"] = str(account.get("sid", ""))
+        account["config"] = {**defaults.get("config", {}), **raw.get("config", {})}
+        account["targets"] = load_targets(account.get("targets"), base_dir)
+        account["pwd"] = resolve_password(account)
+        account["start_at"] = parse_start_time(account.pop("start_time", None))
+        account.pop("pwd_env", None)
+        accounts.append(account)
+    return accounts
+
+
+def parse_start_time(value: Any) -> Optional[float]:
+    """
+    解析开始时间："YYYY-MM-DD HH:MM[:SS]"、当天的 "HH:MM[:SS]"（已过则顺延到次日）或时间戳
+    :param value: 配置中的开始时间
+    :return: 时间戳；未设置时返回 None
+    """
+    if value in (None, "", 0):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            pass
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            t = datetime.datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+        start = datetime.datetime.combine(datetime.date.today(), t)
+        if start.timestamp() < time.time():
+            start += datetime.timedelta(days=1)
+        return start.timestamp()
+    raise ValueError(f"无法解析开始时间: {value}")
+
+
+def load_run_config(path: str) -> Dict[str, Any]:
+    """
+    读取单账号的运行配置。学号与密码从环境变量读取（sid_env/pwd_env 指定变量名，
+    默认 SHU_SID/SHU_PWD）；抢课参数既可以放在 config 中，也可以直接写在顶层。
+    :param path: 配置文件路径
+    :return: 与 load_accounts 返回项结构相同的账号配置，另含 start_at 时间戳
+    """
+    raw = load_json(path)
+    run = {**ACCOUNT_DEFAULTS, **raw}
+    run["sid"] = os.getenv(raw.get("sid_env", "SHU_SID")) or str(raw.get("sid", ""))
+    run["pwd"] = os.getenv(raw.get("pwd_env", "SHU_PWD"), "")
+    config = dict(raw.get("config", {}))
+    for key in SNIPER_KEYS:
+        if key in raw:
+            config[key] = raw[key]
+    run["config"] = config
+    run["targets"] = load_targets(run.get("targets"), os.path.dirname(os.path.abspath(path)))
+    run["max_duration"] = raw.get("duration", raw.get("max_duration", 0))
+    run["start_at"] = parse_start_time(raw.get("start_time"))
+    for key in ("sid_env", "pwd_env", "duration", "start_time"):
+        run.pop(key, None)
+    return run
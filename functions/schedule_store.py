@@ -0,0 +1,244 @@
+"""
+schedule_store.py
+~~~~~~~~~~~~~~~~~
+本地课表库：按学年/学期保存课表，同步时逐条比较、只在有变化时写入，并记录变更日志。
+
+  - 每条课程以教学班ID为键，对 raw_data 中除已选人数、容量等随时变化字段之外的内容求哈希；
+    哈希不变的课程不做比较，整份课表的摘要不变时连单条比较也跳过；
+  - 变化分为 added（新选上）、removed（退掉）、moved（上课时间或地点变化）与 updated（教师等其他信息变化），
+    追加到 schedule_changes.jsonl；
+  - 在 ttl 秒内再次查看直接读本地数据，过期后才向教务系统请求一次；多个学期可以并发同步。
+
+文件布局（storage_dir/schedules/）：
+    index.json                每个学期的同步时间与摘要
+    <学年>_<学期>.json        课表（只在内容变化时重写）
+    schedule_changes.jsonl    变更日志
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+
+from functions.result import ok, err
+from functions.types import ScheduleChange
+
+# 与课表内容无关、每次请求都可能变化的字段，不参与哈希
+VOLATILE_FIELDS = frozenset({"yxzrs", "jxbrs", "jxbrl", "krrl", "date", "dateDigit", "dateDigitSeparator",
+                             "day", "month", "year", "listnav", "localeKey", "pageable", "queryModel",
+                             "rangeable", "totalResult", "userModel"})
+DEFAULT_TTL = 600
+
+Fetch = Callable[[int, int], dict]
+
+
+def record_key(course: dict) -> str:
+    """课程在课表中的键：教学班ID，缺失时用课程号与名称"""
+    raw = course.get("raw_data") or {}
+    return raw.get("jxb_id") or course.get("class_id") or f"{course.get('course_id')}/{course.get('title')}"
+
+
+def record_hash(course: dict) -> str:
+    """对 raw_data 中的稳定字段求哈希"""
+    raw = course.get("raw_data") or course
+    stable = {k: v for k, v in raw.items() if k not in VOLATILE_FIELDS}
+    return hashlib.sha1(json.dumps(stable, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _where(course: dict) -> Dict[str, Any]:
+    return {"time": course.get("time", ""), "place": course.get("place", ""), "teacher": course.get("teacher", "")}
+
+
+def diff_records(old: Dict[str, dict], new: Dict[str, dict]) -> List[Tuple[str, str, Optional[dict], Optional[dict]]]:
+    """
+    比较两份课表记录
+    :param old: 键 -> {"hash", "course"}
+    :param new: 键 -> {"hash", "course"}
+    :return: [(类型, 键, 旧课程, 新课程)]，按新课表顺序，删除的排在最后
+    """
+    changes = []
+    for key, item in new.items():
+        before = old.get(key)
+        if before is None:
+            changes.append(("added", key, None, item["course"]))
+        elif before["hash"] != item["hash"]:
+            moved = (before["course"].get("time"), before["course"].get("place")) != \
+                    (item["course"].get("time"), item["course"].get("place"))
+            changes.append(("moved" if moved else "updated", key, before["course"], item["course"]))
+    changes.extend(("removed", key, item["course"], None) for key, item in old.items() if key not in new)
+    return changes
+
+
+class ScheduleStore:
+    """本地课表库，见模块说明"""
+
+    def __init__(self, storage_dir: str = "data", ttl: float = DEFAULT_TTL):
+        """
+        :param storage_dir: 存储目录，课表保存在其下的 schedules/
+        :param ttl: 本地课表的有效期(秒)，过期后查看时才向教务系统刷新
+        """
+        self.dir = os.path.join(storage_dir, "schedules")
+        self.index_file = os.path.join(self.dir, "index.json")
+        self.log_file = os.path.join(self.dir, "schedule_changes.jsonl")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(self.dir, exist_ok=True)
+
+    # ---------- 文件 ----------
+
+    def _term_file(self, year: int, term: int) -> str:
+        return os.path.join(self.dir, f"{year}_{term}.json")
+
+    @staticmethod
+    def _read_json(path: str, default):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+        except (OSError, ValueError) as e:
+            logger.warning("读取 {} 失败：{}", path, e)
+            return default
+
+    @staticmethod
+    def _write_json(path: str, data):
+        """先写临时文件再替换，中途出错不会留下半个文件"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    def _index(self) -> Dict[str, dict]:
+        return self._read_json(self.index_file, {})
+
+    def _update_index(self, year: int, term: int, **fields):
+        with self._lock:
+            index = self._index()
+            index.setdefault(f"{year}_{term}", {}).update(fields)
+            self._write_json(self.index_file, index)
+
+    # ---------- 读取 ----------
+
+    def load(self, year: int, term: int) -> Optional[dict]:
+        """
+        读取本地课表
+        :return: {"courses": [...], "synced_at": 时间戳}；没有同步过时返回 None
+        """
+        meta = self._index().get(f"{year}_{term}")
+        if meta is None:
+            return None
+        records = self._read_json(self._term_file(year, term), {}).get("records", [])
+        return {"courses": [r["course"] for r in records], "synced_at": meta.get("synced_at", 0)}
+
+    def age(self, year: int, term: int) -> Optional[float]:
+        """距上次同步的秒数；没有同步过时返回 None"""
+        meta = self._index().get(f"{year}_{term}")
+        return None if meta is None else time.time() - meta.get("synced_at", 0)
+
+    def changes(self, year: Optional[int] = None, term: Optional[int] = None, limit: int = 50) -> List[ScheduleChange]:
+        """
+        读取变更日志（最近的在后）
+        :param year: 只返回该学年的变更
+        :param term: 只返回该学期的变更
+        :param limit: 最多返回条数，0 表示全部
+        """
+        entries = []
+        try:
+            with open(self.log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if (year is None or entry.get("year") == year) and (term is None or entry.get("term") == term):
+                        entries.append(entry)
+        except FileNotFoundError:
+            return []
+        return entries[-limit:] if limit else entries
+
+    def invalidate(self, year: int, term: int):
+        """使本地课表过期（例如刚选上或退掉课程），下次查看时从教务系统刷新"""
+        if f"{year}_{term}" in self._index():
+            self._update_index(year, term, synced_at=0)
+
+    # ---------- 同步 ----------
+
+    def apply(self, year: int, term: int, courses: List[dict]) -> List[ScheduleChange]:
+        """
+        把最新课表与本地课表比较，有变化时写入课表并追加变更日志
+        :param courses: ScheduleService.get 返回的 courses
+        :return: 本次的变更
+        """
+        records = [{"key": record_key(c), "hash": record_hash(c), "course": c} for c in courses]
+        digest = hashlib.sha1("".join(f"{r['key']}:{r['hash']};" for r in records).encode("utf-8")).hexdigest()
+        meta = self._index().get(f"{year}_{term}")
+        now = time.time()
+        if meta is not None and meta.get("digest") == digest:
+            self._update_index(year, term, synced_at=now)
+            return []
+
+        old = {r["key"]: r for r in self._read_json(self._term_file(year, term), {}).get("records", [])}
+        new = {r["key"]: r for r in records}
+        at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        changes = [ScheduleChange(at=at, year=year, term=term, type=kind, key=key,
+                                  title=(after or before).get("title", ""),
+                                  before=_where(before) if before else None, after=_where(after) if after else None)
+                   for kind, key, before, after in diff_records(old, new)]
+        # 第一次同步时全部课程都是“新增”，不写入变更日志
+        if meta is not None and changes:
+            with self._lock, open(self.log_file, "a", encoding="utf-8") as f:
+                for change in changes:
+                    f.write(json.dumps(change, ensure_ascii=False) + "\n")
+            logger.info("{}-{} 课表有 {} 处变化", year, term, len(changes))
+        self._write_json(self._term_file(year, term), {"year": year, "term": term, "records": records})
+        self._update_index(year, term, synced_at=now, digest=digest, count=len(records))
+        return changes if meta is not None else []
+
+    def get(self, year: int, term: int, fetch: Fetch, max_age: Optional[float] = None, force: bool = False) -> dict:
+        """
+        查看课表：本地课表在有效期内时直接返回，否则调用 fetch 刷新并记录变更
+        :param fetch: (学年, 学期) -> ScheduleService.get 的返回
+        :param max_age: 本地课表有效期(秒)，默认 ttl
+        :param force: 忽略有效期，总是刷新
+        :return: 同 ScheduleService.get，data 另含 cached（是否来自本地）、synced_at 与 changes（本次的变更）；
+                 刷新失败但有本地课表时返回本地课表，msg 中说明
+        """
+        max_age = self.ttl if max_age is None else max_age
+        age = self.age(year, term)
+        if not force and age is not None and age <= max_age:
+            local = self.load(year, term)
+            return ok({"courses": local["courses"], "cached": True, "synced_at": local["synced_at"], "changes": []},
+                      "读取本地课表成功")
+
+        res = fetch(year, term)
+        if res["code"] not in (1000, 1001):
+            local = self.load(year, term)
+            if local is None:
+                return res
+            logger.warning("刷新 {}-{} 课表失败，使用本地课表：{}", year, term, res["msg"])
+            return ok({"courses": local["courses"], "cached": True, "synced_at": local["synced_at"], "changes": []},
+                      f"刷新失败，使用本地课表：{res['msg']}")
+        courses = res["data"].get("courses", [])
+        changes = self.apply(year, term, courses)
+        return {"code": res["code"], "msg": res["msg"],
+                "data": {"courses": courses, "cached": False, "synced_at": time.time(), "changes": changes}}
+
+    def sync(self, terms: Sequence[Tuple[int, int]], fetch: Fetch, max_workers: int = 4, force: bool = False) -> dict:
+        """
+        并发同步多个学期
+        :param terms: [(学年, 学期), ...]
+        :return: data 为 {"学年-学期": get 的返回}；全部失败时返回第一个错误
+        """
+        if not terms:
+            return err(1001, "没有要同步的学期", {})
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(terms))), thread_name_prefix="schedule") as pool:
+            results = list(pool.map(lambda t: self.get(t[0], t[1], fetch, force=force), terms))
+        data = {f"{year}-{term}": res for (year, term), res in zip(terms, results)}
+        failed = [res for res in results if res["code"] not in (1000, 1001)]
+        if len(failed) == len(results):
+            return failed[0]
+        return ok(data, f"已同步 {len(results) - len(failed)}/{len(results)} 个学期")
@@ -0,0 +1,151 @@
+"""
+target_optimizer.py
+~~~~~~~~~~~~~~~~~~~
+按偏好自动挑选教学班：给定想选的课程（每门课程的全部候选教学班）、每个教学班的偏好分数与已选课表，
+在时间不冲突的前提下，先让选上的课程门数最多，再让偏好分数总和最高，返回最优方案与按优劣排序的备选方案。
+
+搜索为分支定界：候选少的课程先分支，候选按价值从高到低尝试，“已得 + 剩余课程各取与已选时间不冲突的最高价值”
+不超过当前第 K 好的方案时剪枝；时间冲突用 modules.tools.timetable 的位图按位与判断。
+常见规模（十门课、每门十几个教学班）在几毫秒内完成。
+"""
+
+import heapq
+import itertools
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+from loguru import logger
+
+from modules.course_searcher import CourseSearcher
+from modules.tools.timetable import SlotIndex, course_mask
+from functions.types import TargetPlan
+
+DEFAULT_SCORE = 1.0
+# 已满教学班的价值折扣：仍可抢（有人退课时），但优先选有余量的
+FULL_PENALTY = 0.5
+
+
+class _Candidate(NamedTuple):
+    course: dict
+    mask: int
+    value: float
+
+
+def _certain_clash(fixed: SlotIndex, course: dict) -> bool:
+    """与课表确定冲突（周次无法识别的可能冲突不排除）"""
+    clash = fixed.conflicts_with(course)
+    return bool(clash) and fixed.is_certain(course, clash)
+
+
+def class_value(course: dict, preferences: Optional[Dict[str, float]] = None,
+                full_penalty: float = FULL_PENALTY) -> float:
+    """
+    教学班的价值：偏好分数（未指定时为 DEFAULT_SCORE），已满时乘以 full_penalty
+    :param preferences: 教学班ID -> 偏好分数；分数小于 0 表示不考虑该教学班
+    """
+    score = (preferences or {}).get(course.get("jxb_id"), DEFAULT_SCORE)
+    free = CourseSearcher.free_seats(course)
+    if score > 0 and free is not None and free <= 0:
+        score *= full_penalty
+    return score
+
+
+def optimize_targets(candidates: List[dict], preferences: Optional[Dict[str, float]] = None,
+                     fixed: Optional[SlotIndex] = None, top_k: int = 5, full_penalty: float = FULL_PENALTY,
+                     max_nodes: int = 200000) -> List[TargetPlan]:
+    """
+    挑选互不冲突、且不与课表冲突的教学班组合
+
+    :param candidates: 想选课程的候选教学班（搜索结果），按 kch_id 分组，每门课程最多选一个
+    :param preferences: 教学班ID -> 偏好分数，默认每个教学班 DEFAULT_SCORE；小于 0 的教学班不考虑
+    :param fixed: 已选课程的时间索引，与其冲突的教学班不考虑
+    :param top_k: 返回的方案数（第一个为最优方案，其余为备选）
+    :param full_penalty: 已满教学班的价值折扣
+    :param max_nodes: 搜索节点上限，超过后返回已找到的方案
+    :return: 方案列表，按 (选上门数, 分数) 从高到低排序
+    """
+    groups: Dict[str, List[_Candidate]] = OrderedDict()
+    for course in candidates:
+        kch_id = course.get("kch_id")
+        groups.setdefault(kch_id, [])
+        value = class_value(course, preferences, full_penalty)
+        if value < 0 or (fixed is not None and _certain_clash(fixed, course)):
+            continue
+        groups[kch_id].append(_Candidate(course, course_mask(course), value))
+    missing = [kch_id for kch_id, options in groups.items() if not options]
+    # 候选少的课程先分支，冲突更早暴露；同一课程内价值高的先尝试，尽早得到好的下界
+    order = sorted((options for options in groups.values() if options), key=len)
+    for options in order:
+        options.sort(key=lambda c: -c.value)
+    best = []  # 小顶堆：(选上门数, 分数, 序号, 选择)
+    counter = itertools.count()
+    nodes = 0
+
+    def kth():
+        return best[0][:2] if len(best) >= top_k else None
+
+    def search(i: int, used: int, covered: int, score: float, picks: tuple, skipped: tuple):
+        nonlocal nodes
+        nodes += 1
+        if nodes > max_nodes:
+            return
+        bound = kth()
+        if bound is not None:
+            # 上界：剩余每门课程取与已选时间不冲突的最高价值教学班（候选已按价值降序）
+            extra_covered, extra_score = 0, 0.0
+            for options in order[i:]:
+                for c in options:
+                    if not c.mask & used:
+                        extra_covered += 1
+                        extra_score += c.value
+                        break
+            if (covered + extra_covered, score + extra_score) <= bound:
+                return
+        if i == len(order):
+            # 跳过的课程里还有能放进去的教学班时，该方案只是更好方案的子集，不作为备选
+            if any(not c.mask & used for j in skipped for c in order[j]):
+                return
+            item = (covered, score, next(counter), picks)
+            if len(best) < top_k:
+                heapq.heappush(best, item)
+            else:
+                heapq.heapreplace(best, item)
+            return
+        for candidate in order[i]:
+            if not candidate.mask & used:
+                search(i + 1, used | candidate.mask, covered + 1, score + candidate.value, picks + (candidate,),
+                       skipped)
+        search(i + 1, used, covered, score, picks, skipped + (i,))
+
+    search(0, 0, 0, 0.0, (), ())
+    if nodes > max_nodes:
+        logger.warning("目标方案搜索超过 {} 个节点，返回目前找到的方案", max_nodes)
+
+    plans = []
+    for covered, score, _, picks in sorted(best, key=lambda b: (b[0], b[1], -b[2]), reverse=True):
+        chosen = {c.course.get("kch_id") for c in picks}
+        plans.append(TargetPlan(
+            courses=[c.course for c in picks],
+            score=round(score, 6),
+            covered=covered,
+            missing=missing + [k for k in groups if k not in chosen and k not in missing],
+        ))
+    return plans
+
+
+def with_fallbacks(plan: TargetPlan, plans: List[TargetPlan]) -> List[dict]:
+    """
+    把方案展开为带备选的目标列表：方案中的每门课程之后，依次附上其他方案里同一课程的教学班，
+    抢课时同一课程的教学班互为备选（见 CourseSniper 的目标分组），任一选上即取消其余
+    :param plan: 选定的方案
+    :param plans: 全部方案（按优劣排序）
+    :return: 可直接传给 CourseSniper.add_target_courses 的课程列表
+    """
+    courses, seen = [], set()
+    for primary in plan["courses"]:
+        kch_id = primary.get("kch_id")
+        for other in [plan] + plans:
+            for course in other["courses"]:
+                if course.get("kch_id") == kch_id and course.get("jxb_id") not in seen:
+                    seen.add(course.get("jxb_id"))
+                    courses.append(course)
+    return courses
@@ -1,4 +1,4 @@
-from typing import TypedDict, Dict, Any, Optional
+from typing import TypedDict, Dict, Any, List, Optional
 
 class Course(TypedDict, total=False):
     kch_id: str
@@ -28,4 +28,20 @@ class ScheduleItem(TypedDict, total=False):
     credit: Any
     time: str
     place: str
-    raw_data: Dict[str, Any]
\ No newline at end of file
+    raw_data: Dict[str, Any]
+
+class TargetPlan(TypedDict, total=False):
+    courses: List[Dict[str, Any]]
+    score: float
+    covered: int
+    missing: List[str]
+
+class ScheduleChange(TypedDict, total=False):
+    at: str
+    year: int
+    term: int
+    type: str  # added / removed / moved / updated
+    key: str
+    title: str
+    before: Optional[Dict[str, Any]]
+    after: Optional[Dict[str, Any]]
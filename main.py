@@ -1,17 +1,39 @@
+import os
 import sys
 import time
-from functions.app_orchestrator import AppOrchestrator
+import argparse
+import contextlib
 
 def run():
+    parser = argparse.ArgumentParser(description="上海大学选课助手")
+    parser.add_argument("--profile", nargs="?", const="profile", metavar="DIR",
+                        help="剖析启动、搜索与抢课，结果保存到 DIR（默认 profile/）")
+    parser.add_argument("--profile-mode", choices=("all", "cprofile", "sample"), default="all",
+                        help="all: cProfile + 栈采样；cprofile: 仅确定性剖析；sample: 仅栈采样")
+    parser.add_argument("--profile-duration", type=int, default=60, help="剖析时抢课最长运行时间(秒)")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile:
+        from modules.tools.profiler import Profiler
+        profiler = Profiler(args.profile, args.profile_mode, max_snipe_duration=args.profile_duration)
+
+    with profiler.section("import") if profiler else contextlib.nullcontext():
+        from functions.app_orchestrator import AppOrchestrator
+
     base_url = "https://jwxt.shu.edu.cn"
 
-    sid =
-    pwd = ""
+    sid = os.getenv("SHU_SID", "")
+    pwd = os.getenv("SHU_PWD", "")
     year = 2025
     term = 2
     debug_flag = True
-    orchestrator = AppOrchestrator(base_url, sid, pwd, year, term, debug_flag)
-    orchestrator.run_assistant()
+    orchestrator = AppOrchestrator(base_url, sid, pwd, year, term, debug_flag, profiler=profiler)
+    try:
+        orchestrator.run_assistant()
+    finally:
+        if profiler:
+            profiler.report()
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,172 @@
+"""
+async_jwxt_client.py
+~~~~~~~~~~~~~~~~~~~~
+JwxtClient 的 asyncio 版本，基于 aiohttp（可选依赖，首次发请求时才导入）。
+一个事件循环即可并发成百上千个搜索、轮询与选课请求，不必为每个并发请求占用一个线程。
+URL/请求头构造与响应解析复用 jwxt_client 中的纯函数，返回结构与同步客户端一致。
+"""
+
+import time
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from modules.jwxt_client import (build_url, ajax_headers, decode_page, decode_json,
+                                 RETRY_STATUS, USER_AGENT)
+from modules.tools.latency import LatencyTracker
+from modules.tools.debug_utils import hot_log
+from functions.result import err
+
+
+def _import_aiohttp():
+    """按需导入 aiohttp，未安装时给出安装提示"""
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise ImportError("异步服务需要 aiohttp，请先执行 pip install aiohttp") from e
+    return aiohttp
+
+
+class AsyncJwxtClient:
+    """教务系统异步 HTTP 客户端；持有自己的 aiohttp 会话（Cookie 与连接池），用完需 close()"""
+
+    def __init__(self, base_url: str, timeout: int = 10, retries: int = 1, retry_backoff: float = 0.2,
+                 limit: int = 100):
+        """
+        :param base_url: 教务系统基础URL
+        :param timeout: 默认请求超时时间(秒)
+        :param retries: 幂等请求遇到超时、连接错误或 5xx 时的默认重试次数
+        :param retry_backoff: 重试间隔(秒)，每次重试翻倍
+        :param limit: 连接池最大连接数，超出的请求在连接池中排队
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.limit = limit
+        self.latency = LatencyTracker()
+        # 最近一次请求是否检测到会话过期
+        self.session_expired = False
+        self._session = None
+
+    @property
+    def session(self):
+        """aiohttp 会话，须在事件循环中首次访问"""
+        if self._session is None:
+            aiohttp = _import_aiohttp()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit),
+                # unsafe=True 允许为 IP 地址保存 Cookie（本地模拟服务器）
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+                headers={"User-Agent": USER_AGENT},
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def cookies(self) -> Dict[str, str]:
+        """当前 Cookie"""
+        if self._session is None:
+            return {}
+        return {cookie.key: cookie.value for cookie in self._session.cookie_jar}
+
+    # ---------- 构造 ----------
+
+    def url(self, path: str, **query) -> str:
+        """构造接口 URL，见 build_url"""
+        return build_url(self.base_url, path, **query)
+
+    def headers(self, referer: str, accept_json: bool = True) -> Dict[str, str]:
+        """构造 AJAX 请求头，见 ajax_headers"""
+        return ajax_headers(self.base_url, referer, accept_json)
+
+    @staticmethod
+    def _form(data: dict) -> Dict[str, str]:
+        """requests 会丢弃值为 None 的表单项并把其余值转成字符串，aiohttp 不会，这里保持一致"""
+        return {k: str(v) for k, v in data.items() if v is not None}
+
+    # ---------- 发送 ----------
+
+    async def request(self, method: str, url: str, endpoint: str = "other", retries: Optional[int] = None,
+                      timeout: Optional[float] = None, **kwargs) -> Tuple[int, bytes]:
+        """
+        发送请求并读取完整响应体，超时、连接错误或 5xx 时按 retries 重试
+        :param method: GET / POST
+        :param url: 完整 URL
+        :param endpoint: 接口名，用于耗时统计
+        :param retries: 重试次数，默认使用客户端配置；非幂等请求应传 0
+        :param timeout: 超时时间(秒)
+        :return: (状态码, 响应体)；重试用尽后抛出最后一次的异常
+        """
+        aiohttp = _import_aiohttp()
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        if "data" in kwargs:
+            kwargs["data"] = self._form(kwargs["data"])
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                started = time.perf_counter()
+                async with self.session.request(method, url, timeout=client_timeout, **kwargs) as resp:
+                    body = await resp.read()
+                    status = resp.status
+                self.latency.record(endpoint, time.perf_counter() - started)
+                if status not in RETRY_STATUS or attempt >= retries:
+                    return status, body
+                hot_log("client.retry", "WARNING", "{} 返回 {}，重试", endpoint, status)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                if attempt >= retries:
+                    raise
+                hot_log("client.retry", "WARNING", "{} 请求失败（{}），重试", endpoint, type(e).__name__)
+            await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+            attempt += 1
+
+    async def get_page(self, path: str, endpoint: str = "other", timeout: Optional[float] = None,
+                       retries: Optional[int] = None, **query) -> dict:
+        """
+        GET 页面并检查状态码与会话是否过期
+        :return: 统一返回结构，data 为页面文本；1003 超时，999 其他异常
+        """
+        try:
+            status, body = await self.request("GET", self.url(path, **query), endpoint=endpoint,
+                                              retries=retries, timeout=timeout)
+        except asyncio.TimeoutError:
+            return err(1003, "请求超时", {})
+        except Exception as e:
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求异常：{}", endpoint, e)
+            return err(999, f"未知异常：{e}", {})
+        result = decode_page(status, body.decode("utf-8", "replace"))
+        self.session_expired = result["code"] == 1006
+        return result
+
+    async def post_json(self, url: str, data: dict, referer: Optional[str] = None, endpoint: str = "other",
+                        timeout: Optional[float] = None, retries: Optional[int] = None) -> dict:
+        """
+        以 AJAX 表单方式 POST 并解析 JSON 响应，参数与返回同 JwxtClient.post_json（不支持对冲）
+        """
+        hot_log(f"{endpoint}.request", "DEBUG", "POST {} Payload: {}", url, data)
+        try:
+            status, body = await self.request("POST", url, endpoint=endpoint, retries=retries, timeout=timeout,
+                                              data=data, headers=self.headers(referer or url))
+        except asyncio.TimeoutError:
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求超时", endpoint)
+            return err(1003, "请求超时", {})
+        except Exception as e:
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求异常：{}", endpoint, e)
+            return err(999, f"未知异常：{e}", {})
+
+        hot_log(f"{endpoint}.response", "DEBUG", "响应 {}: {}", status,
+                lambda: body[:500].decode("utf-8", "replace"))
+        result = decode_json(status, body)
+        self.session_expired = result["code"] == 1006
+        if result["code"] != 1000:
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求失败：{}", endpoint, result["msg"])
+        return result
@@ -1,8 +1,7 @@
 import requests
-from urllib.parse import urljoin
 from loguru import logger
-from modules.tools.debug_utils import DEBUG
-from modules.tools.display import display_course_info
+from modules.tools.debug_utils import hot_log
+from modules.jwxt_client import JwxtClient, GNMKDM_SELECT
 
 class CourseSearcher:
     SEARCH_PATH = f"jwglxt/xsxk/zzxkyzb_cxZzxkYzbPartDisplay.html"
@@ -17,6 +16,7 @@ class CourseSearcher:
         self.sess = session
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.client = JwxtClient.for_session(session, base_url, timeout)
         logger.debug("初始化 CourseSearcher：base_url={} ", self.base_url)
 
     def search_course(self, student_id: str, params: dict = None, year: int = None, term: int = None,
@@ -36,13 +36,18 @@ class CourseSearcher:
         :param filter_list: 筛选参数列表
         :return: dict，包含搜索结果
         """
+        payload = self.build_payload(params, year, term, kklxdm, kspage, jspage, keyW)
+        search_url = self.client.url(self.SEARCH_PATH, gnmkdm=GNMKDM_SELECT, su=student_id)
+        res = self.client.post_json(search_url, payload, endpoint="search", timeout=self.timeout)
+        return self.parse_result(res)
+
+    @staticmethod
+    def build_payload(params: dict = None, year: int = None, term: int = None, kklxdm: str = "",
+                      kspage: int = 1, jspage: int = 10, keyW: str = None) -> dict:
+        """构造搜索表单（同步与异步服务共用），参数同 search_course"""
         # 计算学期参数
         term_param = term ** 2 * 3  # 1 -> 3, 2 -> 12
 
-        # 构造搜索接口URL
-        search_url = urljoin(self.base_url, self.SEARCH_PATH)
-        search_url_with_params = f"{search_url}?gnmkdm=N253512&su={student_id}"
-
         # 构造请求数据
         payload = {
             "xkxnm": year,
@@ -62,81 +67,58 @@ class CourseSearcher:
         if keyW != "":
              payload['filter_list[0]'] = keyW
 
-        headers = {
-                "Referer": search_url_with_params,
-                "Origin": self.base_url,
-                "X-Requested-With": "XMLHttpRequest",
-                "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                "Accept": "application/json, text/javascript, */*; q=0.01"
-            }
-
-        logger.debug("准备搜索课程请求 → {}", search_url_with_params)
-        logger.debug("→ Payload: {}", payload)
-        logger.debug("→ Headers: {}", headers)
+        return payload
 
+    @staticmethod
+    def free_seats(course: dict):
+        """
+        教学班剩余名额：容量（jxbrs，加扩容 krrl）减已选人数（yxzrs）
+        :param course: 搜索结果中的课程
+        :return: 剩余名额（可能为负，表示超选待筛选）；缺少容量数据时返回 None
+        """
         try:
-            # 发送搜索请求
-            response = self.sess.post(
-                search_url_with_params,
-                data=payload,
-                headers=headers,
-                timeout=self.timeout
-            )
-
-            # 状态码检查
-            if response.status_code != 200:
-                logger.error("搜索课程失败，状态码: {}", response.status_code)
-                return {"code": 2333, "msg": f"搜索失败，状态码：{response.status_code}", "data": {}}
-
-            # 记录响应文本用于调试
-            logger.debug("响应文本: {}", response.text[:200])  # 记录前200个字符
-
-            # 检查响应是否为字符串 "0"
-            if response.text.strip() == '"0"' or response.text.strip() == "0":
-                logger.info("搜索结果为空")
-                return {
-                    "code": 1000,
-                    "msg": "搜索成功，但没有找到匹配的课程",
-                    "data": []
-                }
+            capacity = int(course["jxbrs"]) + int(course.get("krrl") or 0)
+            return capacity - int(course.get("yxzrs") or 0)
+        except (KeyError, TypeError, ValueError):
+            return None
 
-            try:
-                # 检查响应是否为JSON格式
-                content_type = response.headers.get('Content-Type', '')
-                if 'application/json' not in content_type and 'text/javascript' not in content_type:
-                    logger.warning("响应不是JSON格式: {}", content_type)
-
-                # 尝试将响应解析为JSON
-                result = response.json()
-
-                # 验证result是否为字典
-                if not isinstance(result, dict):
-                    logger.error("响应JSON不是字典: {}", type(result))
-                    return {"code": 1007, "msg": f"返回数据格式错误: {type(result)}", "data": []}
-
-                # 提取课程列表
-                courses = result.get("tmpList", [])
-                if not isinstance(courses, list):
-                    logger.error("课程列表不是列表类型: {}", type(courses))
-                    return {"code": 1007, "msg": f"课程列表格式错误: {type(courses)}", "data": []}
+    @staticmethod
+    def parse_result(res: dict) -> dict:
+        """
+        解析搜索接口返回（同步与异步服务共用）
+        :param res: JwxtClient.post_json 的返回
+        :return: 统一返回结构，data 为课程列表
+        """
+        if res["code"] == 2334:
+            return {"code": 1007, "msg": f"返回数据格式错误: {res['msg']}", "data": []}
+        if res["code"] != 1000:
+            return res
+        result = res["data"]
+
+        # 检查响应是否为字符串 "0"
+        if result == "0" or result == 0:
+            logger.info("搜索结果为空")
+            return {
+                "code": 1000,
+                "msg": "搜索成功，但没有找到匹配的课程",
+                "data": []
+            }
 
-                logger.info(f"搜索到 {len(courses)} 门课程")
+        # 验证result是否为字典
+        if not isinstance(result, dict):
+            logger.error("响应JSON不是字典: {}", type(result))
+            return {"code": 1007, "msg": f"返回数据格式错误: {type(result)}", "data": []}
 
-                return {
-                    "code": 1000,
-                    "msg": "搜索成功",
-                    "data": courses
-                }
+        # 提取课程列表
+        courses = result.get("tmpList", [])
+        if not isinstance(courses, list):
+            logger.error("课程列表不是列表类型: {}", type(courses))
+            return {"code": 1007, "msg": f"课程列表格式错误: {type(courses)}", "data": []}
 
-            except ValueError as e:
-                # JSON解析失败
-                logger.error("JSON解析失败: {}", e)
-                logger.debug("响应文本: {}", response.text)
-                return {"code": 1007, "msg": f"返回数据格式错误: {e}", "data": []}
+        hot_log("search.result", "INFO", "搜索到 {} 门课程", len(courses))
 
-        except requests.Timeout:
-            logger.error("请求超时")
-            return {"code": 1003, "msg": "请求超时", "data": {}}
-        except Exception as e:
-            logger.exception("搜索课程时发生未知异常：")
-            return {"code": 999, "msg": f"未知异常：{e}", "data": {}}
+        return {
+            "code": 1000,
+            "msg": "搜索成功",
+            "data": courses
+        }
@@ -1,23 +1,63 @@
+import time
+from typing import Callable, List, Optional
+
 import requests
-from urllib.parse import urljoin
 from loguru import logger
+from modules.tools.debug_utils import hot_log
+from modules.course_searcher import CourseSearcher
+from modules.jwxt_client import (JwxtClient, HedgePolicy, build_url, ajax_headers, decode_json,
+                                 GNMKDM_SELECT, SELECTION_INDEX_PATH)
+
+# 教务系统对重复选课的提示：教学班已在课表中（例如上次超时或对冲的请求实际已选上）
+ALREADY_SELECTED = ("该教学班已选", "已选过该教学班", "已选该教学班")
 
 class CourseSelector:
     """课程选择器类"""
 
     SELECT_COURSE_PATH = "jwglxt/xsxk/zzxkyzbjk_xkBcZyZzxkYzb.html"
+    DROP_COURSE_PATH = "jwglxt/xsxk/zzxkyzb_tuikBcZzxkYzb.html"
 
-    def __init__(self, session: requests.Session, base_url: str, timeout: int = 10):
+    def __init__(self, session: requests.Session, base_url: str, timeout: int = 10,
+                 hedge: bool = False, hedge_percentile: float = 0.9, hedge_min_delay: float = 0.2,
+                 hedge_initial_delay: float = 1.0, hedge_min_samples: int = 5):
         """
         初始化课程选择器
         :param session: 已登录的会话对象
         :param base_url: 教务系统基础URL
         :param timeout: 请求超时时间(秒)
+        :param hedge: 是否开启对冲请求（选课请求超过阈值未返回时再发一份相同请求）
+        :param hedge_percentile: 对冲阈值取选课接口最近耗时的分位数，默认 p90
+        :param hedge_min_delay: 对冲阈值下限(秒)，避免在快速响应时频繁对冲
+        :param hedge_initial_delay: 样本不足时使用的对冲阈值(秒)
+        :param hedge_min_samples: 使用分位数阈值前所需的最少样本数
         """
         self.sess = session
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
-        logger.debug("初始化 CourseSelector：base_url={}", self.base_url)
+        self.hedge = hedge
+        self.client = JwxtClient.for_session(session, base_url, timeout)
+        # 选课不能安全地重复发送：对冲后优先采用选上的响应，避免慢的原请求已选上、
+        # 而先返回的对冲请求报“已选”/名额已满时被当作失败
+        self.hedge_policy = HedgePolicy(hedge, hedge_percentile, hedge_min_delay, hedge_initial_delay, hedge_min_samples,
+                                        accept=self.response_selected)
+        # requests: 发出的选课请求数；fired: 触发对冲次数；hedge_won: 采用了对冲请求响应的次数
+        # （对冲请求的响应被接受，不一定先返回）；saved_seconds: 对冲胜出时相对原请求节省的累计时间
+        self.hedge_stats = self.hedge_policy.stats
+        # 最近一次请求是否检测到会话过期（返回了统一认证登录页）
+        self.session_expired = False
+        # 会话刷新次数与失败次数（供监控指标使用）
+        self.refresh_count = 0
+        self.refresh_failures = 0
+        logger.debug("初始化 CourseSelector：base_url={} hedge={}", self.base_url, self.hedge)
+
+    @property
+    def latency(self):
+        """按接口记录的请求耗时（与同一会话上的其他服务共享）"""
+        return self.client.latency
+
+    def close(self):
+        """释放对冲请求的线程池"""
+        self.client.close()
 
     def refresh_session(self, student_id: str):
         """
@@ -27,47 +67,49 @@ class CourseSelector:
         """
         try:
             # 访问选课主页面，刷新会话状态
-            refresh_url = urljoin(self.base_url, "jwglxt/xsxk/zzxkyzb_cxZzxkYzbIndex.html")
-            refresh_url_with_params = f"{refresh_url}?gnmkdm=N253512&layout=default"
-
-            logger.info("正在刷新会话状态...")
-            response = self.sess.get(
-                refresh_url_with_params,
-                timeout=self.timeout
-            )
-
-            if response.status_code != 200:
-                logger.error("刷新会话失败，状态码: {}", response.status_code)
+            self.refresh_count += 1
+            response = self.client.get(SELECTION_INDEX_PATH, endpoint="refresh", timeout=self.timeout,
+                                       gnmkdm=GNMKDM_SELECT, layout="default")
+            res = self.client.check_page(response)
+            self.session_expired = res["code"] == 1006
+            if res["code"] != 1000:
+                logger.error("刷新会话失败：{}", res["msg"])
+                self.refresh_failures += 1
                 return False
 
             # 可以额外请求一些其他页面来确保会话完全刷新
-            logger.info("会话状态已刷新")
+            hot_log("select.refresh", "INFO", "会话状态已刷新")
             return True
 
         except Exception as e:
             logger.error("刷新会话时出错: {}", e)
+            self.refresh_failures += 1
             return False
 
-    def select_course(self, student_id: str, course: dict, params: dict = None) -> dict:
+    def build_select_request(self, student_id: str, course: dict, params: dict) -> tuple:
         """
-        选课操作
+        构造选课请求（不发送），供选课与预演(dry-run)共用
         :param student_id: 学号
-        :param course: 课程信息字典，包含必要的选课信息
-        :param params: 附加参数
-        :return: 选课结果
+        :param course: 课程信息字典
+        :param params: 选课参数
+        :return: (URL, 表单数据, 请求头)
         """
-        # 首先刷新会话
-        if not self.refresh_session(student_id):
-            return {"code": 1002, "msg": "刷新会话失败，无法继续选课", "data": {}}
-
         # 构造选课URL
-        select_url = urljoin(self.base_url, self.SELECT_COURSE_PATH)
-        select_url_with_params = f"{select_url}?gnmkdm=N253512&su={student_id}"
+        select_url_with_params = build_url(self.base_url, self.SELECT_COURSE_PATH, gnmkdm=GNMKDM_SELECT, su=student_id)
+
+        payload = self.build_payload(course, params)
+
+        referer = build_url(self.base_url, SELECTION_INDEX_PATH, gnmkdm=GNMKDM_SELECT, layout="default")
+        headers = ajax_headers(self.base_url, referer)
+
+        return select_url_with_params, payload, headers
 
+    @staticmethod
+    def build_payload(course: dict, params: dict) -> dict:
+        """构造选课表单（同步与异步服务共用）"""
         # 获取必要的参数
         jxb_ids = course.get("jxb_id", "")
         kch_id = course.get("kch_id", "")
-        kcmc = course.get("kcmc", "")
         qz = course.get("qz", "0")
 
         # 其他必要参数
@@ -91,69 +133,241 @@ class CourseSelector:
             "xkxnm": year,
             "xkxqm": term,
         }
+        return payload
 
-        headers = {
-            "Referer": f"{self.base_url}/jwglxt/xsxk/zzxkyzb_cxZzxkYzbIndex.html?gnmkdm=N253512&layout=default",
-            "Origin": self.base_url,
-            "X-Requested-With": "XMLHttpRequest",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "Accept": "application/json, text/javascript, */*; q=0.01"
-        }
+    def select_course(self, student_id: str, course: dict, params: dict = None) -> dict:
+        """
+        选课操作
+        :param student_id: 学号
+        :param course: 课程信息字典，包含必要的选课信息
+        :param params: 附加参数
+        :return: 选课结果
+        """
+        # 首先刷新会话
+        if not self.refresh_session(student_id):
+            if self.session_expired:
+                return {"code": 1006, "msg": "未登录或会话过期", "data": {}}
+            return {"code": 1002, "msg": "刷新会话失败，无法继续选课", "data": {}}
 
-        logger.debug("准备选课请求 → {}", select_url_with_params)
-        logger.debug("→ Payload: {}", payload)
-        logger.debug("→ Headers: {}", headers)
+        select_url_with_params, payload, headers = self.build_select_request(student_id, course, params or {})
+        kcmc = course.get("kcmc", "")
 
-        try:
-            # 发送选课请求
-            response = self.sess.post(
-                select_url_with_params,
-                data=payload,
-                headers=headers,
-                timeout=self.timeout
-            )
-
-            # 状态码检查
-            if response.status_code != 200:
-                error_content = response.text[:500] if response.text else "无响应内容"
-                error_detail = {
-                    "status_code": response.status_code,
-                    "url": select_url_with_params,
-                    "response_preview": error_content,
-                    "headers": dict(response.headers)
-                }
-
-            # 记录响应文本用于调试
-            logger.debug("响应文本: {}", response.text)
-
-            try:
-                # 解析响应JSON
-                result = response.json()
-
-                # 检查选课结果
-                if result.get("flag") == "1":
-                    logger.info("选课成功: {}", kcmc)
-                    return {
-                        "code": 1000,
-                        "msg": "选课成功",
-                        "data": result
-                    }
-                else:
-                    error_msg = result.get("msg", "未知错误")
-                    logger.error("选课失败: {}", error_msg)
-                    return {
-                        "code": 1001,
-                        "msg": f"选课失败: {error_msg}",
-                        "data": result
-                    }
-
-            except ValueError as e:
-                logger.error("解析选课响应失败: {}", e)
-                return {"code": 1007, "msg": f"解析选课响应失败: {e}", "data": {}}
-
-        except requests.Timeout:
-            logger.error("选课请求超时")
+        # 选课请求不重试（sniper 会按退避策略重新尝试），可开启对冲
+        res = self.client.post_json(select_url_with_params, payload, referer=headers["Referer"], endpoint="select",
+                                    timeout=self.timeout, retries=0, hedge=self.hedge_policy)
+        self.session_expired = res["code"] == 1006
+        return self.parse_result(res, kcmc)
+
+    @staticmethod
+    def is_selected(result) -> bool:
+        """
+        选课接口返回的 JSON 是否表示该教学班已在课表中：flag 为 "1"，
+        或教务系统提示重复选课（“该教学班已选”等，不包括“已选满”）
+        """
+        if not isinstance(result, dict):
+            return False
+        if result.get("flag") == "1":
+            return True
+        msg = str(result.get("msg") or "")
+        return any(marker in msg for marker in ALREADY_SELECTED) and "已选满" not in msg
+
+    @classmethod
+    def response_selected(cls, response: requests.Response) -> bool:
+        """对冲判定：HTTP 响应是否为选上的结果"""
+        res = decode_json(response.status_code, response.content)
+        return res["code"] == 1000 and cls.is_selected(res["data"])
+
+    @classmethod
+    def parse_result(cls, res: dict, kcmc: str = "") -> dict:
+        """
+        解析选课接口返回（同步与异步服务共用）
+        :param res: JwxtClient.post_json 的返回
+        :param kcmc: 课程名称，用于日志
+        :return: 选课结果；1000 成功（包括提示该教学班已选），1001 被教务系统拒绝，
+                 1007 响应无法解析（包括 HTTP 状态码异常，与改用 JwxtClient 之前一致）
+        """
+        if res["code"] == 2333:
+            hot_log("select.status", "WARNING", "选课响应异常: {}", res["msg"])
+            return {"code": 1007, "msg": f"解析选课响应失败: {res['msg']}", "data": {}}
+        if res["code"] == 2334:
+            return {"code": 1007, "msg": f"解析选课响应失败: {res['msg']}", "data": {}}
+        if res["code"] == 1003:
             return {"code": 1003, "msg": "选课请求超时", "data": {}}
-        except Exception as e:
-            logger.exception("选课时发生未知异常：")
-            return {"code": 999, "msg": f"未知异常：{e}", "data": {}}
+        if res["code"] != 1000:
+            return res
+
+        result = res["data"]
+        if not isinstance(result, dict):
+            return {"code": 1007, "msg": f"解析选课响应失败: {type(result)}", "data": {}}
+
+        # 检查选课结果
+        if result.get("flag") == "1":
+            logger.info("选课成功: {}", kcmc)
+            return {
+                "code": 1000,
+                "msg": "选课成功",
+                "data": result
+            }
+        elif cls.is_selected(result):
+            # 例如之前超时或对冲的请求实际已选上：教学班已在课表中
+            logger.info("教学班已在课表中，视为选课成功: {} ({})", kcmc, result.get("msg"))
+            return {
+                "code": 1000,
+                "msg": f"选课成功（{result.get('msg')}）",
+                "data": result
+            }
+        else:
+            error_msg = result.get("msg", "未知错误")
+            hot_log("select.failed", "ERROR", "选课失败: {}", error_msg)
+            return {
+                "code": 1001,
+                "msg": f"选课失败: {error_msg}",
+                "data": result
+            }
+
+    # ---------- 退课与换班 ----------
+
+    def build_drop_request(self, student_id: str, course: dict, params: dict) -> tuple:
+        """
+        构造退课请求（不发送）
+        :return: (URL, 表单数据, 请求头)
+        """
+        drop_url = build_url(self.base_url, self.DROP_COURSE_PATH, gnmkdm=GNMKDM_SELECT, su=student_id)
+        referer = build_url(self.base_url, SELECTION_INDEX_PATH, gnmkdm=GNMKDM_SELECT, layout="default")
+        return drop_url, self.build_drop_payload(course, params), ajax_headers(self.base_url, referer)
+
+    @staticmethod
+    def build_drop_payload(course: dict, params: dict) -> dict:
+        """构造退课表单"""
+        return {
+            "kch_id": course.get("kch_id", ""),
+            "jxb_ids": course.get("jxb_id", ""),
+            "xkxnm": params.get("xkxnm", ""),
+            "xkxqm": params.get("xkxqm", ""),
+            # 退课后释放容量
+            "txbsfrl": "0",
+        }
+
+    @staticmethod
+    def parse_drop_result(res: dict, kcmc: str = "") -> dict:
+        """
+        解析退课接口返回：成功时为 "1"，失败时为提示文本（不是 JSON）
+        :param res: JwxtClient.post_json 的返回
+        :return: 1000 成功，1001 被教务系统拒绝
+        """
+        if res["code"] == 2334:
+            return {"code": 1001, "msg": f"退课失败: {res['data'] or res['msg']}", "data": {}}
+        if res["code"] != 1000:
+            return res
+        result = res["data"]
+        flag = result.get("flag") if isinstance(result, dict) else result
+        if str(flag) == "1":
+            logger.info("退课成功: {}", kcmc)
+            return {"code": 1000, "msg": "退课成功", "data": {}}
+        error_msg = result.get("msg", "未知错误") if isinstance(result, dict) else result
+        logger.error("退课失败: {}", error_msg)
+        return {"code": 1001, "msg": f"退课失败: {error_msg}", "data": result}
+
+    def drop_course(self, student_id: str, course: dict, params: dict = None) -> dict:
+        """
+        退课
+        :param course: 已选课程，需包含 kch_id 与 jxb_id
+        :return: 退课结果，见 parse_drop_result
+        """
+        if not self.refresh_session(student_id):
+            if self.session_expired:
+                return {"code": 1006, "msg": "未登录或会话过期", "data": {}}
+            return {"code": 1002, "msg": "刷新会话失败，无法退课", "data": {}}
+        url, payload, headers = self.build_drop_request(student_id, course, params or {})
+        res = self.client.post_json(url, payload, referer=headers["Referer"], endpoint="drop",
+                                    timeout=self.timeout, retries=0)
+        self.session_expired = res["code"] == 1006
+        return self.parse_drop_result(res, course.get("kcmc", ""))
+
+    def _prepare(self, endpoint: str, url: str, payload: dict, headers: dict):
+        return self.client.prepare_post(url, payload, referer=headers["Referer"], endpoint=endpoint,
+                                        timeout=self.timeout)
+
+    def swap_course(self, student_id: str, current: dict, preferred: dict, params: dict = None,
+                    seat_lookup: Optional[Callable[[str], List[dict]]] = None, rollback_retries: int = 2) -> dict:
+        """
+        换班：把已选的 current 换成同一课程的 preferred 教学班。
+        先确认 preferred 有空余名额，再在刚刷新过（连接已建立）的会话上，用预先构造好的请求
+        紧接着发出退课与选课（退课被拒时不发选课）；选课失败时立即重新选回 current。
+        退课成功到选课到达服务端之间，两个教学班的名额都可能被别人抢走，因此请求提前构造、
+        中间不做任何多余的事，并记录这段间隔。
+
+        :param current: 当前已选的教学班
+        :param preferred: 想换到的教学班（kch_id 必须与 current 相同）
+        :param params: 选课参数
+        :param seat_lookup: 按课程号返回该课程各教学班最新信息的函数（如按 kch_id 搜索），
+                            用于确认名额；为空时使用 preferred 自身的容量字段
+        :param rollback_retries: 回滚请求超时或出错时的重试次数
+        :return: 1000 换班成功；1001 未换班（名额已满、退课被拒，或选课失败且已选回原教学班）；
+                 1008 选课失败且未能选回原教学班；1006 会话过期。
+                 data 含 dropped（退课是否确认成功）/selected/rolled_back、free_seats 与耗时：
+                 drop_ms/select_ms 为两次请求往返，gap_ms 为收到退课响应到发出选课请求的客户端间隔，
+                 window_ms 为名额空窗的估计（gap + 两次往返各一半）
+        """
+        params = params or {}
+        kcmc = preferred.get("kcmc") or current.get("kcmc", "")
+        data = {"dropped": False, "selected": False, "rolled_back": False, "free_seats": None}
+        if current.get("kch_id") != preferred.get("kch_id"):
+            return {"code": 1001, "msg": "只能在同一课程的教学班之间换班", "data": data}
+        if current.get("jxb_id") == preferred.get("jxb_id"):
+            return {"code": 1001, "msg": "已经在该教学班", "data": data}
+
+        # 刷新会话：确认会话有效，同时让连接池里有一条刚用过的连接
+        if not self.refresh_session(student_id):
+            if self.session_expired:
+                return {"code": 1006, "msg": "未登录或会话过期", "data": data}
+            return {"code": 1002, "msg": "刷新会话失败，无法换班", "data": data}
+
+        latest = preferred
+        if seat_lookup is not None:
+            latest = next((c for c in seat_lookup(preferred.get("kch_id", ""))
+                           if c.get("jxb_id") == preferred.get("jxb_id")), None)
+            if latest is None:
+                return {"code": 1001, "msg": f"未找到教学班 {preferred.get('jxb_id')}", "data": data}
+        free = CourseSearcher.free_seats(latest)
+        data["free_seats"] = free
+        if free is not None and free <= 0:
+            return {"code": 1001, "msg": f"{kcmc} 目标教学班已满，未退课", "data": data}
+
+        drop = self._prepare("drop", *self.build_drop_request(student_id, current, params))
+        select = self._prepare("select", *self.build_select_request(student_id, preferred, params))
+        rollback = self._prepare("select", *self.build_select_request(student_id, current, params))
+
+        res_drop = self.parse_drop_result(drop(), current.get("kcmc", ""))
+        data["drop_ms"] = round((drop.received_at - drop.sent_at) * 1000, 3)
+        if res_drop["code"] in (1001, 1006):
+            # 退课被拒或会话过期：不发选课请求，原教学班仍在
+            self.session_expired = res_drop["code"] == 1006
+            return {"code": res_drop["code"], "msg": res_drop["msg"], "data": data}
+        # 退课成功，或超时等无法确认（可能已退）：紧接着选课
+        data["dropped"] = res_drop["code"] == 1000
+        res_select = select()
+        data.update(select_ms=round((select.received_at - select.sent_at) * 1000, 3),
+                    gap_ms=round((select.sent_at - drop.received_at) * 1000, 3))
+        data["window_ms"] = round(data["gap_ms"] + (data["drop_ms"] + data["select_ms"]) / 2, 3)
+
+        res_select = self.parse_result(res_select, kcmc)
+        if res_select["code"] == 1000:
+            data["selected"] = True
+            logger.info("换班成功: {} {} -> {}，名额空窗约 {:.1f}ms", kcmc, current.get("jxb_id"),
+                        preferred.get("jxb_id"), data["window_ms"])
+            return {"code": 1000, "msg": "换班成功", "data": data}
+        # 选课失败：立即选回原教学班
+
+        for _ in range(rollback_retries + 1):
+            res_back = self.parse_result(rollback(), current.get("kcmc", ""))
+            if res_back["code"] in (1000, 1001):
+                break
+        data["rolled_back"] = res_back["code"] == 1000
+        if data["rolled_back"]:
+            logger.warning("换班失败（{}），已选回原教学班 {}", res_select["msg"], current.get("jxb_id"))
+            return {"code": 1001, "msg": f"换班失败，已选回原教学班: {res_select['msg']}", "data": data}
+        logger.error("换班失败（{}），且未能选回原教学班 {}: {}", res_select["msg"], current.get("jxb_id"),
+                     res_back["msg"])
+        hint = "" if data["dropped"] else "（退课结果未确认，请查看课表）"
+        return {"code": 1008, "msg": f"换班失败且未能选回原教学班{hint}: {res_back['msg']}", "data": data}
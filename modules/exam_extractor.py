@@ -1,24 +1,61 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+
 import requests
-from urllib.parse import urljoin
 from loguru import logger
+from modules.jwxt_client import JwxtClient, GNMKDM_EXAM
 
 class ExamExtractor:
     EXAM_PATH = "jwglxt/kwgl/kscx_cxXsksxxIndex.html"
+    # 每页条数（与网页一致）；考试超过一页时其余页并发获取
+    PAGE_SIZE = 15
 
     def __init__(self, session: requests.Session, base_url: str, timeout: int = 10):
         self.sess = session
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.client = JwxtClient.for_session(session, base_url, timeout)
         logger.debug("初始化 ExamExtractor：base_url={} timeout={}", self.base_url, self.timeout)
 
-    def get_exam_schedule(self, year: int, term: int, student_id: str) -> dict:
-        exam_url = urljoin(self.base_url, self.EXAM_PATH)
-        exam_url_with_params = f"{exam_url}?doType=query&gnmkdm=N358105"
+    def _fetch_page(self, year: int, term: int, page: int, page_size: int) -> dict:
+        exam_url = self.client.url(self.EXAM_PATH, doType="query", gnmkdm=GNMKDM_EXAM)
+        referer = self.client.url(self.EXAM_PATH, gnmkdm=GNMKDM_EXAM, layout="default")
+        return self.client.post_json(exam_url, self.build_payload(year, term, page, page_size), referer=referer,
+                                     endpoint="exam", timeout=self.timeout)
+
+    def get_exam_schedule(self, year: int, term: int, student_id: str, page_size: int = PAGE_SIZE,
+                          max_workers: int = 4) -> dict:
+        """
+        获取一个学期的全部考试：先取第一页，按其中的总页数并发获取其余页后合并
+        :param page_size: 每页条数
+        :param max_workers: 并发获取的最大线程数
+        :return: 统一返回结构，data 为考试信息；任一页失败时返回该页的错误，不返回残缺结果
+        """
+        first = self._fetch_page(year, term, 1, page_size)
+        pages = self.page_count(first, page_size)
+        rest = []
+        if pages > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, pages - 1), thread_name_prefix="exam-page") as pool:
+                rest = list(pool.map(lambda page: self._fetch_page(year, term, page, page_size), range(2, pages + 1)))
+        return self.parse_result(self.merge_pages(first, rest), year, term)
+
+    def get_exam_schedules(self, terms: Sequence[Tuple[int, int]], student_id: str, max_workers: int = 4) -> dict:
+        """
+        并发获取多个学年/学期的考试并合并为一个结果
+        :param terms: [(学年, 学期), ...]
+        :return: 见 combine_terms
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(terms))), thread_name_prefix="exam-term") as pool:
+            results = list(pool.map(lambda t: self.get_exam_schedule(t[0], t[1], student_id), terms))
+        return self.combine_terms(terms, results)
+
+    @staticmethod
+    def build_payload(year: int, term: int, page: int = 1, page_size: int = PAGE_SIZE) -> dict:
+        """构造考试查询表单（同步与异步服务共用）"""
         term_param = 3 if term == 1 else 16
         xqm = "" if term_param == 0 else str(term_param)
-
-        payload = {
+        return {
             "xnm": str(year),
             "xqm": xqm,
             "ksmcdmb_id": "",
@@ -28,50 +65,111 @@ class ExamExtractor:
             "kkbm_id": "",
             "_search": "false",
             "nd": int(time.time() * 1000),
-            "queryModel.showCount": "15",
-            "queryModel.currentPage": "1",
+            "queryModel.showCount": str(page_size),
+            "queryModel.currentPage": str(page),
             "queryModel.sortName": "+",
             "queryModel.sortOrder": "asc",
             "time": "0",
         }
-        headers = {
-            "Referer": f"{self.base_url}/jwglxt/kwgl/kscx_cxXsksxxIndex.html?gnmkdm=N358105&layout=default",
-            "Origin": self.base_url,
-            "X-Requested-With": "XMLHttpRequest",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "Accept": "application/json, text/javascript, */*; q=0.01",
-        }
 
+    @staticmethod
+    def page_count(res: dict, page_size: int = PAGE_SIZE) -> int:
+        """由第一页响应得到总页数（totalPage，缺失时按 totalCount 计算）；第一页失败时为 1"""
+        data = res.get("data")
+        if res["code"] != 1000 or not isinstance(data, dict):
+            return 1
         try:
-            resp = self.sess.post(exam_url_with_params, data=payload, headers=headers, timeout=self.timeout)
-            logger.debug("考试请求状态: {}", resp.status_code)
-
-            if resp.status_code != 200:
-                return {"code": 2333, "msg": "考试接口请求失败"}
+            return max(1, int(data["totalPage"]))
+        except (KeyError, TypeError, ValueError):
+            pass
+        try:
+            return max(1, -(-int(data["totalCount"]) // page_size))
+        except (KeyError, TypeError, ValueError):
+            return 1
 
-            if "用户登录" in resp.text or "统一认证" in resp.text:
-                return {"code": 1006, "msg": "未登录或会话过期"}
+    @staticmethod
+    def merge_pages(first: dict, rest: List[dict]) -> dict:
+        """
+        合并各页响应的 items（同步与异步服务共用），按响应中的 currentPage 排序
+        :param first: 第一页的 post_json 返回
+        :param rest: 其余页的 post_json 返回
+        :return: 形如第一页的返回，data.items 为全部条目；任一页失败时返回该页的错误
+        """
+        if first["code"] != 1000 or not rest:
+            return first
+        pages = [first["data"]]
+        for page, res in enumerate(rest, 2):
+            if res["code"] != 1000:
+                logger.error("获取考试信息第 {} 页失败：{}", page, res["msg"])
+                return {"code": res["code"], "msg": f"获取考试信息第 {page} 页失败：{res['msg']}", "data": {}}
+            if isinstance(res["data"], dict):
+                pages.append(res["data"])
 
+        def page_no(data):
             try:
-                data = resp.json()
-            except Exception as e:
-                logger.error("考试响应解析失败: {}", e)
-                return {"code": 2334, "msg": "响应数据格式错误", "data": {}}
+                return int(data.get("currentPage"))
+            except (TypeError, ValueError):
+                return 0
+
+        items = [item for data in sorted(pages, key=page_no) for item in data.get("items") or []]
+        total = first["data"].get("totalCount")
+        if total is not None and str(total).isdigit() and int(total) != len(items):
+            logger.warning("考试信息条数与总数不一致：{} / {}", len(items), total)
+        return {"code": 1000, "msg": first["msg"], "data": dict(first["data"], items=items)}
+
+    @staticmethod
+    def combine_terms(terms: Sequence[Tuple[int, int]], results: List[dict]) -> dict:
+        """
+        合并多个学期的考试结果（同步与异步服务共用）
+        :return: data 同单学期结果，courses 中每条考试带 year/term，
+                 terms 为各学期的场次，errors 为获取失败的学期；全部失败时返回第一个错误
+        """
+        combined = {"sid": None, "name": None, "year": None, "term": None, "count": 0,
+                    "terms": [], "errors": [], "courses": []}
+        for (year, term), res in zip(terms, results):
+            if res["code"] not in (1000, 1005):
+                combined["errors"].append({"year": year, "term": term, "code": res["code"], "msg": res["msg"]})
+                continue
+            data = res["data"]
+            combined["sid"] = combined["sid"] or data.get("sid")
+            combined["name"] = combined["name"] or data.get("name")
+            courses = [dict(c, year=year, term=term) for c in data.get("courses", [])]
+            combined["terms"].append({"year": year, "term": term, "count": len(courses)})
+            combined["courses"].extend(courses)
+        combined["count"] = len(combined["courses"])
+        if not combined["terms"] and combined["errors"]:
+            first = combined["errors"][0]
+            return {"code": first["code"], "msg": first["msg"], "data": {}}
+        if not combined["courses"]:
+            return {"code": 1005, "msg": "无考试数据", "data": combined}
+        return {"code": 1000, "msg": "获取考试信息成功", "data": combined}
 
-            if not isinstance(data, dict):
-                logger.warning("考试信息响应格式不正确，预期为 dict，实际为 {}: {}", type(data), data)
-                return {"code": 2335, "msg": f"响应格式不正确: {data}", "data": {}}
+    @staticmethod
+    def parse_result(res: dict, year: int, term: int) -> dict:
+        """
+        解析考试接口返回（同步与异步服务共用）
+        :param res: JwxtClient.post_json 的返回
+        :return: 统一返回结构，data 为考试信息
+        """
+        if res["code"] != 1000:
+            return res
+        data = res["data"]
 
-            items = data.get("items") or []
-            if not items:
-                return {"code": 1005, "msg": "无考试数据", "data": {"courses": []}}
+        if not isinstance(data, dict):
+            logger.warning("考试信息响应格式不正确，预期为 dict，实际为 {}: {}", type(data), data)
+            return {"code": 2335, "msg": f"响应格式不正确: {data}", "data": {}}
 
-            def to_float(v):
-                try:
-                    return float(v) if v is not None and v != '' else None
-                except Exception:
-                    return None
+        items = data.get("items") or []
+        if not items:
+            return {"code": 1005, "msg": "无考试数据", "data": {"courses": []}}
 
+        def to_float(v):
+            try:
+                return float(v) if v is not None and v != '' else None
+            except Exception:
+                return None
+
+        try:
             result = {
                 "sid": items[0].get("xh"),
                 "name": items[0].get("xm"),
@@ -99,9 +197,7 @@ class ExamExtractor:
                     for i in items
                 ],
             }
-            return {"code": 1000, "msg": "获取考试信息成功", "data": result}
-        except requests.Timeout:
-            return {"code": 1003, "msg": "请求超时"}
-        except Exception as e:
-            logger.exception("获取考试信息异常")
-            return {"code": 999, "msg": f"未知异常：{e}"}
+        except AttributeError as e:
+            logger.error("考试信息格式错误: {}", e)
+            return {"code": 2334, "msg": "响应数据格式错误", "data": {}}
+        return {"code": 1000, "msg": "获取考试信息成功", "data": result}
@@ -0,0 +1,417 @@
+"""
+jwxt_client.py
+~~~~~~~~~~~~~~
+教务系统统一 HTTP 客户端：所有服务（搜索、选课、课表、考试、选课参数、菜单初始化）
+都通过它发请求，由它统一负责
+  - URL 构造（gnmkdm、su 等查询参数）与 AJAX 请求头（X-Requested-With/Origin/Referer）；
+  - 超时、失败重试（只对幂等的查询请求）、对冲请求；
+  - 状态码检查、会话过期（统一认证登录页）检测与 JSON 解析的快速路径；
+  - 按接口记录耗时，供对冲阈值与监控使用。
+
+构造与解析部分是不依赖 requests 的纯函数（build_url、ajax_headers、is_login_page、
+decode_page、decode_json），异步客户端（async_jwxt_client.py）直接复用。
+"""
+
+import json
+import time
+import threading
+from urllib.parse import urljoin, urlencode
+from typing import Callable, Dict, Optional, Union
+
+import requests
+
+from modules.tools.latency import LatencyTracker
+from modules.tools.debug_utils import hot_log
+from functions.result import ok, err
+
+# 功能模块代码
+GNMKDM_SELECT = "N253512"
+GNMKDM_EXAM = "N358105"
+
+# 自主选课主页面：刷新会话、提取选课参数、作为 AJAX 请求的 Referer
+SELECTION_INDEX_PATH = "jwglxt/xsxk/zzxkyzb_cxZzxkYzbIndex.html"
+MENU_INIT_PATH = "jwglxt/xtgl/index_initMenu.html"
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/122.0.0.0 Safari/537.36")
+
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded; charset=UTF-8"
+JSON_ACCEPT = "application/json, text/javascript, */*; q=0.01"
+
+# 这些状态码视为服务端临时故障，幂等请求可重试
+RETRY_STATUS = (502, 503, 504)
+_JSON_HEADS = ("{", "[", b"{", b"[")
+
+
+def build_url(base_url: str, path: str, **query) -> str:
+    """
+    构造教务系统接口 URL，查询参数按传入顺序拼接，值为 None 的参数忽略
+    例如 build_url(base, path, gnmkdm=GNMKDM_SELECT, su=sid)
+    """
+    url = urljoin(base_url.rstrip('/') + '/', path)
+    params = {k: v for k, v in query.items() if v is not None}
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+def ajax_headers(base_url: str, referer: str, accept_json: bool = True) -> Dict[str, str]:
+    """构造教务系统 AJAX 表单请求头"""
+    headers = {
+        "Referer": referer,
+        "Origin": base_url.rstrip('/'),
+        "X-Requested-With": "XMLHttpRequest",
+        "Content-Type": FORM_CONTENT_TYPE,
+    }
+    if accept_json:
+        headers["Accept"] = JSON_ACCEPT
+    return headers
+
+
+def is_login_page(text: str) -> bool:
+    """判断响应是否为统一认证登录页（会话过期时教务系统会跳转到该页）"""
+    return "用户登录" in text or "统一认证" in text
+
+
+def decode_page(status_code: int, text: str) -> dict:
+    """
+    检查页面响应的状态码与会话是否过期
+    :return: 统一返回结构，data 为页面文本；2333 状态码异常，1006 会话过期
+    """
+    if status_code != 200:
+        return err(2333, f"请求失败，状态码：{status_code}", {})
+    if is_login_page(text):
+        return err(1006, "未登录或会话过期", {})
+    return ok(text)
+
+
+def decode_json(status_code: int, body: Union[bytes, str]) -> dict:
+    """
+    检查状态码、会话过期并解析 JSON
+    快速路径：响应体以 { 或 [ 开头时直接解析原始字节，既不可能是登录页，
+    也跳过 requests 在未声明编码时对整个响应体的字符集探测
+    :param status_code: HTTP 状态码
+    :param body: 响应体（bytes 或 str）
+    :return: 统一返回结构；2333 状态码异常，1006 会话过期，2334 不是合法 JSON
+    """
+    if status_code != 200:
+        return err(2333, f"请求失败，状态码：{status_code}", {})
+    if body.lstrip()[:1] in _JSON_HEADS:
+        try:
+            return ok(json.loads(body))
+        except ValueError:
+            pass
+    text = body.decode("utf-8", "replace") if isinstance(body, bytes) else body
+    if is_login_page(text):
+        return err(1006, "未登录或会话过期", {})
+    try:
+        return ok(json.loads(text))
+    except ValueError as e:
+        return err(2334, f"响应数据格式错误: {e}", text[:500])
+
+
+class HedgePolicy:
+    """对冲请求策略与统计：请求超过阈值未返回时，在连接池的另一条连接上再发一份"""
+
+    def __init__(self, enabled: bool = False, percentile: float = 0.9, min_delay: float = 0.2,
+                 initial_delay: float = 1.0, min_samples: int = 5,
+                 accept: Optional[Callable[[requests.Response], bool]] = None):
+        """
+        :param enabled: 是否开启对冲
+        :param percentile: 对冲阈值取接口最近耗时的分位数，默认 p90
+        :param min_delay: 对冲阈值下限(秒)，避免在快速响应时频繁对冲
+        :param initial_delay: 样本不足时使用的对冲阈值(秒)
+        :param min_samples: 使用分位数阈值前所需的最少样本数
+        :param accept: 判断响应是否为成功结果；对冲后先返回的响应不成功时，等另一份请求返回再决定，
+                       优先取成功的响应（用于选课这类重复发送结果可能不同的请求）。None 表示先返回者胜出
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.accept = accept
+        # requests: 发出的请求数；fired: 触发对冲次数；hedge_won: 采用了对冲请求响应的次数；
+        # saved_seconds: 对冲胜出时相对原请求节省的累计时间
+        self.stats = {"requests": 0, "fired": 0, "hedge_won": 0, "saved_seconds": 0.0}
+        # 统计会在对冲线程池的回调中更新
+        self._lock = threading.Lock()
+
+    def record(self, key: str, amount: float = 1):
+        """累加一项统计（线程安全）"""
+        with self._lock:
+            self.stats[key] += amount
+
+    def delay(self, latency: LatencyTracker, endpoint: str) -> float:
+        """当前对冲阈值：样本充足时取接口耗时分位数，否则使用初始阈值"""
+        if latency.count(endpoint) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, latency.percentile(endpoint, self.percentile))
+
+
+class JwxtClient:
+    """教务系统统一 HTTP 客户端，同一会话上的各服务共享一个实例（见 for_session）"""
+
+    def __init__(self, session: requests.Session, base_url: str, timeout: int = 10,
+                 retries: int = 1, retry_backoff: float = 0.2):
+        """
+        :param session: 已登录的会话对象（连接池由会话的 HTTPAdapter 维护）
+        :param base_url: 教务系统基础URL
+        :param timeout: 默认请求超时时间(秒)
+        :param retries: 幂等请求遇到超时、连接错误或 5xx 时的默认重试次数
+        :param retry_backoff: 重试间隔(秒)，每次重试翻倍
+        """
+        self.sess = session
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.latency = LatencyTracker()
+        # 最近一次请求是否检测到会话过期
+        self.session_expired = False
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_session(cls, session, base_url: str, timeout: int = 10) -> "JwxtClient":
+        """
+        返回会话上共享的客户端（首次调用时创建并挂到会话上）；传入的已经是客户端时原样返回
+        """
+        if isinstance(session, JwxtClient):
+            return session
+        client = getattr(session, "_jwxt_client", None)
+        if client is None or client.base_url != base_url.rstrip('/'):
+            client = cls(session, base_url, timeout)
+            if session is not None:
+                session._jwxt_client = client
+        return client
+
+    # ---------- 构造 ----------
+
+    def url(self, path: str, **query) -> str:
+        """构造接口 URL，见 build_url"""
+        return build_url(self.base_url, path, **query)
+
+    def headers(self, referer: str, accept_json: bool = True) -> Dict[str, str]:
+        """构造 AJAX 请求头，见 ajax_headers"""
+        return ajax_headers(self.base_url, referer, accept_json)
+
+    @property
+    def selection_referer(self) -> str:
+        """自主选课页面地址，选课相关 AJAX 请求的 Referer"""
+        return self.url(SELECTION_INDEX_PATH, gnmkdm=GNMKDM_SELECT, layout="default")
+
+    # ---------- 发送 ----------
+
+    def _timed(self, endpoint: str, method: str, url: str, **kwargs):
+        """发送请求并按接口记录耗时；:return: (响应, 耗时秒)"""
+        started = time.perf_counter()
+        response = self.sess.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.latency.record(endpoint, elapsed)
+        return response, elapsed
+
+    def request(self, method: str, url: str, endpoint: str = "other", retries: Optional[int] = None,
+                hedge: Optional[HedgePolicy] = None, **kwargs) -> requests.Response:
+        """
+        发送请求：补上默认超时，超时、连接错误或 5xx 时按 retries 重试，可选对冲
+        :param method: GET / POST
+        :param url: 完整 URL
+        :param endpoint: 接口名，用于耗时统计
+        :param retries: 重试次数，默认使用客户端配置；非幂等请求应传 0
+        :param hedge: 对冲策略，None 表示不对冲
+        :return: 响应对象；重试用尽后抛出最后一次的异常
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                if hedge is not None:
+                    response = self._hedged(hedge, endpoint, method, url, **kwargs)
+                else:
+                    response = self._timed(endpoint, method, url, **kwargs)[0]
+                if response.status_code not in RETRY_STATUS or attempt >= retries:
+                    return response
+                hot_log("client.retry", "WARNING", "{} 返回 {}，重试", endpoint, response.status_code)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if attempt >= retries:
+                    raise
+                hot_log("client.retry", "WARNING", "{} 请求失败（{}），重试", endpoint, type(e).__name__)
+            time.sleep(self.retry_backoff * (2 ** attempt))
+            attempt += 1
+
+    def _hedged(self, policy: HedgePolicy, endpoint: str, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        开启对冲时，若原请求在阈值内未返回，则在连接池的另一条连接上发送一份相同请求。
+        默认取最先返回的响应；策略设置了 accept 时，先返回的响应不成功则等另一份请求返回，
+        优先取成功的响应，两份都不成功时以原请求的响应为准
+        """
+        policy.record("requests")
+        if not policy.enabled:
+            return self._timed(endpoint, method, url, **kwargs)[0]
+
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f"{endpoint}-hedge")
+            executor = self._executor
+
+        delay = policy.delay(self.latency, endpoint)
+        primary = executor.submit(self._timed, endpoint, method, url, **kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()[0]
+
+        policy.record("fired")
+        hot_log(f"{endpoint}.hedge", "DEBUG", "{} 请求 {:.3f}s 未返回，发送对冲请求", endpoint, delay)
+        try:
+            hedged = executor.submit(self._timed, endpoint, method, url, **kwargs)
+        except RuntimeError:
+            # 线程池已被 close（例如会话池替换了该会话），只等原请求
+            return primary.result()[0]
+        pending = {primary, hedged}
+        responses = {}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    first_error = first_error or future.exception()
+                    continue
+                response, elapsed = future.result()
+                if policy.accept is not None and not policy.accept(response):
+                    responses[future] = response
+                    continue
+                if future is hedged:
+                    policy.record("hedge_won")
+                    # 原请求最终返回时，记录对冲节省的时间
+                    primary.add_done_callback(lambda f: self._record_saved(policy, f, delay + elapsed))
+                return response
+        # 两份请求都未成功：以原请求的响应为准，原请求异常时才用对冲请求的响应
+        if primary in responses:
+            return responses[primary]
+        if hedged in responses:
+            policy.record("hedge_won")
+            return responses[hedged]
+        raise first_error
+
+    def close(self):
+        """关闭对冲请求使用的线程池（不等待仍在进行的请求）；之后再对冲时会重新创建"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _record_saved(policy: HedgePolicy, primary, hedged_total: float):
+        """原请求完成后，累计对冲请求节省的时间"""
+        if primary.exception() is None:
+            policy.record("saved_seconds", max(0.0, primary.result()[1] - hedged_total))
+
+    def get(self, path: str, endpoint: str = "other", timeout: Optional[float] = None,
+            retries: Optional[int] = None, **query) -> requests.Response:
+        """GET 页面（会话刷新、参数提取、菜单初始化等）"""
+        return self.request("GET", self.url(path, **query), endpoint=endpoint, retries=retries,
+                            timeout=timeout or self.timeout)
+
+    def check_page(self, response: requests.Response) -> dict:
+        """
+        检查页面响应的状态码与会话是否过期，并更新 session_expired
+        :return: 统一返回结构，data 为页面文本
+        """
+        result = decode_page(response.status_code, response.text if response.status_code == 200 else "")
+        self.session_expired = result["code"] == 1006
+        return result
+
+    def prepare_post(self, url: str, data: dict, referer: Optional[str] = None, endpoint: str = "other",
+                     timeout: Optional[float] = None) -> "PreparedPost":
+        """预先构造 AJAX 表单 POST，见 PreparedPost"""
+        return PreparedPost(self, url, data, self.headers(referer or url), endpoint, timeout or self.timeout)
+
+    def post_json(self, url: str, data: dict, referer: Optional[str] = None, endpoint: str = "other",
+                  timeout: Optional[float] = None, retries: Optional[int] = None,
+                  hedge: Optional[HedgePolicy] = None) -> dict:
+        """
+        以 AJAX 表单方式 POST 并解析 JSON 响应
+        :param url: 完整 URL（见 url()）
+        :param data: 表单数据
+        :param referer: Referer，默认与 url 相同
+        :param endpoint: 接口名，用于耗时统计与日志
+        :param timeout: 超时时间(秒)，默认使用客户端配置
+        :param retries: 重试次数，默认使用客户端配置；非幂等请求应传 0
+        :param hedge: 对冲策略
+        :return: 统一返回结构，data 为解析后的 JSON；
+                 2333 状态码异常，1006 会话过期，2334 格式错误，1003 超时，999 其他异常
+        """
+        headers = self.headers(referer or url)
+        hot_log(f"{endpoint}.request", "DEBUG", "POST {} Payload: {}", url, data)
+        try:
+            response = self.request("POST", url, endpoint=endpoint, retries=retries, hedge=hedge,
+                                    data=data, headers=headers, timeout=timeout or self.timeout)
+        except requests.Timeout:
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求超时", endpoint)
+            return err(1003, "请求超时", {})
+        except Exception as e:
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求异常：{}", endpoint, e)
+            return err(999, f"未知异常：{e}", {})
+
+        hot_log(f"{endpoint}.response", "DEBUG", "响应 {}: {}", response.status_code,
+                lambda: response.content[:500].decode("utf-8", "replace"))
+        result = decode_json(response.status_code, response.content)
+        self.session_expired = result["code"] == 1006
+        if result["code"] != 1000:
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求失败：{}", endpoint, result["msg"])
+        return result
+
+
+class PreparedPost:
+    """
+    预先构造好的 AJAX 表单 POST：表单编码、会话请求头与 Cookie、代理与证书设置都在构造时完成，
+    调用时只剩网络往返。用于需要连续发出多个请求、间隔越短越好的场景（如换班时的退课与选课）。
+    Cookie 在构造时确定，会话 Cookie 若有更新需重新构造。
+    调用后 sent_at / received_at 为发出请求前与收到响应后的 perf_counter 时间点。
+    """
+
+    def __init__(self, client: JwxtClient, url: str, data: dict, headers: Dict[str, str], endpoint: str,
+                 timeout: float):
+        self.client = client
+        self.url = url
+        self.data = data
+        self.headers = headers
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.sent_at = self.received_at = None
+        sess = client.sess
+        if isinstance(sess, requests.Session):
+            self._prepared = sess.prepare_request(requests.Request("POST", url, data=data, headers=headers))
+            self._settings = sess.merge_environment_settings(self._prepared.url, {}, None, None, None)
+        else:
+            # 录制/回放会话只实现了 request()
+            self._prepared = None
+
+    def _transmit(self) -> requests.Response:
+        sess = self.client.sess
+        if self._prepared is not None:
+            return sess.send(self._prepared, timeout=self.timeout, **self._settings)
+        return sess.request("POST", self.url, data=self.data, headers=self.headers, timeout=self.timeout)
+
+    def __call__(self) -> dict:
+        """发送（不重试、不对冲）；:return: 同 JwxtClient.post_json"""
+        endpoint = self.endpoint
+        self.sent_at = time.perf_counter()
+        try:
+            response = self._transmit()
+        except requests.Timeout:
+            self.received_at = time.perf_counter()
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求超时", endpoint)
+            return err(1003, "请求超时", {})
+        except Exception as e:
+            self.received_at = time.perf_counter()
+            hot_log(f"{endpoint}.error", "ERROR", "{} 请求异常：{}", endpoint, e)
+            return err(999, f"未知异常：{e}", {})
+        self.received_at = time.perf_counter()
+        self.client.latency.record(endpoint, self.received_at - self.sent_at)
+        hot_log(f"{endpoint}.response", "DEBUG", "响应 {}: {}", response.status_code,
+                lambda: response.content[:500].decode("utf-8", "replace"))
+        result = decode_json(response.status_code, response.content)
+        self.client.session_expired = result["code"] == 1006
+        return result
@@ -1,20 +1,26 @@
 import requests
 import time
 from loguru import logger
-from modules.tools.debug_utils import DEBUG
+from modules.tools.debug_utils import DEBUG, hot_log
 from modules.tools.encrypt import encrypt
 
 class LoginClient:
 
-    def __init__(self, base_url: str, timeout: int = 10):
+    # 新版SSO登录接口
+    SSO_LOGIN_URL = 'https://newsso.shu.edu.cn/login/eyJ0aW1lc3RhbXAiOjE3NDYyNDg4MDc3NTg2NjU5MDgsInJlc3BvbnNlVHlwZSI6ImNvZGUiLCJjbGllbnRJZCI6IkttNXQyMjVFOEtFQ0tRNlpEbTVLMlA2YVMyNDU5Q3VhIiwiY2xpZW50TmFtZSI6IuacrOenkeeUn-aVmeWKoeezu-e7nyIsInNjb3BlIjoianciLCJyZWRpcmVjdFVyaSI6Imh0dHBzOi8vand4dC5zaHUuZWR1LmNuL3Nzby9zaHVsb2dpbiIsInN0YXRlIjoiIiwiZG9tYWluIjoiIn0='
+
+    def __init__(self, base_url: str, timeout: int = 10, sso_url: str = None, session=None):
         """
         :param base_url: 教务系统首页 URL，例如 "https://jwxt.shu.edu.cn"
         :param timeout: 请求超时时间（秒）
+        :param sso_url: SSO 登录接口，默认使用 SSO_LOGIN_URL（本地模拟服务器测试时替换）
+        :param session: 预先构造的会话（如录制/回放会话），默认新建 requests.Session
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.sso_url = sso_url or self.SSO_LOGIN_URL
         # 创建 Session 并统一设置浏览器头
-        self.sess = requests.Session()
+        self.sess = session if session is not None else requests.Session()
         self.sess.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
         })
@@ -33,9 +39,13 @@ class LoginClient:
         :param password: 明文密码
         :return: dict，包含 code、msg、cookies（成功时）
         """
+        from modules.tools.http_recorder import RecordingSession
+        if isinstance(self.sess, RecordingSession):
+            # 录制时学号会出现在首页、菜单等 HTML 页面中，登录前登记为需要脱敏的字符串
+            self.sess.add_secret(sid)
         try:
             # 使用新版SSO登录接口
-            login_url = 'https://newsso.shu.edu.cn/login/eyJ0aW1lc3RhbXAiOjE3NDYyNDg4MDc3NTg2NjU5MDgsInJlc3BvbnNlVHlwZSI6ImNvZGUiLCJjbGllbnRJZCI6IkttNXQyMjVFOEtFQ0tRNlpEbTVLMlA2YVMyNDU5Q3VhIiwiY2xpZW50TmFtZSI6IuacrOenkeeUn-aVmeWKoeezu-e7nyIsInNjb3BlIjoianciLCJyZWRpcmVjdFVyaSI6Imh0dHBzOi8vand4dC5zaHUuZWR1LmNuL3Nzby9zaHVsb2dpbiIsInN0YXRlIjoiIiwiZG9tYWluIjoiIn0='
+            login_url = self.sso_url
 
             # 使用新的参数格式
             encrypted_pwd = encrypt(password)
@@ -61,14 +71,15 @@ class LoginClient:
             timestamp = int(time.time() * 1000)
             init_menu_url = f"{self.base_url}/jwglxt/xtgl/index_initMenu.html?jsdm=xs&_t={timestamp}"
             resp4 = self.sess.get(init_menu_url, timeout=self.timeout)
-            logger.debug("菜单初始化: status={}, 新增cookies={}",
-                         resp4.status_code, resp4.cookies.get_dict())
+            hot_log("login.menu", "DEBUG", "菜单初始化: status={}, 新增cookies={}",
+                    resp4.status_code, lambda: list(resp4.cookies.keys()))
 
             if resp4.status_code != 200:
                 return {"code": 1007, "msg": "菜单初始化失败"}
             # 登录成功，返回 cookies
             final_cookies = self.sess.cookies.get_dict()
-            logger.info("登录成功，最终Cookies：{}", final_cookies)
+            logger.info("登录成功")
+            hot_log("login.cookies", "DEBUG", "最终Cookies：{}", lambda: list(final_cookies))
             return {"code": 1000, "msg": "登录成功", "cookies": final_cookies}
 
         except requests.Timeout:
@@ -0,0 +1,141 @@
+"""
+async_services.py
+~~~~~~~~~~~~~~~~~
+登录、参数、搜索、选课、课表、考试服务的 asyncio 版本，返回结构与同步服务相同
+（{"code", "msg", "data"}）。表单构造与结果解析复用同步实现中的静态方法，
+只把发送换成 AsyncJwxtClient。同一账号的各服务共享 AsyncLoginService.client：
+
+    async with AsyncLoginService(base_url) as login:
+        await login.login(sid, pwd)
+        search = AsyncSearchService(login.client)
+        results = await asyncio.gather(*(search.search(sid, params, 2025, 2, "", 1, 10, kw) for kw in keywords))
+
+同步服务仍供交互式菜单使用。
+"""
+
+import time
+import asyncio
+
+from modules.async_jwxt_client import AsyncJwxtClient, _import_aiohttp
+from modules.jwxt_client import GNMKDM_SELECT, GNMKDM_EXAM, SELECTION_INDEX_PATH, MENU_INIT_PATH
+from modules.login import LoginClient
+from modules.course_searcher import CourseSearcher
+from modules.course_selector import CourseSelector
+from modules.schedule_extractor import ScheduleExtractor
+from modules.exam_extractor import ExamExtractor
+from modules.tools.course_params_extractor import CourseParamsExtractor
+from modules.tools.encrypt import encrypt
+from functions.result import ok, err
+
+
+class AsyncLoginService:
+    def __init__(self, base_url: str, timeout: int = 10, sso_url: str = None, client: AsyncJwxtClient = None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.sso_url = sso_url or LoginClient.SSO_LOGIN_URL
+        self.client = client or AsyncJwxtClient(base_url, timeout)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.close()
+
+    async def login(self, sid: str, pwd: str):
+        """与 LoginService.login 相同的 SSO 流程：提交加密密码、回跳首页、初始化菜单"""
+        aiohttp = _import_aiohttp()
+        try:
+            data = {"username": sid, "password": encrypt(pwd)}
+            _, body = await self.client.request("POST", self.sso_url, endpoint="login", retries=0, data=data)
+            if '教学管理信息服务平台' not in body.decode("utf-8", "replace"):
+                return err(1002, "用户名或密码不正确")
+
+            status, body = await self.client.request("GET", self.base_url, endpoint="login")
+            if status != 200 or "统一认证" in body.decode("utf-8", "replace"):
+                return err(1005, "SSO 回跳失败")
+
+            menu_url = self.client.url(MENU_INIT_PATH, jsdm="xs", _t=int(time.time() * 1000))
+            status, _ = await self.client.request("GET", menu_url, endpoint="menu")
+            if status != 200:
+                return err(1007, "菜单初始化失败")
+            return ok(self.client.cookies(), "登录成功")
+        except asyncio.TimeoutError:
+            return err(1003, "网络请求超时")
+        except aiohttp.ClientError as e:
+            return err(2333, f"网络请求异常：{e}")
+
+
+class AsyncParamService:
+    def __init__(self, client: AsyncJwxtClient):
+        self.client = client
+
+    async def extract(self):
+        page = await self.client.get_page(SELECTION_INDEX_PATH, endpoint="params", gnmkdm=GNMKDM_SELECT,
+                                          layout="default")
+        if page["code"] != 1000:
+            return {"code": page["code"], "msg": f"访问选课页面失败：{page['msg']}", "data": {}}
+        return ok(CourseParamsExtractor.parse_page(page["data"]), "参数提取成功")
+
+
+class AsyncSearchService:
+    def __init__(self, client: AsyncJwxtClient):
+        self.client = client
+
+    async def search(self, student_id: str, params: dict, year: int, term: int, kklxdm: str, kspage: int,
+                     jspage: int, keyW: str):
+        payload = CourseSearcher.build_payload(params, year, term, kklxdm, kspage, jspage, keyW)
+        url = self.client.url(CourseSearcher.SEARCH_PATH, gnmkdm=GNMKDM_SELECT, su=student_id)
+        return CourseSearcher.parse_result(await self.client.post_json(url, payload, endpoint="search"))
+
+
+class AsyncSelectService:
+    def __init__(self, client: AsyncJwxtClient):
+        self.client = client
+
+    async def select(self, student_id: str, course: dict, params: dict):
+        """与 CourseSelector.select_course 相同：先刷新会话，再提交选课（不重试）"""
+        page = await self.client.get_page(SELECTION_INDEX_PATH, endpoint="refresh", gnmkdm=GNMKDM_SELECT,
+                                          layout="default")
+        if page["code"] == 1006:
+            return {"code": 1006, "msg": "未登录或会话过期", "data": {}}
+        if page["code"] != 1000:
+            return {"code": 1002, "msg": "刷新会话失败，无法继续选课", "data": {}}
+
+        url = self.client.url(CourseSelector.SELECT_COURSE_PATH, gnmkdm=GNMKDM_SELECT, su=student_id)
+        referer = self.client.url(SELECTION_INDEX_PATH, gnmkdm=GNMKDM_SELECT, layout="default")
+        payload = CourseSelector.build_payload(course, params or {})
+        res = await self.client.post_json(url, payload, referer=referer, endpoint="select", retries=0)
+        return CourseSelector.parse_result(res, course.get("kcmc", ""))
+
+
+class AsyncScheduleService:
+    def __init__(self, client: AsyncJwxtClient):
+        self.client = client
+
+    async def get(self, year: int, term: int, student_id: str):
+        url = self.client.url(ScheduleExtractor.SCHEDULE_PATH, gnmkdm=GNMKDM_SELECT, su=student_id)
+        res = await self.client.post_json(url, ScheduleExtractor.build_payload(year, term), endpoint="schedule")
+        return ScheduleExtractor.parse_result(res)
+
+
+class AsyncExamService:
+    def __init__(self, client: AsyncJwxtClient):
+        self.client = client
+
+    async def _fetch_page(self, year: int, term: int, page: int, page_size: int) -> dict:
+        url = self.client.url(ExamExtractor.EXAM_PATH, doType="query", gnmkdm=GNMKDM_EXAM)
+        referer = self.client.url(ExamExtractor.EXAM_PATH, gnmkdm=GNMKDM_EXAM, layout="default")
+        return await self.client.post_json(url, ExamExtractor.build_payload(year, term, page, page_size),
+                                           referer=referer, endpoint="exam")
+
+    async def get(self, year: int, term: int, student_id: str, page_size: int = ExamExtractor.PAGE_SIZE):
+        """与 ExamExtractor.get_exam_schedule 相同：取第一页后并发获取其余页"""
+        first = await self._fetch_page(year, term, 1, page_size)
+        pages = ExamExtractor.page_count(first, page_size)
+        rest = await asyncio.gather(*(self._fetch_page(year, term, page, page_size) for page in range(2, pages + 1)))
+        return ExamExtractor.parse_result(ExamExtractor.merge_pages(first, list(rest)), year, term)
+
+    async def get_many(self, terms, student_id: str):
+        """并发获取多个学年/学期的考试并合并，见 ExamExtractor.combine_terms"""
+        results = await asyncio.gather(*(self.get(year, term, student_id) for year, term in terms))
+        return ExamExtractor.combine_terms(terms, list(results))
\ No newline at end of file
@@ -4,4 +4,8 @@ class ExamService:
     def __init__(self, sess, base_url: str, timeout: int = 10):
         self.extractor = ExamExtractor(sess, base_url, timeout)
     def get(self, year: int, term: int, student_id: str):
-        return self.extractor.get_exam_schedule(year, term, student_id)
\ No newline at end of file
+        return self.extractor.get_exam_schedule(year, term, student_id)
+
+    def get_many(self, terms, student_id: str):
+        """并发获取多个学年/学期的考试，合并为一个结果；terms 为 [(学年, 学期), ...]"""
+        return self.extractor.get_exam_schedules(terms, student_id)
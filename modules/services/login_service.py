@@ -3,9 +3,9 @@ from modules.session_provider import SessionProvider
 from functions.result import ok, err
 
 class LoginService:
-    def __init__(self, base_url: str, timeout: int = 10):
+    def __init__(self, base_url: str, timeout: int = 10, sso_url: str = None, session=None):
         self.base_url = base_url
-        self.client = LoginClient(base_url, timeout)
+        self.client = LoginClient(base_url, timeout, sso_url, session)
         self.provider = SessionProvider(base_url, timeout)
 
     def login(self, sid: str, pwd: str):
@@ -1,8 +1,15 @@
 from modules.course_selector import CourseSelector
 
 class SelectService:
-    def __init__(self, sess, base_url: str, timeout: int = 10):
-        self.selector = CourseSelector(sess, base_url, timeout)
+    def __init__(self, sess, base_url: str, timeout: int = 10, hedge: bool = False):
+        self.selector = CourseSelector(sess, base_url, timeout, hedge=hedge)
 
     def select(self, student_id: str, course: dict, params: dict):
-        return self.selector.select_course(student_id=student_id, course=course, params=params)
\ No newline at end of file
+        return self.selector.select_course(student_id=student_id, course=course, params=params)
+
+    def close(self):
+        self.selector.close()
+
+    def swap(self, student_id: str, current: dict, preferred: dict, params: dict, seat_lookup=None):
+        return self.selector.swap_course(student_id=student_id, current=current, preferred=preferred,
+                                         params=params, seat_lookup=seat_lookup)
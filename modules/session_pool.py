@@ -0,0 +1,273 @@
+"""
+session_pool.py
+~~~~~~~~~~~~~~~
+同一学生账号的多会话池：维护 N 个独立登录的会话（各自拥有 Cookie 与连接池），
+把抢课请求分散到各会话上，并跟踪每个会话的健康状况与耗时。
+"""
+
+import time
+import random
+import threading
+from typing import Dict, List, Optional
+from loguru import logger
+
+from modules.course_selector import CourseSelector
+from modules.tools.latency import EndpointTimings
+from modules.tools.http_timing import instrument_session
+from modules.services.login_service import LoginService
+from functions.result import ok, err
+
+# 计为会话故障的选课结果：刷新失败、超时、响应异常（1007，包括 HTTP 状态码异常）与未知异常；
+# 业务失败（如课程已满）说明会话本身可用
+SESSION_FAULT_CODES = (1002, 1003, 1007, 999)
+
+
+class PooledSession:
+    """会话池中的单个会话及其健康统计"""
+
+    def __init__(self, index: int, login: LoginService, selector: CourseSelector):
+        self.index = index
+        self.login = login
+        self.selector = selector
+        self.healthy = True
+        self.replacing = False
+        self.latency_ewma: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.evictions = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def sess(self):
+        return self.login.sess
+
+    def snapshot(self) -> dict:
+        """返回会话健康状况的快照"""
+        return {
+            "index": self.index,
+            "healthy": self.healthy,
+            "replacing": self.replacing,
+            "latency_ewma": self.latency_ewma,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "evictions": self.evictions,
+        }
+
+
+class SessionPool:
+    """
+    多会话池，对外提供与 CourseSelector 相同的 select_course 接口，
+    可直接作为选择器传给 CourseSniper
+    """
+
+    def __init__(self, base_url: str, sid: str, pwd: str, size: int = 2, timeout: int = 10,
+                 hedge: bool = False, primary: LoginService = None, ewma_alpha: float = 0.3,
+                 max_consecutive_failures: int = 3, cooldown: float = 30.0, sso_url: str = None,
+                 timings: EndpointTimings = None):
+        """
+        :param base_url: 教务系统基础URL
+        :param sid: 学号
+        :param pwd: 密码
+        :param size: 会话数量
+        :param timeout: 请求超时时间(秒)
+        :param hedge: 各会话的选择器是否开启对冲请求
+        :param primary: 已登录的会话，作为池中第一个成员复用
+        :param ewma_alpha: 耗时指数滑动平均系数
+        :param max_consecutive_failures: 连续失败多少次后暂时停用该会话
+        :param cooldown: 停用时长(秒)
+        :param sso_url: SSO 登录接口，默认使用 LoginClient.SSO_LOGIN_URL
+        :param timings: 请求阶段耗时直方图，新登录的会话会挂载计时适配器并汇总到这里
+        """
+        self.base_url = base_url
+        self.sid = sid
+        self.pwd = pwd
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.hedge = hedge
+        self.primary = primary
+        self.ewma_alpha = ewma_alpha
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cooldown = cooldown
+        self.sso_url = sso_url
+        self.timings = timings
+        self.members: List[PooledSession] = []
+        self._lock = threading.Lock()
+
+    def _login_one(self, index: int, login: LoginService = None) -> Optional[PooledSession]:
+        """登录一个新会话；传入已登录的 login 时直接复用"""
+        if login is None:
+            login = LoginService(self.base_url, self.timeout, self.sso_url)
+            if self.timings is not None:
+                instrument_session(login.sess, self.timings)
+            res = login.login(self.sid, self.pwd)
+            if res.get("code") != 1000:
+                logger.error("会话 #{} 登录失败：{}", index, res.get("msg"))
+                return None
+        selector = CourseSelector(login.sess, self.base_url, self.timeout, hedge=self.hedge)
+        logger.debug("会话 #{} 已就绪", index)
+        return PooledSession(index, login, selector)
+
+    def start(self) -> dict:
+        """
+        并行登录全部会话
+        :return: 统一返回结构，data 为成功登录的会话数
+        """
+        results: Dict[int, Optional[PooledSession]] = {}
+
+        def worker(i):
+            results[i] = self._login_one(i, self.primary if i == 0 else None)
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(self.size)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        with self._lock:
+            self.members = [results[i] for i in range(self.size) if results.get(i)]
+        if not self.members:
+            return err(1002, "会话池中没有可用会话")
+        logger.info("会话池已就绪：{}/{} 个会话登录成功", len(self.members), self.size)
+        return ok(len(self.members), "会话池登录成功")
+
+    @property
+    def sess(self):
+        """返回一个可用会话，供搜索等非抢课请求使用"""
+        return self.acquire().sess
+
+    @property
+    def hedge_stats(self) -> dict:
+        """汇总各会话选择器的对冲统计"""
+        total = {"requests": 0, "fired": 0, "hedge_won": 0, "saved_seconds": 0.0}
+        for member in list(self.members):
+            for k in total:
+                total[k] += member.selector.hedge_stats.get(k, 0)
+        return total
+
+    @property
+    def refresh_count(self) -> int:
+        """各会话刷新次数之和"""
+        return sum(m.selector.refresh_count for m in list(self.members))
+
+    @property
+    def refresh_failures(self) -> int:
+        """各会话刷新失败次数之和"""
+        return sum(m.selector.refresh_failures for m in list(self.members))
+
+    def acquire(self) -> PooledSession:
+        """
+        选择一个会话：在健康会话中按耗时倒数加权随机，使流量偏离较慢的会话
+        :return: 选中的会话
+        """
+        now = time.time()
+        with self._lock:
+            # 健康的会话与暂停期已过的会话参与调度（后者成功一次即恢复健康）；
+            # 重建失败的会话会在再次过期时重新尝试登录
+            candidates = [m for m in self.members
+                          if not m.replacing and (m.healthy or m.cooldown_until <= now)]
+            if not candidates:
+                # 没有健康会话时退而求其次，使用未在重建中的会话
+                candidates = [m for m in self.members if not m.replacing] or list(self.members)
+        if not candidates:
+            raise RuntimeError("会话池为空，请先调用 start()")
+        # 尚无耗时数据的会话优先试用
+        fresh = [m for m in candidates if m.latency_ewma is None]
+        if fresh:
+            return fresh[0]
+        weights = [1.0 / max(m.latency_ewma, 1e-3) for m in candidates]
+        return random.choices(candidates, weights=weights, k=1)[0]
+
+    def _record(self, member: PooledSession, elapsed: float, success: bool):
+        """更新会话耗时与健康统计"""
+        with self._lock:
+            member.requests += 1
+            if member.latency_ewma is None:
+                member.latency_ewma = elapsed
+            else:
+                member.latency_ewma += self.ewma_alpha * (elapsed - member.latency_ewma)
+            if success:
+                member.consecutive_failures = 0
+                member.healthy = True
+                return
+            member.failures += 1
+            member.consecutive_failures += 1
+            if member.consecutive_failures >= self.max_consecutive_failures:
+                member.healthy = False
+                member.cooldown_until = time.time() + self.cooldown
+                logger.warning("会话 #{} 连续失败 {} 次，暂停使用 {} 秒",
+                               member.index, member.consecutive_failures, self.cooldown)
+
+    def evict(self, member: PooledSession):
+        """
+        剔除过期会话，并在后台重新登录替换。
+        第一个成员复用调用方的登录会话（primary，搜索、课表等也在用），在原会话上重新登录而不是替换，
+        调用方持有的会话随之恢复
+        :param member: 需要替换的会话
+        """
+        with self._lock:
+            if member.replacing:
+                return
+            member.replacing = True
+            member.healthy = False
+        logger.warning("会话 #{} 已过期，后台重新登录", member.index)
+
+        def replace():
+            if self.primary is not None and member.login is self.primary:
+                res = self.primary.login(self.sid, self.pwd)
+                if res.get("code") != 1000:
+                    logger.error("会话 #{} 重新登录失败：{}", member.index, res.get("msg"))
+                fresh = member if res.get("code") == 1000 else None
+                member.selector.session_expired = False
+            else:
+                fresh = self._login_one(member.index)
+            with self._lock:
+                member.replacing = False
+                if fresh is None:
+                    member.cooldown_until = time.time() + self.cooldown
+                    return
+                stale = member.selector if fresh.selector is not member.selector else None
+                member.login = fresh.login
+                member.selector = fresh.selector
+                member.healthy = True
+                member.consecutive_failures = 0
+                member.latency_ewma = None
+                member.evictions += 1
+            if stale is not None:
+                stale.close()
+            logger.info("会话 #{} 已替换", member.index)
+
+        threading.Thread(target=replace, daemon=True).start()
+
+    def close(self):
+        """释放各成员对冲请求的线程池"""
+        for member in list(self.members):
+            member.selector.close()
+
+    def refresh_session(self, student_id: str) -> bool:
+        """刷新一个会话的状态，接口与 CourseSelector 保持一致"""
+        return self.acquire().selector.refresh_session(student_id)
+
+    def select_course(self, student_id: str, course: dict, params: dict = None) -> dict:
+        """
+        通过池中的某个会话执行选课，接口与 CourseSelector.select_course 一致
+        :return: 选课结果
+        """
+        member = self.acquire()
+        started = time.perf_counter()
+        result = member.selector.select_course(student_id=student_id, course=course, params=params)
+        elapsed = time.perf_counter() - started
+        code = result.get("code")
+        if code == 1006:
+            self._record(member, elapsed, False)
+            self.evict(member)
+        else:
+            # 业务失败（如课程已满）说明会话本身可用，只有网络、状态码或未知异常才计为会话故障
+            self._record(member, elapsed, code not in SESSION_FAULT_CODES)
+        return result
+
+    def health(self) -> List[dict]:
+        """返回所有会话的健康快照"""
+        with self._lock:
+            return [m.snapshot() for m in self.members]
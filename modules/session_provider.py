@@ -1,5 +1,6 @@
 import time
 import requests
+from modules.jwxt_client import JwxtClient, MENU_INIT_PATH
 
 class SessionProvider:
     def __init__(self, base_url: str, timeout: int = 10):
@@ -15,9 +16,9 @@ class SessionProvider:
 
     def init_menu(self, sess: requests.Session) -> bool:
         ts = int(time.time() * 1000)
-        url = f"{self.base_url}/jwglxt/xtgl/index_initMenu.html?jsdm=xs&_t={ts}"
+        client = JwxtClient.for_session(sess, self.base_url, self.timeout)
         try:
-            resp = sess.get(url, timeout=self.timeout)
+            resp = client.get(MENU_INIT_PATH, endpoint="menu", timeout=self.timeout, jsdm="xs", _t=ts)
             return resp.status_code == 200
         except Exception:
             return False
\ No newline at end of file
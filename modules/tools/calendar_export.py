@@ -0,0 +1,285 @@
+"""
+calendar_export.py
+~~~~~~~~~~~~~~~~~~
+把课表与考试导出为 iCalendar (RFC 5545)：
+
+  - 课表按解析出的上课时间（星期、节次、周次）展开，连续周或单双周合并为一条
+    RRULE:FREQ=WEEKLY 事件，需要给出第 1 周星期一的日期；节次对应的时刻见 PERIOD_TIMES；
+    周次无法识别（如“另行通知”）的上课时间按整个学期导出，但标为 STATUS:TENTATIVE 并在描述中注明；
+  - 考试时间形如 2026-01-10(08:00-10:00)，解析为一条事件。
+
+事件由生成器逐个产生、逐行写出（write_ics），多学期、多名学生一起导出时内存占用不随事件数增长；
+sync_vdir 以“一个事件一个 .ics 文件”的目录（vdir，khal/vdirsyncer 使用的格式）增量同步，
+只重写内容变化的事件，并只删除本次同步范围（UID 前缀）内已不存在的、由本工具生成的事件。
+"""
+
+import os
+import re
+import datetime
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from loguru import logger
+
+from modules.tools.timetable import TimeSlot, parse_sksj, course_sksj
+
+# 节次 -> (开始, 结束)，按上海大学作息；其他学校可通过 period_times 参数覆盖
+PERIOD_TIMES: Dict[int, Tuple[str, str]] = {
+    1: ("08:00", "08:45"), 2: ("08:55", "09:40"), 3: ("10:00", "10:45"), 4: ("10:55", "11:40"),
+    5: ("13:00", "13:45"), 6: ("13:55", "14:40"), 7: ("15:00", "15:45"), 8: ("15:55", "16:40"),
+    9: ("18:00", "18:45"), 10: ("18:55", "19:40"), 11: ("20:00", "20:45"), 12: ("20:55", "21:40"),
+}
+TZID = "Asia/Shanghai"
+PRODID = "-//SHU auto_Course//Course Calendar//CN"
+UID_DOMAIN = "auto-course.shu"
+
+# 中国不实行夏令时，时区定义固定为 +0800
+_VTIMEZONE = (
+    "BEGIN:VTIMEZONE", f"TZID:{TZID}", "BEGIN:STANDARD", "DTSTART:19700101T000000",
+    "TZOFFSETFROM:+0800", "TZOFFSETTO:+0800", "TZNAME:CST", "END:STANDARD", "END:VTIMEZONE",
+)
+_EXAM_TIME_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})\s*\(\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*\)")
+
+
+class CalendarEvent(NamedTuple):
+    """一条日历事件；rrule 非空时为按周重复的事件"""
+    uid: str
+    summary: str
+    start: datetime.datetime
+    end: datetime.datetime
+    location: str = ""
+    description: str = ""
+    rrule: str = ""
+    status: str = ""
+
+
+def week_runs(weeks: Iterable[int]) -> List[Tuple[int, int, int]]:
+    """
+    把周次拆成等间隔（每周或隔周）的段，例如 [1, 2, 3, 5, 7] -> [(1, 1, 3), (5, 2, 2)]
+    :return: [(起始周, 间隔, 次数)]
+    """
+    weeks = sorted(set(weeks))
+    runs, i = [], 0
+    while i < len(weeks):
+        start = weeks[i]
+        step = weeks[i + 1] - start if i + 1 < len(weeks) and weeks[i + 1] - start in (1, 2) else 1
+        count = 1
+        while i + count < len(weeks) and weeks[i + count] == start + count * step:
+            count += 1
+        runs.append((start, step, count))
+        i += count
+    return runs
+
+
+def _course_slots(course: dict) -> List[TimeSlot]:
+    """取课程的上课时间：ScheduleExtractor 解析结果带 slots，搜索结果等只有 sksj"""
+    slots = course.get("slots")
+    if slots:
+        return [TimeSlot(s["weekday"], s["first"], s["last"], tuple(s["weeks"]), s.get("weeks_known", True))
+                for s in slots]
+    return parse_sksj(course_sksj(course))
+
+
+def _at(day: datetime.date, hhmm: str) -> datetime.datetime:
+    hour, minute = hhmm.split(":")
+    return datetime.datetime.combine(day, datetime.time(int(hour), int(minute)))
+
+
+def schedule_events(courses: Iterable[dict], term_start: datetime.date, uid_prefix: str = "",
+                    period_times: Optional[Dict[int, Tuple[str, str]]] = None) -> Iterator[CalendarEvent]:
+    """
+    把课表展开为日历事件
+    :param courses: ScheduleService.get 返回的 courses（也接受带 sksj 的搜索结果）
+    :param term_start: 第 1 周星期一的日期
+    :param uid_prefix: UID 前缀，多名学生一起导出时用学号区分
+    :param period_times: 节次 -> (开始, 结束)，默认 PERIOD_TIMES
+    """
+    period_times = period_times or PERIOD_TIMES
+    for course in courses:
+        raw = course.get("raw_data") or course
+        key = raw.get("jxb_id") or course.get("class_id") or course.get("course_id") or raw.get("kch_id", "")
+        title = raw.get("kcmc") or course.get("title") or raw.get("jxbmc", "")
+        teacher = course.get("teacher") or raw.get("jsxx", "")
+        slots = _course_slots(course)
+        # 多段上课时间的地点按同样顺序排列时逐段对应，否则共用
+        places = (course.get("place") or raw.get("jxdd") or "").replace("<br/>", "\n").split("\n")
+        for i, slot in enumerate(slots):
+            if slot.first not in period_times or slot.last not in period_times:
+                logger.warning("{} 的节次 {}-{} 没有对应的时刻，跳过", title, slot.first, slot.last)
+                continue
+            place = places[i] if len(places) == len(slots) else " ".join(p for p in places if p)
+            description = f"{teacher}\n第{slot.first}-{slot.last}节" if teacher else f"第{slot.first}-{slot.last}节"
+            if not slot.weeks_known:
+                description += "\n周次待定，以教务通知为准"
+            for first_week, step, count in week_runs(slot.weeks):
+                day = term_start + datetime.timedelta(weeks=first_week - 1, days=slot.weekday - 1)
+                yield CalendarEvent(
+                    uid=f"{uid_prefix}{key}-{slot.weekday}-{slot.first}-{first_week}@{UID_DOMAIN}",
+                    summary=title,
+                    start=_at(day, period_times[slot.first][0]),
+                    end=_at(day, period_times[slot.last][1]),
+                    location=place,
+                    description=description,
+                    rrule=f"FREQ=WEEKLY;INTERVAL={step};COUNT={count}" if count > 1 else "",
+                    status="" if slot.weeks_known else "TENTATIVE",
+                )
+
+
+def parse_exam_time(text: str) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+    """解析考试时间，例如 2026-01-10(08:00-10:00)；无法识别时返回 None"""
+    m = _EXAM_TIME_RE.search(text or "")
+    if not m:
+        return None
+    y, mo, d, h1, m1, h2, m2 = (int(g) for g in m.groups())
+    return datetime.datetime(y, mo, d, h1, m1), datetime.datetime(y, mo, d, h2, m2)
+
+
+def exam_events(exams: Iterable[dict], uid_prefix: str = "") -> Iterator[CalendarEvent]:
+    """
+    把考试信息转换为日历事件
+    :param exams: ExamService.get / get_many 返回的 courses
+    :param uid_prefix: UID 前缀，多名学生一起导出时用学号区分
+    """
+    for exam in exams:
+        span = parse_exam_time(exam.get("time", ""))
+        if span is None:
+            logger.warning("无法解析 {} 的考试时间：{}", exam.get("title"), exam.get("time"))
+            continue
+        seat = f"座号 {exam['seat']}" if exam.get("seat") else ""
+        yield CalendarEvent(
+            uid=f"{uid_prefix}exam-{exam.get('course_id')}-{span[0]:%Y%m%d}@{UID_DOMAIN}",
+            summary=f"{exam.get('title', '')} {exam.get('exam_name') or '考试'}".strip(),
+            start=span[0],
+            end=span[1],
+            location=" ".join(p for p in (exam.get("campus"), exam.get("location")) if p),
+            description="\n".join(p for p in (seat, exam.get("method"), exam.get("teacher")) if p),
+        )
+
+
+# ---------- 序列化 ----------
+
+def escape_text(text: str) -> str:
+    """按 RFC 5545 转义 TEXT 值"""
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold(line: str) -> str:
+    """按 RFC 5545 折行：每行不超过 75 字节（不拆开 UTF-8 多字节字符），续行以空格开头"""
+    if len(line.encode("utf-8")) <= 75:
+        return line
+    parts, current, size = [], [], 0
+    for ch in line:
+        width = len(ch.encode("utf-8"))
+        if size + width > (75 if not parts else 74):
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(ch)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts)
+
+
+def event_lines(event: CalendarEvent) -> List[str]:
+    """事件的属性行（不含 BEGIN/END 与 DTSTAMP，用于比较事件是否变化）"""
+    lines = [
+        f"UID:{event.uid}",
+        f"DTSTART;TZID={TZID}:{event.start:%Y%m%dT%H%M%S}",
+        f"DTEND;TZID={TZID}:{event.end:%Y%m%dT%H%M%S}",
+        f"SUMMARY:{escape_text(event.summary)}",
+    ]
+    if event.rrule:
+        lines.append(f"RRULE:{event.rrule}")
+    if event.status:
+        lines.append(f"STATUS:{event.status}")
+    if event.location:
+        lines.append(f"LOCATION:{escape_text(event.location)}")
+    if event.description:
+        lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+    return lines
+
+
+def _stamp() -> str:
+    return f"DTSTAMP:{datetime.datetime.now(datetime.timezone.utc):%Y%m%dT%H%M%SZ}"
+
+
+def iter_ics(events: Iterable[CalendarEvent], name: str = "") -> Iterator[str]:
+    """
+    逐行生成 iCalendar 文本（每行已折行并以 CRLF 结尾），事件按需从 events 中取出
+    :param name: 日历名称（X-WR-CALNAME）
+    """
+    header = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN"]
+    if name:
+        header.append(f"X-WR-CALNAME:{escape_text(name)}")
+    for line in header + list(_VTIMEZONE):
+        yield fold(line) + "\r\n"
+    stamp = _stamp()
+    for event in events:
+        yield "BEGIN:VEVENT\r\n"
+        yield stamp + "\r\n"
+        for line in event_lines(event):
+            yield fold(line) + "\r\n"
+        yield "END:VEVENT\r\n"
+    yield "END:VCALENDAR\r\n"
+
+
+def write_ics(path: str, events: Iterable[CalendarEvent], name: str = "") -> int:
+    """
+    把事件流式写入 .ics 文件（先写临时文件再替换）
+    :return: 写入的事件数
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        for line in iter_ics(events, name):
+            count += line == "BEGIN:VEVENT\r\n"
+            f.write(line)
+    os.replace(tmp, path)
+    return count
+
+
+def _vdir_name(uid: str) -> str:
+    return re.sub(r"[^\w.@-]", "_", uid) + ".ics"
+
+
+def _without_stamp(text: str) -> str:
+    return "".join(line for line in text.splitlines(keepends=True) if not line.startswith("DTSTAMP:"))
+
+
+def sync_vdir(directory: str, events: Iterable[CalendarEvent], scopes: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    增量同步到 vdir 目录：每个事件一个 <UID>.ics 文件，内容（忽略 DTSTAMP）未变的不重写；
+    只保存已处理的文件名，不在内存中保留事件内容。
+    本次未再出现的事件文件只有由本工具生成（UID 以 @auto-course.shu 结尾）且 UID 以 scopes 中
+    某个前缀开头时才删除，其他工具的文件与本次跳过的学期、学生的事件不受影响
+    :param scopes: 本次完整导出的 UID 前缀；在 events 耗尽后才读取，可由生成 events 的一方边生成边追加。
+                   None 表示本工具生成的全部事件
+    :return: {"written": 新写入或更新的事件数, "unchanged": 未变化数, "removed": 删除数}
+    """
+    os.makedirs(directory, exist_ok=True)
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+    seen = set()
+    for event in events:
+        name = _vdir_name(event.uid)
+        seen.add(name)
+        body = "".join(iter_ics([event]))
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                if _without_stamp(f.read()) == _without_stamp(body):
+                    stats["unchanged"] += 1
+                    continue
+        except FileNotFoundError:
+            pass
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        stats["written"] += 1
+    prefixes = ("",) if scopes is None else tuple(_vdir_name(scope)[:-len(".ics")] for scope in scopes)
+    for name in os.listdir(directory):
+        if name.endswith(f"@{UID_DOMAIN}.ics") and name.startswith(prefixes) and name not in seen:
+            os.remove(os.path.join(directory, name))
+            stats["removed"] += 1
+    return stats
@@ -0,0 +1,195 @@
+"""
+capacity_analytics.py
+~~~~~~~~~~~~~~~~~~~~~
+课表容量分析的列式流水线（pandas）：把一份或多份课表快照（导出的课表 JSON、课表库中的各次同步结果等）
+读入同一个 DataFrame，一次性为所有课程、所有快照计算状态、剩余名额、选课率与扩容情况，
+多份快照时再按教学班汇总已选人数的变化。
+
+构造 DataFrame 有固定开销，单份快照、行数少于 FRAME_MIN_ROWS 时逐门课程计算（analyze_course）更快，
+两条路径的结果相同（见 benchmarks/bench_checker.py）。
+
+状态判定与 course_checker.py 一致：
+    ⚪ 未选      sfxkbj 不为 "1"
+    🟢 已选上    基础容量 + 扩容 >= 已选人数
+    🔴 待筛选    基础容量 + 扩容 <  已选人数
+"""
+
+from itertools import islice
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+STATUS_UNSELECTED = "⚪ 未选"
+STATUS_SELECTED = "🟢 已选上"
+STATUS_PENDING = "🔴 待筛选"
+
+# 基础信息列（取自 ScheduleExtractor 的解析结果）与 raw_data 中的原始字段
+INFO_COLUMNS = ("course_id", "class_id", "title", "teacher", "credit", "time", "place")
+RAW_COLUMNS = ("jxbrs", "krrl", "yxzrs", "sfxkbj")
+BATCH_SIZE = 4096
+# 单份快照达到该行数时才改用列式流水线
+FRAME_MIN_ROWS = 10000
+
+
+def _int_value(value) -> int:
+    """与 _to_int 相同的转换：无法转换的视为 0"""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def analyze_course(course: dict) -> dict:
+    """
+    逐门课程计算容量指标（单门课程或小快照用），字段与 display_columns 的一行相同
+    :param course: ScheduleService.get 返回的一门课程
+    """
+    raw = course.get("raw_data") or {}
+    base, expansion, enrolled = (_int_value(raw.get(name)) for name in ("jxbrs", "krrl", "yxzrs"))
+    total = base + expansion
+    if str(raw.get("sfxkbj")) != "1":
+        status = STATUS_UNSELECTED
+    else:
+        status = STATUS_SELECTED if total >= enrolled else STATUS_PENDING
+    result = {name: course.get(name) for name in INFO_COLUMNS}
+    result.update({name: raw.get(name) for name in RAW_COLUMNS})
+    result.update(
+        title=result["title"] if result["title"] is not None else "未知",
+        teacher=result["teacher"] if result["teacher"] is not None else "未知",
+        credit=result["credit"] if result["credit"] is not None else 0,
+        time=str(result["time"] or "").replace("\n", " "),
+        place=str(result["place"] or "").replace("\n", " "),
+        base_capacity=base,
+        expansion=expansion,
+        enrolled=enrolled,
+        total_capacity=total,
+        remaining=total - enrolled,
+        rate=enrolled * 100.0 / total if total > 0 else 0.0,
+        status_str=status,
+        capacity_display=f"{enrolled}/{base}+{expansion}" if expansion > 0 else f"{enrolled}/{base}",
+    )
+    return result
+
+
+def snapshot_frame(snapshots: Iterable[Tuple[str, Iterable[dict]]]) -> pd.DataFrame:
+    """
+    把多份课表快照读入同一个 DataFrame，每行一门课程
+    :param snapshots: [(快照名称, 课程列表)]，课程为 ScheduleService.get 返回的 courses；
+                      课程列表可以是生成器（如 json_stream.iter_courses），分批读取
+    :return: 列为 snapshot（按读入顺序排列的分类）、INFO_COLUMNS 与 RAW_COLUMNS（原始值，尚未转换）
+    """
+    labels, sizes = [], []
+    columns = {name: [] for name in INFO_COLUMNS + RAW_COLUMNS}
+    for label, courses in snapshots:
+        courses, size = iter(courses), 0
+        # 分批取出需要的字段，课程记录本身读完即丢弃（流式读取大文件时只保留各列）
+        while batch := list(islice(courses, BATCH_SIZE)):
+            raws = [course.get("raw_data") or {} for course in batch]
+            for name in INFO_COLUMNS:
+                columns[name].extend([course.get(name) for course in batch])
+            for name in RAW_COLUMNS:
+                columns[name].extend([raw.get(name) for raw in raws])
+            size += len(batch)
+        labels.append(label)
+        sizes.append(size)
+    # 同名快照合并为一个分类（例如重复传入同一文件）
+    categories = list(dict.fromkeys(labels))
+    codes = np.repeat(np.array([categories.index(label) for label in labels], dtype="int32"), sizes)
+    frame = pd.DataFrame(columns)
+    frame.insert(0, "snapshot", pd.Categorical.from_codes(codes, categories=categories, ordered=True))
+    return frame
+
+
+def _to_int(column: pd.Series) -> np.ndarray:
+    """
+    把原始字段（字符串或数字）转换为整数，无法转换的视为 0。
+    容量、扩容与已选人数的取值很少，先去重再转换，只解析每个不同的值一次
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    values = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").fillna(0).to_numpy("int64")
+    return np.where(codes >= 0, values[codes], 0) if len(values) else np.zeros(len(column), dtype="int64")
+
+
+def analyze_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    为所有快照的所有行计算容量指标（向量化，不逐行调用 Python 函数）
+    :param frame: snapshot_frame 的返回
+    :return: 新的 DataFrame，增加 base_capacity、expansion、enrolled、total_capacity、remaining、
+             rate（百分比）与 status_str（分类）；展示用的文本列见 display_columns
+    """
+    base = _to_int(frame["jxbrs"])
+    expansion = _to_int(frame["krrl"])
+    enrolled = _to_int(frame["yxzrs"])
+    total = base + expansion
+    codes, uniques = pd.factorize(frame["sfxkbj"], use_na_sentinel=True)
+    selected = np.array([str(u) == "1" for u in uniques], dtype=bool)
+    in_list = np.where(codes >= 0, selected[codes] if len(selected) else False, False)
+    status = np.where(~in_list, 0, np.where(total >= enrolled, 1, 2)).astype("int8")
+
+    result = frame.copy()
+    result["base_capacity"] = base
+    result["expansion"] = expansion
+    result["enrolled"] = enrolled
+    result["total_capacity"] = total
+    result["remaining"] = total - enrolled
+    result["rate"] = np.divide(enrolled * 100.0, total, out=np.zeros(len(total)), where=total > 0)
+    result["status_str"] = pd.Categorical.from_codes(status, categories=[STATUS_UNSELECTED, STATUS_SELECTED,
+                                                                         STATUS_PENDING])
+    return result
+
+
+def display_columns(analysis: pd.DataFrame) -> pd.DataFrame:
+    """
+    为要展示的行补上文本列：capacity_display（“已选/基础+扩容”），time/place 去掉换行，
+    缺失的 title/teacher/credit 取默认值；只对展示的行做字符串处理
+    """
+    result = analysis.copy()
+    display = result["enrolled"].astype(str) + "/" + result["base_capacity"].astype(str)
+    result["capacity_display"] = display.where(result["expansion"] <= 0,
+                                               display + "+" + result["expansion"].astype(str))
+    for name in ("time", "place"):
+        result[name] = result[name].fillna("").astype(str).str.replace("\n", " ", regex=False)
+    result["title"] = result["title"].fillna("未知")
+    result["teacher"] = result["teacher"].fillna("未知")
+    result["credit"] = result["credit"].fillna(0)
+    result["status_str"] = result["status_str"].astype(str)
+    return result
+
+
+def latest(analysis: pd.DataFrame) -> pd.DataFrame:
+    """最后一份快照中的课程（保持原顺序）"""
+    if analysis.empty:
+        return analysis
+    return analysis[analysis["snapshot"] == analysis["snapshot"].cat.categories[-1]]
+
+
+def snapshot_trends(analysis: pd.DataFrame) -> pd.DataFrame:
+    """
+    按教学班汇总各快照间的变化
+    :param analysis: analyze_frame 的返回
+    :return: 每个教学班一行：title、snapshots（出现次数）、first_enrolled、last_enrolled、change、
+             max_rate、expansion_change 与最后一次的 status_str，按已选人数变化从大到小排序
+    """
+    key = analysis["class_id"].fillna(analysis["course_id"]).fillna(analysis["title"])
+    ordered = analysis.assign(_key=key)
+    # 快照按读入顺序排列时无需排序（同名快照合并后才可能乱序）
+    if not ordered["snapshot"].cat.codes.is_monotonic_increasing:
+        ordered = ordered.sort_values("snapshot", kind="stable")
+    grouped = ordered.groupby("_key", sort=False, observed=True)
+    trends = grouped.agg(
+        title=("title", "last"),
+        snapshots=("snapshot", "size"),
+        first_enrolled=("enrolled", "first"),
+        last_enrolled=("enrolled", "last"),
+        max_rate=("rate", "max"),
+        first_expansion=("expansion", "first"),
+        last_expansion=("expansion", "last"),
+        status_str=("status_str", "last"),
+    )
+    # 从未有过课程名称的教学班聚合结果为 NaN
+    trends["title"] = trends["title"].fillna("未知").astype(str)
+    trends["change"] = trends["last_enrolled"] - trends["first_enrolled"]
+    trends["expansion_change"] = trends["last_expansion"] - trends["first_expansion"]
+    trends = trends.drop(columns=["first_expansion", "last_expansion"])
+    return trends.sort_values("change", ascending=False, kind="stable")
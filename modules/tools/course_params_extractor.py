@@ -1,14 +1,19 @@
 import re
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 from loguru import logger
-from bs4 import BeautifulSoup
+from modules.jwxt_client import JwxtClient, GNMKDM_SELECT, SELECTION_INDEX_PATH
+
+
+def _soup(html: str):
+    """按需导入 BeautifulSoup 解析 HTML（bs4 导入较慢，只在正则提取失败时才需要）"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
 
 class CourseParamsExtractor:
     """选课参数提取器"""
 
-    COURSE_SELECTION_PATH = "jwglxt/xsxk/zzxkyzb_cxZzxkYzbIndex.html"
+    COURSE_SELECTION_PATH = SELECTION_INDEX_PATH
 
     def __init__(self, session: requests.Session, base_url: str, timeout: int = 10):
         """
@@ -20,6 +25,7 @@ class CourseParamsExtractor:
         self.sess = session
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.client = JwxtClient.for_session(session, base_url, timeout)
         logger.debug("初始化 CourseParamsExtractor：base_url={}", self.base_url)
 
     def get_selection_time(self) -> dict:
@@ -27,8 +33,7 @@ class CourseParamsExtractor:
         获取当前选课时间
         :return: 选课时间信息
         """
-        selection_time_url = urljoin(self.base_url, "jwglxt/xsxk/zzxkyzb_cxZzxkYzbIndex.html")
-        response = self.sess.get(selection_time_url)
+        response = self.client.get(self.COURSE_SELECTION_PATH, endpoint="params")
 
         if response.status_code != 200:
             (logger.debug("获取选课时间失败，状态码: {}", response.status_code))
@@ -37,7 +42,7 @@ class CourseParamsExtractor:
         # 这里需要根据实际页面结构进行调整
         # 例如，使用BeautifulSoup解析HTML
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = _soup(response.text)
         # 假设选课时间在某个特定的标签中
         selection_time = soup.find("div", class_="selection-time").text.strip()
 
@@ -49,43 +54,17 @@ class CourseParamsExtractor:
         从选课页面提取必要的选课参数
         :return: dict，包含选课所需的参数
         """
-        # 构造选课页面URL
-        course_selection_url = urljoin(
-            self.base_url,
-            f"{self.COURSE_SELECTION_PATH}?gnmkdm=N253512&layout=default"
-        )
-
-        logger.debug("访问选课页面：{}", course_selection_url)
-
         try:
             # 请求选课页面
-            response = self.sess.get(
-                course_selection_url,
-                timeout=self.timeout
-            )
-
-            if response.status_code != 200:
-                logger.error("访问选课页面失败，状态码: {}", response.status_code)
-                return {"code": 2333, "msg": f"访问选课页面失败，状态码：{response.status_code}", "data": {}}
-
-            # 解析HTML内容
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 提取参数
-            params = {
-                "rwlx": self._extract_param(response.text, "rwlx", "1"),
-                "xkly": self._extract_param(response.text, "xkly", "1"),
-                "zyh_id": self._extract_param(response.text, "zyh_id"),
-                "zyh_id_1": self._extract_param(response.text, "zyh_id_1"),
-                "zyh_id_xs": self._extract_param(response.text, "zyh_id_1"),
-                "njdm_id": self._extract_param(response.text, "njdm_id"),
-                "njdm_id_1": self._extract_param(response.text, "njdm_id_1"),
-                "njdm_id_xs": self._extract_param(response.text, "njdm_id_1"),
-                "bh_id": self._extract_param(response.text, "bh_id"),
-                "xkxnm": self._extract_param(response.text, "xkxnm"),
-                "xkxqm": self._extract_param(response.text, "xkxqm", "12"),
-                "kklxdm": self._extract_param(response.text, "kklxdm", "01")
-            }
+            response = self.client.get(self.COURSE_SELECTION_PATH, endpoint="params", timeout=self.timeout,
+                                       gnmkdm=GNMKDM_SELECT, layout="default")
+
+            page = self.client.check_page(response)
+            if page["code"] != 1000:
+                logger.error("访问选课页面失败：{}", page["msg"])
+                return {"code": page["code"], "msg": f"访问选课页面失败：{page['msg']}", "data": {}}
+
+            params = self.parse_page(page["data"])
 
             # 检查是否成功提取所有必要参数
             missing_params = [k for k, v in params.items() if not v]
@@ -107,7 +86,31 @@ class CourseParamsExtractor:
             logger.exception("提取选课参数时发生未知异常：")
             return {"code": 999, "msg": f"未知异常：{e}", "data": {}}
 
-    def _extract_param(self, html_content, param_name, default=None):
+    @classmethod
+    def parse_page(cls, html: str) -> dict:
+        """
+        从选课页面 HTML 中提取选课参数（同步与异步服务共用）
+        :param html: 选课页面内容
+        :return: 参数字典，未找到的参数为默认值或 None
+        """
+        # 提取参数（先用正则，只有正则失败时才用 BeautifulSoup 解析）
+        return {
+            "rwlx": cls._extract_param(html, "rwlx", "1"),
+            "xkly": cls._extract_param(html, "xkly", "1"),
+            "zyh_id": cls._extract_param(html, "zyh_id"),
+            "zyh_id_1": cls._extract_param(html, "zyh_id_1"),
+            "zyh_id_xs": cls._extract_param(html, "zyh_id_1"),
+            "njdm_id": cls._extract_param(html, "njdm_id"),
+            "njdm_id_1": cls._extract_param(html, "njdm_id_1"),
+            "njdm_id_xs": cls._extract_param(html, "njdm_id_1"),
+            "bh_id": cls._extract_param(html, "bh_id"),
+            "xkxnm": cls._extract_param(html, "xkxnm"),
+            "xkxqm": cls._extract_param(html, "xkxqm", "12"),
+            "kklxdm": cls._extract_param(html, "kklxdm", "01")
+        }
+
+    @staticmethod
+    def _extract_param(html_content, param_name, default=None):
         """
         从HTML内容中提取指定参数的值
         :param html_content: HTML内容
@@ -127,7 +130,7 @@ class CourseParamsExtractor:
                 return match.group(1)
 
         # 尝试从隐藏输入字段中提取
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = _soup(html_content)
         input_field = soup.find('input', {'name': param_name}) or soup.find('input', {'id': param_name})
         if input_field and 'value' in input_field.attrs:
             return input_field['value']
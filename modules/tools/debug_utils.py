@@ -1,40 +1,147 @@
 import os
 import sys
+import time
+import threading
+from typing import Dict, Optional
 from loguru import logger
 
 # 环境变量 JWXT_DEBUG 控制是否开启 DEBUG
 DEBUG = os.getenv("JWXT_DEBUG", "").lower() in ("1", "true", "yes")
+# 环境变量 JWXT_LOG_JSON 控制日志文件是否输出为结构化 JSON（每行一条）
+LOG_JSON = os.getenv("JWXT_LOG_JSON", "").lower() in ("1", "true", "yes")
+
+# 当前生效的最低日志级别序号，init_logger 之前为 0（全部输出）
+_min_level_no = 0
+# 内置级别序号，避免热路径上每次查询 logger.level()
+_LEVEL_NO = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
 
 # 日志文件名（相对路径）
 LOG_PATH = os.path.join(os.getcwd(), "auto_course.log")
 
-def init_logger(debug_flag: bool) -> str:
+def init_logger(debug_flag: bool, log_path: str = None, console: bool = True, json_logs: bool = None) -> str:
     """
     初始化 Loguru 日志：
       - 控制台输出（stderr）
       - 文件输出（auto_course.log），10 MB 分割，保留 3 个归档
+    两个输出都经后台队列写入（enqueue），调用方不会因写盘或终端输出而阻塞。
     :param debug_flag: 是否开启 DEBUG 级别
+    :param log_path: 日志文件路径，默认为当前目录下的 auto_course.log
+    :param console: 是否输出到控制台
+    :param json_logs: 日志文件是否输出为结构化 JSON，默认读取环境变量 JWXT_LOG_JSON
     :return: 日志文件完整路径
     """
+    global _min_level_no
     level = "DEBUG" if debug_flag else "INFO"
+    log_path = log_path or LOG_PATH
+    json_logs = LOG_JSON if json_logs is None else json_logs
     # 先移除任何已有的 sink
     logger.remove()
     # 控制台
-    logger.add(
-        sink=sys.stderr,
-        level=level,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-               "<level>{level:<8}</level> | "
-               "{message}"
-    )
+    if console:
+        logger.add(
+            sink=sys.stderr,
+            level=level,
+            enqueue=True,
+            # 标记为 file_only 的日志（如后台抢课的逐次结果）不输出到控制台，避免干扰交互菜单
+            filter=lambda record: not record["extra"].get("file_only"),
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+                   "<level>{level:<8}</level> | "
+                   "{message}"
+        )
     # 文件
     logger.add(
-        sink=LOG_PATH,
+        sink=log_path,
         level=level,
         rotation="10 MB",     # 日志文件达到 10MB 时分割
         retention=3,          # 保留最近 3 个归档
         encoding="utf-8",
+        enqueue=True,
+        serialize=json_logs,
         format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{line} - {message}"
     )
-    logger.debug("日志初始化完成，级别：{}", level)
-    return LOG_PATH
\ No newline at end of file
+    _min_level_no = _LEVEL_NO[level]
+    logger.debug("日志初始化完成，级别：{}，JSON：{}", level, json_logs)
+    return log_path
+
+
+class LogBudget:
+    """
+    按消息类型限制热路径日志：默认令牌桶限速（每秒 rate 条，突发 burst 条），
+    也可配置为每 sample 条只输出 1 条。被丢弃的条数会附在下一条输出的日志后。
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 5):
+        """
+        :param rate: 默认每秒允许的条数
+        :param burst: 默认突发上限
+        """
+        self.default = {"rate": rate, "burst": burst, "sample": 0}
+        self.rules: Dict[str, dict] = {}
+        self._state: Dict[str, list] = {}  # key -> [令牌数, 上次补充时间, 已丢弃条数, 计数]
+        self._lock = threading.Lock()
+
+    def configure(self, key: str, rate: float = None, burst: int = None, sample: int = None):
+        """
+        配置某类消息的预算
+        :param key: 消息类型，如 "select.request"
+        :param rate: 每秒允许的条数
+        :param burst: 突发上限
+        :param sample: 大于 0 时改为采样：每 sample 条输出 1 条
+        """
+        rule = dict(self.rules.get(key, self.default))
+        for name, value in (("rate", rate), ("burst", burst), ("sample", sample)):
+            if value is not None:
+                rule[name] = value
+        with self._lock:
+            self.rules[key] = rule
+            self._state.pop(key, None)
+
+    def take(self, key: str) -> Optional[int]:
+        """
+        申请输出一条日志
+        :return: 允许时返回此前被丢弃的条数（通常为 0），不允许时返回 None
+        """
+        rule = self.rules.get(key, self.default)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = [float(rule["burst"]), now, 0, 0]
+            state[3] += 1
+            if rule["sample"] > 0:
+                allowed = (state[3] - 1) % rule["sample"] == 0
+            else:
+                state[0] = min(rule["burst"], state[0] + (now - state[1]) * rule["rate"])
+                state[1] = now
+                allowed = state[0] >= 1
+                if allowed:
+                    state[0] -= 1
+            if not allowed:
+                state[2] += 1
+                return None
+            dropped, state[2] = state[2], 0
+            return dropped
+
+
+LOG_BUDGET = LogBudget()
+
+
+def hot_log(key: str, level: str, message: str, *args, file_only: bool = False):
+    """
+    热路径日志：级别未开启时几乎零开销地返回；按消息类型限速或采样；
+    参数可以是无参函数（如 lambda: response.text），只有真正输出时才求值与格式化。
+    :param key: 消息类型，用于 LOG_BUDGET 限速
+    :param level: 日志级别名，如 "DEBUG"
+    :param message: 带 {} 占位符的消息
+    :param file_only: 只写入日志文件，不输出到控制台
+    """
+    if (_LEVEL_NO.get(level) or logger.level(level).no) < _min_level_no:
+        return
+    dropped = LOG_BUDGET.take(key)
+    if dropped is None:
+        return
+    if dropped:
+        message = f"{message} (已省略 {dropped} 条同类日志)"
+    lazy_args = [a if callable(a) else (lambda a=a: a) for a in args]
+    target = logger.bind(file_only=True) if file_only else logger
+    target.opt(lazy=True, depth=1).log(level, message, *lazy_args)
\ No newline at end of file
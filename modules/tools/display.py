@@ -79,6 +79,23 @@ def display_schedule_text(data, year=None, term=None):
         print(f"   时间：{course.get('time', '未知')}")
         print(f"   地点：{course.get('place', '未知')}")
 
+def display_schedule_changes(changes):
+    """
+    显示课表变更（functions.schedule_store 的变更记录）
+    :param changes: 变更列表
+    """
+    if not changes:
+        return
+    labels = {"added": "新增", "removed": "退选", "moved": "调整时间/地点", "updated": "信息更新"}
+    print(f"\n🔔 课表有 {len(changes)} 处变化:")
+    for c in changes:
+        before, after = c.get("before") or {}, c.get("after") or {}
+        detail = ""
+        if c["type"] == "moved":
+            detail = f"：{before.get('time')} {before.get('place')} -> {after.get('time')} {after.get('place')}"
+        print(f"  [{labels.get(c['type'], c['type'])}] {c.get('title', '')}{detail}")
+
+
 def display_course_info(data):
     """
     显示课程信息，重点提取指定字段
@@ -117,22 +134,69 @@ def display_course_info(data):
             print(" | ".join(str(item) for item in row))
 
 
-def export_course_json(data, filename=None):
+def _class_row(course):
+    """教学班的名称、教师、上课时间与余量，供方案展示使用"""
+    from modules.course_searcher import CourseSearcher
+    teacher = course.get('jsxx', '')
+    parts = teacher.split('/')
+    free = CourseSearcher.free_seats(course)
+    return [
+        course.get('jxbmc', '未知'),
+        parts[1] if len(parts) >= 2 else teacher,
+        course.get('sksj', '').replace('<br/>', ' '),
+        '未知' if free is None else free,
+    ]
+
+
+def display_plan_candidates(courses):
+    """
+    显示自动规划的候选教学班
+    :param courses: 候选教学班列表
+    """
+    headers = ["序号", "教学班名称", "教师", "上课时间", "余量"]
+    table_data = [[i] + _class_row(course) for i, course in enumerate(courses, 1)]
+    print(f"\n📚 共 {len(courses)} 个候选教学班")
+    print(tabulate(table_data, headers=headers, tablefmt="grid"))
+
+
+def display_target_plans(plans):
+    """
+    显示目标方案（第一个为最优方案，其余为备选）
+    :param plans: functions.target_optimizer.optimize_targets 的返回
+    """
+    for i, plan in enumerate(plans, 1):
+        title = "最优方案" if i == 1 else f"备选方案 {i - 1}"
+        print(f"\n【{i}. {title}】选上 {plan['covered']} 门，偏好分数 {plan['score']:g}")
+        if plan['missing']:
+            print(f"   无法安排: {', '.join(plan['missing'])}")
+        print(tabulate([_class_row(c) for c in plan['courses']], headers=["教学班名称", "教师", "上课时间", "余量"],
+                       tablefmt="simple"))
+
+
+def export_course_json(data, filename=None, lines=False):
     """
     将课程信息导出为JSON文件
-    :param data: 课程数据列表
-    :param filename: 输出文件名，如果未提供则自动生成
+    :param data: 课程数据列表；按 JSON Lines 导出时可以是生成器
+    :param filename: 输出文件名，如果未提供则自动生成；扩展名为 .jsonl/.ndjson 时按 JSON Lines 导出
+    :param lines: 是否导出为 JSON Lines（每行一门课程，可用 json_stream.iter_courses 逐条读取）
     :return: 保存的文件路径
     """
+    from modules.tools.json_stream import is_lines_file, write_lines
+
     if not filename:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"courses_{timestamp}.json"
+        filename = f"courses_{timestamp}.jsonl" if lines else f"courses_{timestamp}.json"
 
     # 确保目录存在
     directory = os.path.dirname(filename)
     if directory and not os.path.exists(directory):
         os.makedirs(directory)
 
+    if lines or is_lines_file(filename):
+        count = write_lines(filename, data)
+        print(f"\n✅ {count} 门课程已保存到: {os.path.abspath(filename)}")
+        return os.path.abspath(filename)
+
     # 准备导出数据
     export_data = {
         "timestamp": datetime.now().isoformat(),
@@ -161,16 +225,27 @@ def display_exam_text(data):
     year = data.get("year")
     term = data.get("term")
     count = data.get("count", len(courses))
+    # 多学期合并结果（ExamService.get_many）带 terms，表格中增加学期列
+    terms = data.get("terms")
     print(f"\n📚 考试信息")
-    print(f"学年：{year}，学期：{term}，共 {count} 场考试")
+    if terms is not None:
+        summary = "，".join(f"{t['year']}-{t['term']} {t['count']} 场" for t in terms)
+        print(f"{summary}，共 {count} 场考试")
+        for e in data.get("errors", []):
+            print(f"❌ {e['year']}-{e['term']} 获取失败：{e['msg']}")
+    else:
+        print(f"学年：{year}，学期：{term}，共 {count} 场考试")
     if not courses:
         print("❌ 暂无考试数据")
         return
     headers = ["序号","课程","考试时间","地点","校区","座号","方式","考试批次"]
+    if terms is not None:
+        headers.insert(1, "学期")
     table = []
     for i, c in enumerate(courses, 1):
         table.append([
             i,
+            *([f"{c.get('year')}-{c.get('term')}"] if terms is not None else []),
             c.get("title",""),
             c.get("time",""),
             c.get("location",""),
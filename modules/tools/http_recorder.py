@@ -0,0 +1,222 @@
+"""
+http_recorder.py
+~~~~~~~~~~~~~~~~
+可插拔的会话包装：
+  - RecordingSession：透明转发请求，同时把响应写入紧凑的夹具文件（gzip 压缩的 JSON Lines），
+    Cookie 不落盘；表单中的学号与密码、JSON 响应中的学号与姓名字段会被替换为占位符，
+    学号出现在 HTML 页面等其他位置时需登记为 secrets（LoginClient.login 会自动登记所登录的学号），
+    HTML 页面中的姓名不会自动识别，需要时同样通过 secrets 传入；
+  - ReplaySession：从夹具文件回放响应，可按原始耗时回放，也可全速回放。
+所有提取器都只调用 self.sess.get/post，直接传入包装后的会话即可离线、可重复地剖析解析与编排热点。
+"""
+
+import re
+import gzip
+import json
+import time
+import threading
+from collections import defaultdict, deque
+from typing import Dict, List, Iterable, Optional
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from loguru import logger
+
+SID_PLACEHOLDER = "<SID>"
+SECRET_PLACEHOLDER = "<REDACTED>"
+
+# 不参与回放匹配的易变查询参数
+VOLATILE_QUERY = {"_t", "nd", "time"}
+# 表单中需要脱敏的字段
+SECRET_FIELDS = {"password", "pwd", "mm"}
+ID_FIELDS = {"username", "su", "xh", "xh_id"}
+# 响应体中需要脱敏的 JSON 字段：学号、姓名
+BODY_PATTERNS = [
+    (re.compile(r'("(?:xh|xh_id|su)"\s*:\s*")[^"]*(")'), r"\1" + SID_PLACEHOLDER + r"\2"),
+    (re.compile(r'("(?:xm|xsxm)"\s*:\s*")[^"]*(")'), r"\1" + SECRET_PLACEHOLDER + r"\2"),
+]
+# 只保留对解析有意义的响应头
+KEPT_HEADERS = ("Content-Type",)
+
+
+class Scrubber:
+    """敏感信息脱敏"""
+
+    def __init__(self, secrets: Iterable[str] = ()):
+        """
+        :param secrets: 需要在 URL 与响应体中替换掉的字符串（如学号、姓名）
+        """
+        self.secrets = [s for s in secrets if s]
+
+    def text(self, text: str) -> str:
+        for secret in self.secrets:
+            text = text.replace(secret, SID_PLACEHOLDER)
+        for pattern, repl in BODY_PATTERNS:
+            text = pattern.sub(repl, text)
+        return text
+
+    def form(self, data) -> Dict[str, str]:
+        if not isinstance(data, dict):
+            return {}
+        cleaned = {}
+        for k, v in data.items():
+            if k in SECRET_FIELDS:
+                cleaned[k] = SECRET_PLACEHOLDER
+            elif k in ID_FIELDS:
+                cleaned[k] = SID_PLACEHOLDER
+            else:
+                cleaned[k] = self.text(str(v))
+        return cleaned
+
+    def url(self, url: str) -> str:
+        parts = urlsplit(url)
+        query = [(k, SID_PLACEHOLDER if k in ID_FIELDS else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+        path = self.text(parts.path)
+        return parts._replace(path=path, query=urlencode(query, safe="<>")).geturl()
+
+
+def request_key(method: str, url: str) -> str:
+    """回放匹配键：请求方法 + 路径 + 去掉易变参数与身份参数后的查询串"""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in VOLATILE_QUERY and k not in ID_FIELDS)
+    return f"{method.upper()} {parts.path}?{urlencode(query)}"
+
+
+class RecordingSession:
+    """录制会话：包装 requests.Session，把每次响应追加写入夹具文件"""
+
+    def __init__(self, session: requests.Session, path: str, secrets: Iterable[str] = ()):
+        """
+        :param session: 被包装的真实会话
+        :param path: 夹具文件路径（建议以 .jsonl.gz 结尾）
+        :param secrets: 额外需要脱敏的字符串，例如姓名；通过 LoginClient 登录时学号会自动登记
+        """
+        self._session = session
+        self.path = path
+        self.scrubber = Scrubber(secrets)
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._fp = gzip.open(path, "wt", encoding="utf-8")
+        logger.debug("开始录制 HTTP 响应到 {}", path)
+
+    def __getattr__(self, name):
+        # headers、cookies、mount 等属性直接转发给真实会话
+        return getattr(self._session, name)
+
+    def add_secret(self, secret: str):
+        """追加需要脱敏的字符串（例如登录后才知道的学号）"""
+        if secret and secret not in self.scrubber.secrets:
+            self.scrubber.secrets.append(secret)
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._fp.write(line + "\n")
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        offset = time.perf_counter() - self._started
+        entry = {
+            "t": round(offset, 4),
+            "method": method.upper(),
+            "url": self.scrubber.url(url),
+            "data": self.scrubber.form(kwargs.get("data")),
+        }
+        started = time.perf_counter()
+        try:
+            response = self._session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            entry["elapsed"] = round(time.perf_counter() - started, 4)
+            entry["error"] = type(e).__name__
+            self._write(entry)
+            raise
+        entry["elapsed"] = round(time.perf_counter() - started, 4)
+        entry["status"] = response.status_code
+        entry["headers"] = {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers}
+        entry["body"] = self.scrubber.text(response.text)
+        self._write(entry)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, data=None, **kwargs) -> requests.Response:
+        return self.request("POST", url, data=data, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.close()
+        self._session.close()
+
+
+class ReplaySession:
+    """回放会话：按请求方法与路径从夹具文件中依次取出录制的响应"""
+
+    def __init__(self, path: str, realtime: bool = False, speed: float = 1.0, loop: bool = True):
+        """
+        :param path: 夹具文件路径
+        :param realtime: 是否按录制时的耗时等待后再返回
+        :param speed: 按原始耗时回放时的加速倍数
+        :param loop: 同一接口的录制响应用完后是否从头循环
+        """
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+        self.headers = CaseInsensitiveDict()
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self.entries: Dict[str, List[dict]] = defaultdict(list)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self.entries[request_key(entry["method"], entry["url"])].append(entry)
+        self._queues: Dict[str, deque] = {k: deque(v) for k, v in self.entries.items()}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.misses = 0
+        logger.debug("从 {} 加载 {} 个接口的录制响应", path, len(self.entries))
+
+    def _next(self, key: str) -> Optional[dict]:
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                if not self.loop or key not in self.entries:
+                    return None
+                queue = self._queues[key] = deque(self.entries[key])
+            return queue.popleft()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.requests += 1
+        key = request_key(method, url)
+        entry = self._next(key)
+        if entry is None:
+            self.misses += 1
+            raise requests.ConnectionError(f"回放夹具中没有匹配的请求: {key}")
+        if self.realtime and entry.get("elapsed"):
+            time.sleep(entry["elapsed"] / self.speed)
+        if "error" in entry:
+            error = getattr(requests, entry["error"], requests.RequestException)
+            raise error(f"回放录制的异常: {entry['error']}")
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.url = url
+        response.request = requests.Request(method, url).prepare()
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, data=None, **kwargs) -> requests.Response:
+        return self.request("POST", url, data=data, **kwargs)
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,164 @@
+"""
+http_timing.py
+~~~~~~~~~~~~~~
+请求阶段计时：通过自定义传输适配器挂到共享的 requests.Session 上，
+在连接层分别测量 DNS 解析、TCP 建连、TLS 握手、首字节时间（TTFB）与响应体下载，
+按接口（search/select/refresh/schedule/exam/login）累计到 EndpointTimings 直方图。
+
+用法:
+    timings = instrument_session(sess)
+    ...
+    print(timings.summary_lines())
+"""
+
+import socket
+import time
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NameResolutionError, NewConnectionError
+
+from modules.tools.latency import EndpointTimings
+
+# URL 路径片段 -> 接口名，按顺序匹配
+ENDPOINT_PATTERNS = (
+    ("zzxkyzb_cxZzxkYzbPartDisplay", "search"),
+    ("zzxkyzbjk_xkBcZyZzxkYzb", "select"),
+    ("zzxkyzb_cxZzxkYzbChoosedDisplay", "schedule"),
+    ("zzxkyzb_cxZzxkYzbIndex", "refresh"),
+    ("kscx_cxXsksxxIndex", "exam"),
+    ("index_initMenu", "login"),
+    ("/login", "login"),
+    ("/sso", "login"),
+)
+
+
+def classify_endpoint(url: str) -> str:
+    """根据 URL 判断所属接口，教务首页与 SSO 回跳归为 login"""
+    parts = urlsplit(url)
+    for fragment, name in ENDPOINT_PATTERNS:
+        if fragment in parts.path:
+            return name
+    if parts.path in ("", "/") or "sso" in parts.netloc:
+        return "login"
+    return "other"
+
+
+class _TimedConnectionMixin:
+    """在连接对象上记录本次请求的阶段耗时，由 TimingAdapter 取走"""
+
+    def _phases(self) -> dict:
+        phases = self.__dict__.get("_timing_phases")
+        if phases is None:
+            phases = self._timing_phases = {}
+        return phases
+
+    def pop_timings(self) -> dict:
+        phases = self._phases()
+        self._timing_phases = {}
+        return phases
+
+    def _new_conn(self) -> socket.socket:
+        # 先单独解析域名以测量 DNS，再依次连接解析出的地址，避免重复解析
+        started = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+        dns_host = self._dns_host
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        try:
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except NewConnectionError:
+                    if i == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+        phases = self._phases()
+        phases["dns"] = resolved - started
+        phases["connect"] = time.perf_counter() - resolved
+        self._ready_at = time.perf_counter()
+        return sock
+
+    def request(self, *args, **kwargs):
+        self._request_started = time.perf_counter()
+        return super().request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        # 首字节时间从请求开始（或本次新建连接就绪）算到响应头读完
+        sent = max(getattr(self, "_request_started", 0.0), getattr(self, "_ready_at", 0.0))
+        if sent:
+            self._phases()["ttfb"] = time.perf_counter() - sent
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        phases = self._phases()
+        if "connect" in phases:
+            phases["tls"] = max(0.0, time.perf_counter() - started - phases["dns"] - phases["connect"])
+        self._ready_at = time.perf_counter()
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """记录各阶段耗时的传输适配器；非流式请求在适配器内读完响应体以测量下载耗时"""
+
+    def __init__(self, timings: EndpointTimings, *args, **kwargs):
+        self.timings = timings
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, stream=False, **kwargs):
+        started = time.perf_counter()
+        response = super().send(request, stream=stream, **kwargs)
+        conn = getattr(response.raw, "connection", None)
+        phases = conn.pop_timings() if isinstance(conn, _TimedConnectionMixin) else {}
+        if not stream:
+            read_started = time.perf_counter()
+            response.content
+            phases["download"] = time.perf_counter() - read_started
+        phases["total"] = time.perf_counter() - started
+        self.timings.record(classify_endpoint(request.url), phases)
+        return response
+
+
+def instrument_session(sess, timings: EndpointTimings = None) -> EndpointTimings:
+    """
+    为会话挂载计时适配器（http 与 https），返回累计耗时的 EndpointTimings
+    :param sess: requests.Session 或转发 mount 的包装会话
+    :param timings: 共享的直方图容器，多个会话（如会话池成员）可汇总到同一个
+    """
+    timings = timings or EndpointTimings()
+    adapter = TimingAdapter(timings)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return timings
@@ -0,0 +1,234 @@
+"""
+json_stream.py
+~~~~~~~~~~~~~~
+逐条读取导出文件中的课程记录，内存占用与文件大小无关（只保留当前记录与一块读缓冲）：
+
+    - JSON（export_course_json、export_schedule_json、目标课程文件等）：流式解析，取出指定位置的数组，
+      如 {"courses": [...]} 中的 courses；安装了 ijson 时用 ijson，否则用内置的增量扫描器
+      （json.JSONDecoder.raw_decode 逐个解码数组元素）；
+    - JSON Lines（扩展名 .jsonl / .ndjson，export_course_json(..., lines=True) 的输出）：每行一条记录。
+
+用法:
+    for course in iter_courses("courses.json", where=lambda c: c.get("kch_id") == "08305014"):
+        ...
+"""
+
+import json
+import os
+import re
+from typing import Callable, Iterator, Optional, Sequence, TextIO
+
+# 课程数组的位置（以 "." 分隔的键，空字符串表示顶层数组），依次尝试，取第一个有记录的
+COURSE_PREFIXES = ("courses",)
+LINE_SUFFIXES = (".jsonl", ".ndjson")
+CHUNK_SIZE = 64 * 1024
+
+_SKIP_WHITESPACE = re.compile(r"[ \t\r\n]*").match
+_DELIMITERS = " \t\r\n,]}:"
+_decoder = json.JSONDecoder()
+
+
+def is_lines_file(path: str) -> bool:
+    """是否为 JSON Lines 文件（按扩展名判断）"""
+    return path.lower().endswith(LINE_SUFFIXES)
+
+
+def iter_courses(path: str, where: Optional[Callable[[dict], bool]] = None,
+                 prefixes: Sequence[str] = COURSE_PREFIXES, use_ijson: bool = True) -> Iterator[dict]:
+    """
+    逐条读取文件中的课程记录
+    :param path: JSON 或 JSON Lines 文件
+    :param where: 过滤条件，只返回使其为真的记录（读取时即丢弃其余记录）
+    :param prefixes: JSON 文件中课程数组的位置，依次尝试，取第一个有记录的；JSON Lines 文件忽略
+    :param use_ijson: 安装了 ijson 时是否使用
+    """
+    if is_lines_file(path):
+        records = _iter_lines(path)
+    else:
+        records = _iter_prefixes(path, prefixes, use_ijson)
+    for record in records:
+        if where is None or where(record):
+            yield record
+
+
+def _iter_lines(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path} 第 {lineno} 行不是合法的 JSON: {e}") from e
+
+
+def _iter_prefixes(path: str, prefixes: Sequence[str], use_ijson: bool) -> Iterator[dict]:
+    ijson = _import_ijson() if use_ijson else None
+    for prefix in prefixes:
+        found = False
+        if ijson is not None:
+            with open(path, "rb") as f:
+                for record in ijson.items(f, f"{prefix}.item" if prefix else "item", use_float=True):
+                    found = True
+                    yield record
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                for record in _StreamReader(f).find(prefix.split(".") if prefix else []):
+                    found = True
+                    yield record
+        if found:
+            return
+
+
+def _import_ijson():
+    """按需导入 ijson，未安装时返回 None（改用内置扫描器）"""
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+
+class _StreamReader:
+    """
+    增量 JSON 扫描器：按块读取文本，只在缓冲中保留尚未处理的部分。
+    数组元素与被跳过的容器逐个处理，单个标量或数组元素用 raw_decode 一次解码。
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int) -> bool:
+        """再读入至少一块；已处理的部分从缓冲中丢弃。返回是否读到了新内容"""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(max(size, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """下一个非空白字符（不消耗），文件结束时返回空字符串"""
+        while True:
+            self.pos = _SKIP_WHITESPACE(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise ValueError(f"JSON 格式错误：应为 {ch!r}，实际为 {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        """解码下一个完整的值；缓冲中不完整时继续读入（每次读入量翻倍，避免超长记录反复解码）"""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # 数字可能被块边界截断（"12" 只读到 "1"，"1e-7" 只读到 "1e"），后面不是分隔符时读入更多再确认
+            if not self.eof and not isinstance(obj, (dict, list, str)) and \
+                    (end == len(self.buf) or self.buf[end] not in _DELIMITERS):
+                self._fill(size)
+                continue
+            self.pos = end
+            return obj
+
+    def items(self) -> Iterator:
+        """逐个返回数组元素"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("]")
+                return
+
+    def members(self) -> Iterator[str]:
+        """逐个返回对象的键；调用方需在取下一个键之前处理（读取、跳过或进入）对应的值"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("}")
+                return
+
+    def skip(self):
+        """跳过下一个值；对象与数组逐个成员跳过，不整体解码"""
+        ch = self.peek()
+        if ch == "{":
+            for _ in self.members():
+                self.skip()
+        elif ch == "[":
+            self.expect("[")
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            while True:
+                self.skip()
+                if self.peek() == ",":
+                    self.pos += 1
+                else:
+                    self.expect("]")
+                    return
+        else:
+            self.value()
+
+    def find(self, keys: list) -> Iterator:
+        """沿 keys 逐层进入对象，逐个返回目标数组的元素；路径不存在或不是数组时不返回任何元素"""
+        ch = self.peek()
+        if not keys:
+            if ch == "[":
+                yield from self.items()
+            return
+        if ch != "{":
+            return
+        for key in self.members():
+            if key == keys[0]:
+                yield from self.find(keys[1:])
+                return
+            self.skip()
+
+
+def write_lines(path: str, records) -> int:
+    """
+    把记录逐条写成 JSON Lines（先写临时文件再替换），records 可以是生成器
+    :return: 写入的条数
+    """
+    tmp = f"{path}.tmp"
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
@@ -0,0 +1,180 @@
+"""
+latency.py
+~~~~~~~~~~
+按接口维护滚动窗口内的请求耗时，用于计算分位数（如 p90），
+为对冲请求等自适应策略提供阈值；另有按接口、按阶段累计的耗时直方图，
+用于分析一次请求的时间花在 DNS、建连、TLS、首字节还是下载上。
+"""
+
+import json
+import bisect
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class LatencyTracker:
+    """按接口名记录最近若干次请求的耗时（秒）"""
+
+    def __init__(self, window: int = 50):
+        """
+        :param window: 每个接口保留的最近样本数
+        """
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        # 接口 -> [累计次数, 累计耗时]，不受窗口限制（监控指标 summary 的 _count/_sum）
+        self._totals: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float):
+        """
+        记录一次请求耗时
+        :param endpoint: 接口名
+        :param seconds: 耗时(秒)
+        """
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+                self._totals[endpoint] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[endpoint]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def count(self, endpoint: str) -> int:
+        """返回接口当前窗口内的样本数"""
+        with self._lock:
+            return len(self._samples.get(endpoint, ()))
+
+    def totals(self, endpoint: str) -> Tuple[int, float]:
+        """返回接口自创建以来的累计请求次数与累计耗时(秒)"""
+        with self._lock:
+            count, total = self._totals.get(endpoint, (0, 0.0))
+            return int(count), total
+
+    def percentile(self, endpoint: str, q: float) -> Optional[float]:
+        """
+        计算接口耗时的分位数（最近邻法）
+        :param endpoint: 接口名
+        :param q: 分位数，取值 0~1，例如 0.9
+        :return: 耗时(秒)；无样本时返回 None
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+        return samples[idx]
+
+
+# 直方图桶上界（毫秒），最后一个桶收纳其余样本
+HISTOGRAM_BUCKETS_MS = (1, 2, 3, 5, 7, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750,
+                        1000, 1500, 2000, 3000, 5000, 10000)
+
+
+class LatencyHistogram:
+    """固定桶的耗时直方图，样本无限增长时内存恒定"""
+
+    def __init__(self, buckets_ms=HISTOGRAM_BUCKETS_MS):
+        """
+        :param buckets_ms: 递增的桶上界（毫秒）
+        """
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """记录一个样本（秒）"""
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        按桶估算分位数：在样本所在桶内线性插值，结果不超过观测到的最大值
+        :param q: 分位数，取值 0~1
+        """
+        if not self.count:
+            return None
+        rank = max(1, q * self.count)
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets_ms[i - 1] / 1000 if i > 0 else 0.0
+                upper = self.buckets_ms[i] / 1000 if i < len(self.buckets_ms) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+    def snapshot(self) -> Dict:
+        """导出为可 JSON 序列化的字典"""
+        labels = [f"<={b}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class EndpointTimings:
+    """按 接口 -> 阶段（dns/connect/tls/ttfb/download/total）维护耗时直方图"""
+
+    PHASES = ("dns", "connect", "tls", "ttfb", "download", "total")
+
+    def __init__(self):
+        self._hists: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, phases: Dict[str, float]):
+        """
+        记录一次请求各阶段耗时
+        :param endpoint: 接口名，如 select、search
+        :param phases: 阶段名 -> 耗时(秒)，复用连接时没有 dns/connect/tls
+        """
+        with self._lock:
+            hists = self._hists.setdefault(endpoint, {})
+            for phase, seconds in phases.items():
+                hist = hists.get(phase)
+                if hist is None:
+                    hist = hists[phase] = LatencyHistogram()
+                hist.record(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """导出全部直方图：接口 -> 阶段 -> 统计"""
+        with self._lock:
+            return {endpoint: {phase: hists[phase].snapshot() for phase in self.PHASES if phase in hists}
+                    for endpoint, hists in self._hists.items()}
+
+    def dump(self, path: str) -> Dict[str, Dict[str, Dict]]:
+        """把直方图写入 JSON 文件，返回导出的数据"""
+        data = self.snapshot()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return data
+
+    def summary_lines(self) -> List[str]:
+        """每个接口一行的摘要：请求数、新建连接数与各阶段 p50/p90（毫秒）"""
+        lines = []
+        for endpoint, phases in sorted(self.snapshot().items()):
+            total = phases.get("total")
+            if not total:
+                continue
+            parts = [f"[{endpoint}] 请求 {total['count']} 次"]
+            if "connect" in phases:
+                parts.append(f"新建连接 {phases['connect']['count']} 次")
+            for phase in self.PHASES:
+                stats = phases.get(phase)
+                if stats:
+                    parts.append(f"{phase} p50/p90 {stats['p50'] * 1000:.0f}/{stats['p90'] * 1000:.0f}ms")
+            lines.append(", ".join(parts))
+        return lines
@@ -0,0 +1,223 @@
+"""
+profiler.py
+~~~~~~~~~~~
+内置剖析：按阶段（如 startup、search、snipe）收集
+  - cProfile 确定性剖析：保存 <阶段>.prof（可用 snakeviz 等工具打开）与 <阶段>_top.txt；
+  - 栈采样：后台线程定期采样所有线程的调用栈，保存为 <阶段>.folded，
+    即 flamegraph.pl / speedscope / inferno 可直接读取的折叠栈格式。
+结束时打印每个阶段按类别（BeautifulSoup、loguru、JSON、网络等）汇总的耗时与 Top-N 函数。
+
+注意：cProfile 只记录开启它的线程，对冲请求、会话池登录等工作线程的耗时请看折叠栈。
+"""
+
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import contextlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# 文件路径片段 -> 类别，按顺序匹配
+CATEGORIES = (
+    ("/bs4/", "BeautifulSoup"),
+    ("/html/parser", "BeautifulSoup"),
+    ("/lxml/", "lxml"),
+    ("/loguru/", "loguru"),
+    ("/json/", "JSON"),
+    ("/requests/", "网络"),
+    ("/urllib3/", "网络"),
+    ("/http/client", "网络"),
+    ("/socket.py", "网络"),
+    ("/ssl.py", "网络"),
+    ("tabulate", "终端展示"),
+    ("/prettytable/", "终端展示"),
+)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# 内置函数名片段 -> 类别
+BUILTIN_CATEGORIES = (
+    ("_socket", "网络"),
+    ("_ssl", "网络"),
+    ("select.", "网络"),
+    ("time.sleep", "等待"),
+    ("acquire", "等待"),
+    ("json", "JSON"),
+)
+
+
+def categorize(filename: str, func: str = "") -> str:
+    """按源文件路径（内置函数按函数名）把函数归类"""
+    path = filename.replace("\\", "/")
+    if path == "~":
+        for fragment, category in BUILTIN_CATEGORIES:
+            if fragment in func:
+                return category
+    for fragment, category in CATEGORIES:
+        if fragment in path:
+            return category
+    if path.startswith(PROJECT_DIR.replace("\\", "/")):
+        return "项目代码"
+    if path.startswith("~") or path.startswith("<"):
+        return "内置函数"
+    return "其他"
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class StackSampler:
+    """后台线程按固定间隔采样所有线程调用栈，累计为折叠栈计数"""
+
+    def __init__(self, interval: float = 0.005):
+        """
+        :param interval: 采样间隔(秒)
+        """
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path: str):
+        """写出折叠栈：每行 "帧1;帧2;...;帧N 次数" """
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_leaves(self, n: int) -> List[Tuple[str, int]]:
+        """采样中最常位于栈顶的函数"""
+        leaves = Counter()
+        for stack, count in self.counts.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+
+class Profiler:
+    """按阶段剖析；同名阶段多次进入时累计"""
+
+    def __init__(self, output_dir: str, mode: str = "all", interval: float = 0.005, top: int = 20,
+                 max_snipe_duration: int = 60):
+        """
+        :param output_dir: 输出目录
+        :param mode: all（cProfile + 采样）、cprofile 或 sample
+        :param interval: 采样间隔(秒)
+        :param top: 摘要中列出的函数数量
+        :param max_snipe_duration: 剖析时抢课最长运行时间(秒)，保证剖析有界
+        """
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self.top = top
+        self.max_snipe_duration = max_snipe_duration
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.samplers: Dict[str, StackSampler] = {}
+        self.wall: Counter = Counter()
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def section(self, name: str):
+        """剖析一个阶段"""
+        profile = sampler = None
+        if self.mode in ("all", "cprofile"):
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+        if self.mode in ("all", "sample"):
+            sampler = self.samplers.setdefault(name, StackSampler(self.interval))
+            sampler.start()
+        started = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.wall[name] += time.perf_counter() - started
+            if sampler is not None:
+                sampler.stop()
+
+    def bound_duration(self, max_duration: int) -> int:
+        """把抢课最长运行时间限制在 max_snipe_duration 内"""
+        if max_duration <= 0:
+            return self.max_snipe_duration
+        return min(max_duration, self.max_snipe_duration)
+
+    def _category_totals(self, stats: pstats.Stats) -> Counter:
+        totals = Counter()
+        for (filename, _, func), (_, _, tottime, _, _) in stats.stats.items():
+            totals[categorize(filename, func)] += tottime
+        return totals
+
+    def report(self) -> List[str]:
+        """
+        写出所有阶段的剖析结果并打印摘要
+        :return: 生成的文件路径
+        """
+        paths = []
+        for name in self.wall:
+            print(f"\n========== 剖析: {name} (耗时 {self.wall[name]:.2f} 秒) ==========")
+            profile = self.profiles.get(name)
+            if profile is not None:
+                prof_path = os.path.join(self.output_dir, f"{name}.prof")
+                profile.dump_stats(prof_path)
+                stream = io.StringIO()
+                stats = pstats.Stats(profile, stream=stream)
+                stats.sort_stats("cumulative").print_stats(self.top * 2)
+                top_path = os.path.join(self.output_dir, f"{name}_top.txt")
+                with open(top_path, "w", encoding="utf-8") as f:
+                    f.write(stream.getvalue())
+                paths += [prof_path, top_path]
+
+                totals = self._category_totals(stats)
+                grand = sum(totals.values()) or 1.0
+                print("按类别（函数自身耗时）:")
+                for category, seconds in totals.most_common():
+                    print(f"  {category:<12} {seconds:8.3f} 秒  {seconds / grand * 100:5.1f}%")
+                print(f"Top {self.top}（按自身耗时）:")
+                ranked = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:self.top]
+                for (filename, line, func), (_, calls, tottime, cumtime, _) in ranked:
+                    print(f"  {tottime:8.3f}s 自身 {cumtime:8.3f}s 累计 {calls:>8} 次  "
+                          f"{func} ({os.path.basename(filename)}:{line})")
+            sampler = self.samplers.get(name)
+            if sampler is not None:
+                folded_path = os.path.join(self.output_dir, f"{name}.folded")
+                sampler.write_folded(folded_path)
+                paths.append(folded_path)
+                if profile is None and sampler.samples:
+                    print(f"Top {self.top}（采样栈顶，共 {sampler.samples} 次采样）:")
+                    for label, count in sampler.top_leaves(self.top):
+                        print(f"  {count:>8}  {label}")
+        if paths:
+            print(f"\n剖析结果已保存到 {self.output_dir}（.prof 为 cProfile 数据，.folded 可用 flamegraph.pl 或 speedscope 生成火焰图）")
+        return paths
@@ -0,0 +1,241 @@
+"""
+timetable.py
+~~~~~~~~~~~~
+解析上课时间字符串（sksj），例如
+
+    星期一第1-2节{1-10周}
+    星期三第3-4节{1-15周(单)};星期五第5节{2-8周(双),10周};星期二第1节{1-17周(单周)};星期四第2节{双周}
+
+并把每门课占用的时间表示为一个位图：每周 WEEK_BITS 位，第 w 周星期 d 第 p 节对应第
+(w-1)*WEEK_BITS + (d-1)*PERIODS_PER_DAY + (p-1) 位。两门课是否冲突只需一次按位与，
+SlotIndex 据此回答“某个教学班是否与课表或其他目标冲突”。
+
+无法识别的周次说明按整个学期处理，但该时间段标记为周次未知（TimeSlot.weeks_known 为 False），
+由此得到的冲突只是“可能冲突”，调用方应提示而不是直接跳过。
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+PERIODS_PER_DAY = 16
+WEEK_BITS = 7 * PERIODS_PER_DAY
+# 未写明周次时视为整个学期（最多到该周）都有课
+MAX_WEEKS = 20
+
+WEEKDAY_NUMBERS = {"一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "日": 7, "天": 7, "七": 7}
+WEEKDAY_NAMES = "一二三四五六日"
+
+_SLOT_RE = re.compile(r"星期(?P<day>[一二三四五六日天七])\s*第(?P<first>\d+)(?:-(?P<last>\d+))?节"
+                      r"(?:\s*\{(?P<weeks>[^}]*)\})?")
+# 一段周次：“1-16周”“3周”“1-17周(单周)”“2-8双”“单周”等，多段之间用逗号或顿号分隔
+_WEEK_PART_RE = re.compile(r"(?:(?P<first>\d+)(?:\s*-\s*(?P<last>\d+))?\s*周?)?\s*"
+                           r"(?:[(（]\s*(?P<p1>[单双])\s*周?\s*[)）]|(?P<p2>[单双])\s*周?)?")
+_WEEK_SEP_RE = re.compile(r"[,，、]")
+
+
+class TimeSlot(NamedTuple):
+    """一段上课时间：星期几、起止节次与上课周次"""
+    weekday: int
+    first: int
+    last: int
+    weeks: Tuple[int, ...]
+    # 周次说明无法识别时为 False，weeks 按整个学期填充
+    weeks_known: bool = True
+
+
+ALL_WEEKS = tuple(range(1, MAX_WEEKS + 1))
+
+
+def parse_weeks(text: str) -> Optional[Tuple[int, ...]]:
+    """
+    解析周次，例如 "1-16周(单)"、"1-17周(单周)"、"2-8周(双),10周"、"单周"
+    :param text: 花括号中的周次说明
+    :return: 升序的周次；为空时返回 1..MAX_WEEKS；无法识别时返回 None（周次未知）
+    """
+    if not (text or "").strip():
+        return ALL_WEEKS
+    weeks = set()
+    for part in _WEEK_SEP_RE.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        m = _WEEK_PART_RE.fullmatch(part)
+        parity = m and (m.group("p1") or m.group("p2"))
+        if m is None or not (m.group("first") or parity):
+            return None
+        first = int(m.group("first") or 1)
+        last = int(m.group("last") or (first if m.group("first") else MAX_WEEKS))
+        for w in range(first, min(last, MAX_WEEKS * 2) + 1):
+            if parity == "单" and w % 2 == 0 or parity == "双" and w % 2 == 1:
+                continue
+            weeks.add(w)
+    return tuple(sorted(weeks)) if weeks else None
+
+
+def parse_sksj(text: str) -> List[TimeSlot]:
+    """
+    解析上课时间字符串，多段时间可以用分号、逗号、换行或 <br/> 分隔
+    :param text: sksj 字段
+    :return: 时间段列表；无法识别的部分被忽略
+    """
+    slots = []
+    for m in _SLOT_RE.finditer(text or ""):
+        first = int(m.group("first"))
+        last = int(m.group("last") or first)
+        weeks = parse_weeks(m.group("weeks"))
+        slots.append(TimeSlot(WEEKDAY_NUMBERS[m.group("day")], first, last, weeks or ALL_WEEKS, weeks is not None))
+    return slots
+
+
+def slots_mask(slots: Iterable[TimeSlot]) -> int:
+    """把时间段转换为位图"""
+    mask = 0
+    for slot in slots:
+        first = max(1, slot.first)
+        last = min(PERIODS_PER_DAY, slot.last)
+        if last < first or not 1 <= slot.weekday <= 7:
+            continue
+        day_mask = ((1 << (last - first + 1)) - 1) << ((slot.weekday - 1) * PERIODS_PER_DAY + first - 1)
+        for week in slot.weeks:
+            mask |= day_mask << ((week - 1) * WEEK_BITS)
+    return mask
+
+
+@lru_cache(maxsize=4096)
+def sksj_mask(text: str) -> int:
+    """解析上课时间字符串并返回位图（同一字符串只解析一次）"""
+    return slots_mask(parse_sksj(text))
+
+
+@lru_cache(maxsize=4096)
+def sksj_weeks_known(text: str) -> bool:
+    """上课时间字符串中所有时间段的周次是否都能识别"""
+    return all(slot.weeks_known for slot in parse_sksj(text))
+
+
+def course_sksj(course: dict) -> str:
+    """取课程的上课时间字符串：搜索结果与课表原始数据为 sksj，ScheduleExtractor 解析结果在 raw_data 中"""
+    return course.get("sksj") or (course.get("raw_data") or {}).get("sksj") or ""
+
+
+def course_mask(course: dict) -> int:
+    """课程占用时间的位图；没有上课时间（如实践课）时为 0，不与任何课程冲突"""
+    return sksj_mask(course_sksj(course))
+
+
+def course_weeks_known(course: dict) -> bool:
+    """课程上课时间的周次是否都能识别；不能识别时与其他课程的冲突只是可能冲突"""
+    return sksj_weeks_known(course_sksj(course))
+
+
+def _ranges(numbers: List[int]) -> str:
+    """把升序整数合并为区间文本，例如 [1, 2, 3, 5] -> 1-3,5"""
+    parts = []
+    for n in numbers:
+        if parts and n == parts[-1][1] + 1:
+            parts[-1][1] = n
+        else:
+            parts.append([n, n])
+    return ",".join(f"{a}-{b}" if a != b else str(a) for a, b in parts)
+
+
+def describe_mask(mask: int) -> str:
+    """把位图转换为可读文本，用于说明冲突的具体时间，例如：星期一第1-2节，第1-10周"""
+    weeks, cells = [], 0
+    week_full = (1 << WEEK_BITS) - 1
+    week = 0
+    while mask >> (week * WEEK_BITS):
+        bits = (mask >> (week * WEEK_BITS)) & week_full
+        if bits:
+            weeks.append(week + 1)
+            cells |= bits
+        week += 1
+    parts = []
+    for day in range(7):
+        periods = [p + 1 for p in range(PERIODS_PER_DAY) if cells >> (day * PERIODS_PER_DAY + p) & 1]
+        if periods:
+            parts.append(f"星期{WEEKDAY_NAMES[day]}第{_ranges(periods)}节")
+    return "、".join(parts) + (f"，第{_ranges(weeks)}周" if weeks else "")
+
+
+class SlotIndex:
+    """
+    已占用时间的索引：每个键（通常是课程号 kch_id）对应一个位图，另维护所有位图的并集，
+    不冲突时一次按位与即可返回
+    """
+
+    def __init__(self):
+        self._masks: Dict[str, int] = {}
+        self._labels: Dict[str, str] = {}
+        # 周次无法识别（按整个学期占用）的键
+        self._uncertain = set()
+        self.occupied = 0
+
+    @classmethod
+    def from_courses(cls, courses: Iterable[dict]) -> "SlotIndex":
+        """
+        由课程列表（课表、搜索结果或抢课列表）建立索引
+        :param courses: 课程字典列表
+        """
+        index = cls()
+        for course in courses:
+            index.add_course(course)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._masks
+
+    def add(self, key: str, mask: int, label: str = "", weeks_known: bool = True):
+        """添加或合并一个键的占用时间；weeks_known 为 False 表示周次无法识别"""
+        self._masks[key] = self._masks.get(key, 0) | mask
+        self._labels[key] = label or self._labels.get(key, key)
+        if not weeks_known:
+            self._uncertain.add(key)
+        self.occupied |= mask
+
+    def add_course(self, course: dict):
+        """按课程号添加课程的占用时间"""
+        key = course.get("kch_id") or course.get("course_id") or course.get("jxb_id") or ""
+        label = course.get("kcmc") or course.get("title") or course.get("jxbmc") or key
+        self.add(key, course_mask(course), label, course_weeks_known(course))
+
+    def remove(self, key: str):
+        if self._masks.pop(key, None) is None:
+            return
+        self._labels.pop(key, None)
+        self._uncertain.discard(key)
+        self.occupied = 0
+        for mask in self._masks.values():
+            self.occupied |= mask
+
+    def label(self, key: str) -> str:
+        return self._labels.get(key, key)
+
+    def conflicts(self, mask: int, exclude: Optional[str] = None) -> List[str]:
+        """
+        返回与位图冲突的键
+        :param mask: 待检查的位图
+        :param exclude: 不参与检查的键（例如同一门课程的其他教学班）
+        """
+        if not mask & self.occupied:
+            return []
+        return [key for key, other in self._masks.items() if key != exclude and mask & other]
+
+    def conflicts_with(self, course: dict) -> List[str]:
+        """返回与课程冲突的键，忽略同一课程号（换班不算冲突）"""
+        return self.conflicts(course_mask(course), exclude=course.get("kch_id"))
+
+    def is_certain(self, course: dict, clash: List[str]) -> bool:
+        """
+        冲突是否确定：课程自身与至少一个冲突的键周次都能识别。
+        否则只是按整个学期估计的可能冲突，不应据此跳过课程
+        """
+        return course_weeks_known(course) and any(key not in self._uncertain for key in clash)
+
+    def describe_conflict(self, course: dict, key: str) -> str:
+        """说明课程与某个键冲突的具体时间"""
+        return describe_mask(course_mask(course) & self._masks.get(key, 0))
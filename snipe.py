@@ -0,0 +1,140 @@
+"""
+非交互抢课入口：读取配置文件后直接登录、加载目标课程并开始抢课，适合 cron 等定时任务
+
+用法:
+    SHU_SID=学号 SHU_PWD=密码 python snipe.py snipe_config.json [--dry-run]
+
+配置文件示例:
+    {
+      "year": 2025, "term": 2,
+      "targets": [{"kch_id": "...", "jxb_id": "...", "kcmc": "..."}],
+      "interval_min": 1, "interval_max": 3, "max_attempts": 100, "randomize": true,
+      "start_time": "2026-01-10 13:00:00", "duration": 600
+    }
+targets 也可以是 target_courses.json 格式文件的路径，省略时使用已保存的抢课列表；
+给出 targets 时，抢课列表等数据保存在独立目录 data/snipe/<配置文件名>/（可用 storage_dir 指定），
+不会覆盖交互式菜单保存的抢课列表。
+学号与密码默认读取环境变量 SHU_SID/SHU_PWD，可用 sid_env/pwd_env 指定其他变量名。
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import datetime
+
+from functions.run_config import load_run_config
+
+
+def storage_dir(config_path: str, run: dict) -> str:
+    """
+    本次运行的存储目录：配置给出 targets 时使用独立目录（与 batch_runner 的账号目录同理），
+    省略 targets 时使用 data/ 下已保存的抢课列表
+    """
+    if run.get("storage_dir"):
+        return run["storage_dir"]
+    if not run["targets"]:
+        return "data"
+    return os.path.join("data", "snipe", os.path.splitext(os.path.basename(config_path))[0])
+
+
+def dry_run(run: dict):
+    """
+    预演：不发送任何网络请求，打印将要执行的计划与每门课的选课请求
+    :param run: load_run_config 返回的配置
+    """
+    from modules.course_selector import CourseSelector
+    from functions.course_storage import CourseStorage
+    from functions.course_sniper import CourseSniper
+
+    sid = run["sid"] or "<SHU_SID>"
+    targets = run["targets"] or CourseStorage().load_target_courses()
+    sniper = CourseSniper(None, sid, {})
+    sniper.configure(**run["config"])
+    start = (datetime.datetime.fromtimestamp(run["start_at"]).strftime("%Y-%m-%d %H:%M:%S")
+             if run.get("start_at") else "立即")
+
+    print("========== 抢课预演 (dry-run) ==========")
+    print(f"教务系统: {run['base_url']}")
+    print(f"学号: {sid}    密码: {'已设置' if run['pwd'] else '未设置'}")
+    print(f"学年学期: {run['year']}-{run['year'] + 1} 第{run['term']}学期")
+    print(f"开始时间: {start}    最长运行: {run['max_duration'] or '不限'} 秒")
+    print(f"抢课配置: {json.dumps(sniper.config, ensure_ascii=False)}")
+    print(f"目标课程: {len(targets)} 门")
+
+    # 选课参数需登录后从选课页面提取，预演时用占位符或配置中的 course_params
+    params = run.get("course_params") or {k: f"<{k}>" for k in (
+        "xkxnm", "xkxqm", "njdm_id", "njdm_id_xs", "zyh_id", "zyh_id_xs")}
+    selector = CourseSelector(None, run["base_url"])
+    for i, course in enumerate(targets, 1):
+        url, payload, headers = selector.build_select_request(sid, course, params)
+        print(f"\n{i}. {course.get('kcmc') or course.get('jxbmc', '未知课程')} (课程号: {course.get('kch_id')})")
+        print(f"   POST {url}")
+        print(f"   Payload: {json.dumps(payload, ensure_ascii=False)}")
+    if not targets:
+        print("\n❌ 没有目标课程")
+
+
+def run():
+    parser = argparse.ArgumentParser(description="上海大学选课助手 - 非交互抢课")
+    parser.add_argument("config", help="运行配置文件 (JSON)")
+    parser.add_argument("--dry-run", action="store_true", help="只打印将要发送的请求，不登录也不选课")
+    parser.add_argument("--login-ahead", type=int, default=60, help="在开始时间前多少秒登录并提取参数")
+    parser.add_argument("--timings", help="结束后把各接口请求阶段耗时直方图保存为 JSON")
+    parser.add_argument("--profile", nargs="?", const="profile", metavar="DIR",
+                        help="剖析登录与抢课（抢课时长受 --profile-duration 限制），结果保存到 DIR")
+    parser.add_argument("--profile-duration", type=int, default=60, help="剖析时抢课最长运行时间(秒)")
+    args = parser.parse_args()
+
+    run_cfg = load_run_config(args.config)
+    if args.dry_run:
+        from modules.tools.debug_utils import init_logger
+        init_logger(run_cfg.get("debug", False))
+        dry_run(run_cfg)
+        return
+    if not run_cfg["sid"] or not run_cfg["pwd"]:
+        print("❌ 缺少学号或密码，请设置环境变量 SHU_SID / SHU_PWD")
+        sys.exit(1)
+
+    from utils import wait_until
+    from functions.app_orchestrator import AppOrchestrator
+
+    profiler = None
+    if args.profile:
+        from modules.tools.profiler import Profiler
+        profiler = Profiler(args.profile, max_snipe_duration=args.profile_duration)
+
+    start_at = run_cfg.get("start_at")
+    if start_at and start_at - args.login_ahead > time.time():
+        wait_until(start_at - args.login_ahead, "等待登录")
+
+    orchestrator = AppOrchestrator(
+        run_cfg["base_url"], run_cfg["sid"], run_cfg["pwd"], run_cfg["year"], run_cfg["term"],
+        run_cfg.get("debug", False),
+        hedge=run_cfg.get("hedge", False),
+        pool_size=run_cfg.get("pool_size", 1),
+        storage_dir=storage_dir(args.config, run_cfg),
+        sso_url=run_cfg.get("sso_url"),
+        metrics_port=run_cfg.get("metrics_port", 0),
+        metrics_socket=run_cfg.get("metrics_socket"),
+        json_logs=run_cfg.get("json_logs"),
+        profiler=profiler,
+    )
+    print(f"日志文件：{orchestrator.log_path}")
+    res = orchestrator.run_headless(run_cfg["targets"], run_cfg["config"], run_cfg["max_duration"], start_at)
+    if args.timings:
+        orchestrator.timings.dump(args.timings)
+    if profiler:
+        profiler.report()
+    if res["code"] != 1000:
+        print(f"❌ {res['msg']}")
+        sys.exit(1)
+    stats = res["data"]
+    print("\n========== 抢课结束 ==========")
+    print(f"尝试次数: {stats.get('attempts', 0)}")
+    print(f"成功课程: {stats.get('successful', 0)}/{stats.get('total_courses', 0)}")
+    sys.exit(0 if stats.get("completed") else 2)
+
+
+if __name__ == "__main__":
+    run()
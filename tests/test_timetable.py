@@ -0,0 +1,76 @@
+"""
+上课时间解析（modules/tools/timetable.py）的单元测试
+
+    python -m pytest tests/test_timetable.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.tools.timetable import (ALL_WEEKS, MAX_WEEKS, SlotIndex, course_weeks_known, parse_sksj,
+                                     parse_weeks)
+
+ODD = tuple(range(1, MAX_WEEKS + 1, 2))
+EVEN = tuple(range(2, MAX_WEEKS + 1, 2))
+
+
+def test_plain_ranges():
+    assert parse_weeks("1-10周") == tuple(range(1, 11))
+    assert parse_weeks("3周") == (3,)
+    assert parse_weeks("2-8周(双),10周") == (2, 4, 6, 8, 10)
+    assert parse_weeks("1-4周，6-7周") == (1, 2, 3, 4, 6, 7)
+
+
+def test_parity_forms():
+    assert parse_weeks("1-16周(单)") == tuple(range(1, 17, 2))
+    assert parse_weeks("1-17周(单周)") == tuple(range(1, 18, 2))
+    assert parse_weeks("2-16周(双周)") == tuple(range(2, 17, 2))
+    assert parse_weeks("1-16周（双周）") == tuple(range(2, 17, 2))
+    assert parse_weeks("1-9单") == (1, 3, 5, 7, 9)
+    assert parse_weeks("1-9单周") == (1, 3, 5, 7, 9)
+
+
+def test_bare_parity():
+    assert parse_weeks("单周") == ODD
+    assert parse_weeks("双周") == EVEN
+    assert parse_weeks("单") == ODD
+
+
+def test_empty_is_whole_term():
+    assert parse_weeks("") == ALL_WEEKS
+    assert parse_weeks(None) == ALL_WEEKS
+
+
+def test_unknown_weeks():
+    assert parse_weeks("全周") is None
+    assert parse_weeks("1-16周,另行通知") is None
+    slot, = parse_sksj("星期一第1-2节{待定}")
+    assert slot.weeks == ALL_WEEKS and not slot.weeks_known
+    slot, = parse_sksj("星期二第1节{1-17周(单周)}")
+    assert slot.weeks == tuple(range(1, 18, 2)) and slot.weeks_known
+
+
+def test_parity_does_not_clash():
+    index = SlotIndex.from_courses([{"kch_id": "A", "sksj": "星期一第1-2节{1-16周(单周)}"}])
+    assert index.conflicts_with({"kch_id": "B", "sksj": "星期一第1-2节{1-16周(双周)}"}) == []
+    assert index.conflicts_with({"kch_id": "C", "sksj": "星期一第2节{单周}"}) == ["A"]
+
+
+def test_unknown_weeks_clash_is_uncertain():
+    index = SlotIndex.from_courses([{"kch_id": "A", "sksj": "星期一第1-2节{1-16周}"},
+                                    {"kch_id": "U", "sksj": "星期三第1-2节{另行通知}"}])
+    unknown = {"kch_id": "B", "sksj": "星期一第1节{待定}"}
+    assert not course_weeks_known(unknown)
+    assert index.conflicts_with(unknown) == ["A"]
+    assert not index.is_certain(unknown, ["A"])
+    known = {"kch_id": "C", "sksj": "星期三第2节{1-4周}"}
+    assert index.conflicts_with(known) == ["U"]
+    assert not index.is_certain(known, ["U"])
+    certain = {"kch_id": "D", "sksj": "星期一第2节{3周}"}
+    assert index.is_certain(certain, index.conflicts_with(certain))
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -44,4 +44,23 @@ def countdown(seconds: int, message: str = "等待中", cancel_check: Callable[[
         print(f"\r{message}... {i}秒 ", end="", flush=True)
         time.sleep(1)
     print(f"\r{message}... 完成!     ")
-    return True
\ No newline at end of file
+    return True
+
+def wait_until(timestamp: float, message: str = "等待开始", cancel_check: Callable[[], bool] = None) -> bool:
+    """
+    等待到指定时间点，期间每秒刷新剩余时间
+    :param timestamp: 目标时间戳
+    :param message: 提示文字
+    :param cancel_check: 返回 True 时提前取消
+    :return: 是否等到了目标时间（被取消时返回 False）
+    """
+    while True:
+        remaining = timestamp - time.time()
+        if remaining <= 0:
+            break
+        if cancel_check and cancel_check():
+            return False
+        print(f"\r{message}... 剩余 {int(remaining)}秒 ", end="", flush=True)
+        time.sleep(min(1.0, remaining))
+    print(f"\r{message}... 完成!          ")
+    return True